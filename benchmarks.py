@@ -0,0 +1,296 @@
+# Description: Benchmarks for the Janggi game. Each benchmark function returns its measurement so it can also be called
+# from other scripts, and running this module prints every benchmark.
+#
+# Usage: python benchmarks.py
+
+import random
+import time
+import tracemalloc
+
+from janggi_game import JanggiGame
+from janggi_mcts import MCTS
+from janggi_parallel import ParallelSearch
+from janggi_search import Search, move_notation
+from janggi_tables import CHARIOT, CANNON, COLUMNS
+
+
+# Tactical positions, each given as the moves played from the starting position and the one move that wins or saves
+# material in it. The best move of each position scores at least 200 more than every other move in a depth 3 search
+# with quiescence.
+TACTICAL_SUITE = (
+    ("i7 i6 c4 d4 f10 f9 a4 a5 d10 e10 g4 h4 i6 h6 i1 i3 i10 i6 h3 h6 i6 h6 e2 d2", "h6 c6"),
+    ("a7 b7 c4 d4 b8 b6 i1 i2 a10 a4 a1 a4 i10 i9 f1 e1 d10 e10 i2 h2 i7 h7 e1 f1 i9 i4 a4 b4", "i4 g4"),
+    ("i7 h7 e4 e5 i10 i4 i1 i4 c10 d8 i4 i7 g7 f7 c4 b4 f10 f9 e5 d5 c7 b7 d5 e5 e7 e6 g1 e4 f9 f8", "i7 h7"),
+    ("c7 b7 e2 d2 f10 f9 g4 h4 e7 d7 h1 i3 g10 e7 h3 h7 g7 h7 h4 g4 e7 g4 e4 f4 a10 a9 i3 h1 h8 h4 c4 d4 "
+     "e9 e8", "f4 g4"),
+    ("c7 b7 i1 i2 a7 a6 e4 e5 b8 b5 i2 i1 e7 e6 e5 e6 a10 a9 i4 h4 g7 g6 e2 f2 b7 b6 h3 h7 i7 h7 i1 i5 g6 "
+     "h6", "i5 i10"),
+    ("h10 i8 a4 b4 g7 g6 a1 a7 a10 a7 g4 f4 b10 d7 b1 d4 a7 a10 i4 h4 a10 a3 h3 h5 e7 f7 f4 g4 d7 b4 e2 d3 "
+     "a3 b3", "c1 b3"),
+    ("e9 f8 d1 d2 h8 e8 c4 b4 e8 e5 e4 e5 b8 i8 i4 h4 i8 a8 i1 i4 i10 i9 e5 e6 e7 e6 h3 h7 g7 h7 b3 b10 a8 "
+     "a4", "b10 d10"),
+    ("h10 g8 e4 f4 i10 i9 a4 a5 g7 g6 g4 h4 i9 i10 e2 d3 h8 f8 h4 h5 f10 f9 a1 a4 i10 i9 h3 h9 i9 h9 h1 g3 "
+     "f8 f1 h5 g5", "f1 i1"),
+    ("g7 f7 f1 e1 a10 a9 e2 d2 e9 f9 d2 d3 i7 h7 d3 e2 i10 i4 i1 i3 i4 i10 i3 i8 f9 f8 e1 f1 i10 i8 e2 f3 "
+     "i8 i3 c4 c5 h10 i8", "h1 i3"),
+    ("h10 g8 e2 e1 e9 f8 f1 e2 f10 e9 i1 i2 c7 b7 i4 i5 e7 e6 i2 i1 e9 f9 b1 d4 b10 d7 c4 b4 d7 b10 h1 i3 "
+     "b8 b4 a1 b1 b4 e4", "g1 e4"),
+    ("f10 e10 h1 i3 e7 f7 g4 g5 e10 f10 i1 i2 c7 c6 e2 d3 c6 b6 e4 f4 i10 i9 i4 h4 b8 b5 b3 g3 b5 b8 b1 d4 "
+     "a7 b7 a1 a3 g10 e7 d4 f7", "g7 f7"),
+    ("g7 g6 a1 a2 a7 a6 c4 b4 a10 a7 b4 b5 i7 i6 e2 f2 i6 i5 i4 i5 i10 i7 f1 e2 h10 g8 g4 f4 i7 i5 h1 i3 "
+     "g8 h6 e2 f3 i5 b5 f2 e2 b5 h5", "i3 h5"),
+    ("c7 b7 a4 b4 g7 g6 e2 f2 b8 b4 h1 i3 e7 f7 e4 d4 b4 d4 a1 a7 a10 a7 c4 d4 f10 f9 f1 e1 a7 a3 d4 c4 e9 "
+     "f8 b3 b10 a3 a2 f2 f3 f8 e9", "b1 d4"),
+    ("a7 a6 c4 c5 c7 c6 g4 f4 f10 e10 i4 h4 c6 c5 e2 e1 e9 d8 e4 e5 d8 e8 h4 i4 e7 d7 d1 e2 g10 d8 i1 i2 "
+     "e10 f10 i2 h2 a6 b6 a1 a2 a10 a4", "a2 a4"),
+    ("e7 d7 i1 i2 i7 i6 e4 e5 c7 b7 c4 b4 b8 b4 f1 e1 i6 h6 a4 b4 c10 b8 e5 f5 i10 i4 f5 g5 h8 h4 a1 a3 h4 "
+     "b4 d1 d2 i4 g4 i2 i5 g4 g5 a3 a7", "g5 g2"),
+    ("c7 c6 e4 d4 e9 f9 i1 i2 a7 b7 c1 d3 d10 e9 g4 f4 a10 a4 i2 g2 a4 a8 d1 d2 b7 b6 a1 a7 h10 g8 a7 e7 "
+     "a8 a4 g2 g7 c6 c5 e7 d7 a4 a10 i4 i5", "b10 d7"),
+)
+
+
+def game_memory(backend="object", count=200):
+
+    """
+    Measures the memory held by live games by creating many games while tracemalloc traces memory allocations.
+    :param backend: Represents the move generation backend of the games, either "object" or "bitboard".
+    :param count: Represents the number of games to create as an integer.
+    :return: The number of bytes held per game as a float.
+    """
+
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    games = [JanggiGame(backend=backend) for game in range(count)]
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return size / len(games)
+
+
+def midgame_games(count=20, plies=30, seed=1):
+
+    """
+    Creates games in midgame positions by playing random legal moves from the starting position.
+    :param count: Represents the number of games to create as an integer.
+    :param plies: Represents the number of moves played in each game as an integer.
+    :param seed: Represents the seed of the random number generator as an integer.
+    :return: A list of JanggiGame objects.
+    """
+
+    generator = random.Random(seed)
+    games = []
+    for game_number in range(count):
+        game = JanggiGame()
+        for ply in range(plies):
+            moves = game.legal_moves(game.get_player_turn())
+            if not moves:
+                break
+            game.make_move_idx(*generator.choice(moves))
+        games.append(game)
+    return games
+
+
+def slider_generation(games, repeat=200):
+
+    """
+    Measures the speed of the Chariot and Cannon move generators on the given game positions.
+    :param games: Represents a list of JanggiGame objects.
+    :param repeat: Represents the number of times the moves of every Chariot and Cannon are generated as an integer.
+    :return: The number of generator calls per second for the Chariots and for the Cannons as floats.
+    """
+
+    speeds = []
+    for piece_type, generator_name in ((CHARIOT, "chariot_moves"), (CANNON, "cannon_moves")):
+        calls = []
+        for game in games:
+            generator = getattr(game, generator_name)
+            for piece in game.get_pieces():
+                if piece.get_type_code() == piece_type:
+                    calls.append((generator, piece, piece.get_player_code()))
+
+        start = time.perf_counter()
+        for iteration in range(repeat):
+            for generator, piece, player in calls:
+                generator(piece, player)
+        speeds.append(len(calls) * repeat / (time.perf_counter() - start))
+    return speeds
+
+
+def check_positions(count=200, seed=2):
+
+    """
+    Creates games whose player to move is in check by playing random legal moves, preferring captures, until a check
+    is given.
+    :param count: Represents the number of games to create as an integer.
+    :param seed: Represents the seed of the random number generator as an integer.
+    :return: A list of JanggiGame objects using the bitboard backend.
+    """
+
+    generator = random.Random(seed)
+    games = []
+    while len(games) < count:
+        game = JanggiGame(backend="bitboard")
+        for ply in range(200):
+            moves = game.legal_moves(game.get_player_turn())
+            if not moves:
+                break
+            board = game.get_board()
+            captures = [(from_sq, to_sq) for from_sq, to_sq in moves
+                        if board[to_sq // COLUMNS][to_sq % COLUMNS] != "   "]
+            if captures and generator.random() < 0.6:
+                game.make_move_idx(*generator.choice(captures))
+            else:
+                game.make_move_idx(*generator.choice(moves))
+            if game.get_check():
+                games.append(game)
+                break
+    return games
+
+
+def mate_detection(games, repeat=20):
+
+    """
+    Measures the speed of checkmate detection on games in check, once by looking for any legal move and once with
+    the check_checkmate method, which only tries the moves that could get the player out of check.
+    :param games: Represents a list of JanggiGame objects whose player to move is in check.
+    :param repeat: Represents the number of times every position is tested as an integer.
+    :return: The number of positions tested per second by each method as floats.
+    """
+
+    speeds = []
+    for method in ("has_legal_move", "check_checkmate"):
+        start = time.perf_counter()
+        for iteration in range(repeat):
+            for game in games:
+                if method == "has_legal_move":
+                    game.has_legal_move(game.get_player_turn())
+                else:
+                    game.check_checkmate()
+        speeds.append(len(games) * repeat / (time.perf_counter() - start))
+    return speeds
+
+
+def tactical_positions():
+
+    """
+    Creates the games of the tactical suite.
+    :return: A list of (JanggiGame object, best move) tuples, with the best move as a (current position, move to
+    position) tuple of strings.
+    """
+
+    positions = []
+    for moves, best in TACTICAL_SUITE:
+        game = JanggiGame()
+        names = moves.split()
+        for index in range(0, len(names), 2):
+            game.make_move(names[index], names[index + 1])
+        positions.append((game, tuple(best.split())))
+    return positions
+
+
+def search_speed(positions, depth=2, quiescence=True):
+
+    """
+    Measures the speed and accuracy of a fixed depth search on the tactical suite.
+    :param positions: Represents a list of (JanggiGame object, best move) tuples.
+    :param depth: Represents the depth of the search as an integer.
+    :param quiescence: Represents whether the search extends the positions at its depth with captures.
+    :return: The number of nodes searched per second as a float and the share of positions whose best move was found
+    as a float.
+    """
+
+    nodes = 0
+    solved = 0
+    start = time.perf_counter()
+    for game, best in positions:
+        search = Search(game, max_depth=depth, quiescence=quiescence)
+        move = search.run()
+        nodes += search.get_nodes()
+        if move is not None and move_notation(move) == best:
+            solved += 1
+    return nodes / (time.perf_counter() - start), solved / len(positions)
+
+
+def parallel_scaling(positions, depth=3, worker_counts=(1, 2, 4, 8)):
+
+    """
+    Measures how the time of a fixed depth parallel search on the tactical suite scales with the number of worker
+    processes.
+    :param positions: Represents a list of (JanggiGame object, best move) tuples.
+    :param depth: Represents the depth of the search as an integer.
+    :param worker_counts: Represents the numbers of worker processes to measure as a tuple of integers.
+    :return: A list of (workers, seconds, nodes per second) tuples.
+    """
+
+    results = []
+    for workers in worker_counts:
+        nodes = 0
+        start = time.perf_counter()
+        for game, best in positions:
+            search = ParallelSearch(game, workers, max_depth=depth)
+            search.run()
+            nodes += search.get_nodes()
+        seconds = time.perf_counter() - start
+        results.append((workers, seconds, nodes / seconds))
+    return results
+
+
+def mcts_speed(backend="object", iterations=200, plies=6):
+
+    """
+    Measures the speed of Monte Carlo tree search iterations over the first moves of a game and the number of tree
+    nodes kept from one move to the next.
+    :param backend: Represents the move generation backend of the game, either "object" or "bitboard".
+    :param iterations: Represents the number of iterations searched before every move as an integer.
+    :param plies: Represents the number of moves played as an integer.
+    :return: The number of iterations per second as a float and the largest tree size as an integer.
+    """
+
+    game = JanggiGame(backend=backend)
+    tree = MCTS(game, seed=1)
+    largest = 0
+    start = time.perf_counter()
+    for ply in range(plies):
+        move = tree.search(iterations=iterations)
+        largest = max(largest, tree.get_size())
+        game.make_move_idx(*move)
+        tree.advance(move)
+    return iterations * plies / (time.perf_counter() - start), largest
+
+
+def main():
+
+    """
+    Runs every benchmark and prints the results.
+    :return: NONE
+    """
+
+    for backend in ("object", "bitboard"):
+        print("memory  %-8s  %8.0f bytes per game" % (backend, game_memory(backend)))
+
+    chariot_speed, cannon_speed = slider_generation(midgame_games())
+    print("moves   chariot   %8.0f calls/s" % chariot_speed)
+    print("moves   cannon    %8.0f calls/s" % cannon_speed)
+
+    scan_speed, evasion_speed = mate_detection(check_positions())
+    print("mate    scan      %8.0f positions/s" % scan_speed)
+    print("mate    evasions  %8.0f positions/s" % evasion_speed)
+
+    positions = tactical_positions()
+    for depth in (1, 2, 3):
+        for quiescence in (False, True):
+            speed, accuracy = search_speed(positions, depth, quiescence)
+            print("search  depth %d %-9s %8.0f nodes/s  %3.0f%% solved"
+                  % (depth, "quiesce" if quiescence else "", speed, accuracy * 100))
+
+    for backend in ("object", "bitboard"):
+        speed, largest = mcts_speed(backend)
+        print("mcts    %-8s  %8.0f iterations/s  %6d nodes at most" % (backend, speed, largest))
+
+    results = parallel_scaling(positions)
+    for workers, seconds, speed in results:
+        print("split   %d workers %8.2fs  %8.0f nodes/s  %4.2fx" % (workers, seconds, speed, results[0][1] / seconds))
+
+
+if __name__ == "__main__":
+    main()
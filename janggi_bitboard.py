@@ -0,0 +1,664 @@
+# Description: Bitboard representation of a Janggi position that JanggiGame can use as its backend. Every board position
+# is a bit in a 90 bit integer (row * 9 + column), with one integer per player and piece type and one occupancy integer
+# per player. Move generation, check detection and move legality are done with mask arithmetic on those integers
+# instead of walking the board and asking each piece object for its player. The masks are built from the geometry
+# tables in janggi_tables.
+
+
+from janggi_tables import BLUE, RED, GENERAL, GUARD, HORSE, ELEPHANT, CHARIOT, CANNON, SOLDIER, SQUARES, DIRECTIONS, \
+    COLUMNS, RAYS, PALACE_MOVES, HORSE_MOVES, ELEPHANT_MOVES, SOLDIER_MOVES
+
+
+def to_mask(positions):
+
+    """
+    Converts board positions into a mask with one bit set per position.
+    :param positions: Represents board positions as an iterable of integers.
+    :return: The positions as a mask.
+    """
+
+    mask = 0
+    for position in positions:
+        mask |= 1 << position
+    return mask
+
+
+def build_ray_masks():
+
+    """
+    Builds the sliding ray masks for every position from the rays table. Each non-empty ray is also listed with
+    whether it runs towards higher bit positions, which decides whether the nearest piece on it is the lowest or the
+    highest set bit.
+    :return: A list with a list of (direction, mask, ascending) tuples for every position, and a list with a list of
+    masks indexed by direction for every position.
+    """
+
+    rays = []
+    ray_masks = []
+    for sq in range(SQUARES):
+        masks = [to_mask(ray) for ray in RAYS[sq]]
+        rays.append([(direction, mask, DIRECTIONS[direction][0] * COLUMNS + DIRECTIONS[direction][1] > 0)
+                     for direction, mask in enumerate(masks) if mask])
+        ray_masks.append(masks)
+    return rays, ray_masks
+
+
+def reverse_steps(steps):
+
+    """
+    Reverses a table of step masks so that each position lists the positions a piece can step to it from.
+    :param steps: Represents a list with the step mask for every position.
+    :return: A list with the mask of positions that can step to every position.
+    """
+
+    attackers = [0] * SQUARES
+    for sq in range(SQUARES):
+        mask = steps[sq]
+        while mask:
+            low = mask & -mask
+            attackers[low.bit_length() - 1] |= 1 << sq
+            mask ^= low
+    return attackers
+
+
+SLIDING_RAYS, RAY_MASKS = build_ray_masks()
+PALACE_STEPS = [to_mask(moves) for moves in PALACE_MOVES]
+SOLDIER_STEPS = [[to_mask(moves) for moves in SOLDIER_MOVES[BLUE]], [to_mask(moves) for moves in SOLDIER_MOVES[RED]]]
+SOLDIER_ATTACKERS = [reverse_steps(SOLDIER_STEPS[BLUE]), reverse_steps(SOLDIER_STEPS[RED])]
+HORSE_ATTACKERS = [[(sq, leg) for sq in range(SQUARES) for leg, target in HORSE_MOVES[sq] if target == to_sq]
+                   for to_sq in range(SQUARES)]
+ELEPHANT_ATTACKERS = [[(sq, first, second) for sq in range(SQUARES) for first, second, target in ELEPHANT_MOVES[sq]
+                       if target == to_sq] for to_sq in range(SQUARES)]
+
+
+def nearest(mask, ascending):
+
+    """
+    Finds the nearest set bit of a ray mask to the position the ray starts from.
+    :param mask: Represents the pieces on a ray as a mask.
+    :param ascending: Represents whether the ray runs towards higher bit positions.
+    :return: The bit position of the nearest piece as an integer.
+    """
+
+    if ascending:
+        return (mask & -mask).bit_length() - 1
+    return mask.bit_length() - 1
+
+
+def squares_of(mask):
+
+    """
+    Lists the bit positions that are set in a mask, lowest first.
+    :param mask: Represents a set of board positions as a mask.
+    :return: A list of bit positions as integers.
+    """
+
+    squares = []
+    while mask:
+        low = mask & -mask
+        squares.append(low.bit_length() - 1)
+        mask ^= low
+    return squares
+
+
+class BitboardBoard:
+
+    """
+    Represents a Janggi position as bitboards. This class is responsible for keeping a mask for every player and piece
+    type, an occupancy mask for each player and a list of piece codes indexed by bit position. A piece code is the
+    player times seven plus the piece type. Contains methods for generating moves, detecting check, and making and
+    unmaking moves on a stack so positions can be probed without copying.
+    """
+
+    def __init__(self, facing_rule=False):
+
+        """
+        Initializes an empty board with BLUE to move.
+        :param facing_rule: Represents whether the Generals facing each other on an open column counts as check for the
+        player who let it happen as a boolean.
+        """
+
+        self._pieces = [0] * 14
+        self._occupancy = [0, 0]
+        self._mailbox = [None] * SQUARES
+        self._turn = BLUE
+        self._history = []
+        self._facing_rule = facing_rule
+
+    @classmethod
+    def from_layout(cls, layout, turn=BLUE, facing_rule=False):
+
+        """
+        Creates a board from a list of pieces.
+        :param layout: Represents the pieces as a list of (player, piece type, bit position) tuples of integers.
+        :param turn: Represents the player to move as an integer.
+        :param facing_rule: Represents whether the Generals may not face each other on an open column as a boolean.
+        :return: A BitboardBoard with the pieces placed on it.
+        """
+
+        board = cls(facing_rule)
+        for player, piece_type, sq in layout:
+            board.put(player * 7 + piece_type, sq)
+        board._turn = turn
+        return board
+
+    def put(self, code, sq):
+
+        """
+        Places a piece on an empty position.
+        :param code: Represents the piece code as an integer.
+        :param sq: Represents the bit position as an integer.
+        :return: NONE
+        """
+
+        self._pieces[code] |= 1 << sq
+        self._occupancy[code // 7] |= 1 << sq
+        self._mailbox[sq] = code
+
+    def get_turn(self):
+
+        """
+        Gets the player to move.
+        :return: The player to move as an integer.
+        """
+
+        return self._turn
+
+    def get_piece(self, sq):
+
+        """
+        Gets the piece code at a position.
+        :param sq: Represents the bit position as an integer.
+        :return: The piece code as an integer, or None if the position is empty.
+        """
+
+        return self._mailbox[sq]
+
+    def get_occupancy(self, player):
+
+        """
+        Gets the occupancy mask of a player.
+        :param player: Represents the player as an integer.
+        :return: The positions of the player's pieces as a mask.
+        """
+
+        return self._occupancy[player]
+
+    def get_pieces_mask(self, player, piece_type):
+
+        """
+        Gets the mask of a player's pieces of one type.
+        :param player: Represents the player as an integer.
+        :param piece_type: Represents the piece type as an integer.
+        :return: The positions of those pieces as a mask.
+        """
+
+        return self._pieces[player * 7 + piece_type]
+
+    def general_square(self, player):
+
+        """
+        Gets the position of a player's General.
+        :param player: Represents the player as an integer.
+        :return: The bit position of the General as an integer, or None if the General is not on the board.
+        """
+
+        general = self._pieces[player * 7 + GENERAL]
+        if not general:
+            return None
+        return general.bit_length() - 1
+
+    def targets(self, sq):
+
+        """
+        Finds every position the piece at a position can move to, ignoring whether the move leaves its own General in
+        check.
+        :param sq: Represents the bit position of the piece as an integer.
+        :return: The positions the piece can move to as a mask.
+        """
+
+        code = self._mailbox[sq]
+        player, piece_type = divmod(code, 7)
+        own = self._occupancy[player]
+
+        if piece_type == GENERAL or piece_type == GUARD:
+            return PALACE_STEPS[sq] & ~own
+
+        if piece_type == SOLDIER:
+            return SOLDIER_STEPS[player][sq] & ~own
+
+        occupied = self._occupancy[BLUE] | self._occupancy[RED]
+        mask = 0
+
+        if piece_type == HORSE:
+            for leg, target in HORSE_MOVES[sq]:
+                if not occupied >> leg & 1:
+                    mask |= 1 << target
+            return mask & ~own
+
+        if piece_type == ELEPHANT:
+            for first, second, target in ELEPHANT_MOVES[sq]:
+                if not (occupied >> first | occupied >> second) & 1:
+                    mask |= 1 << target
+            return mask & ~own
+
+        if piece_type == CHARIOT:
+            for direction, ray, ascending in SLIDING_RAYS[sq]:
+                blockers = ray & occupied
+                if blockers:
+                    ray ^= RAY_MASKS[nearest(blockers, ascending)][direction]
+                mask |= ray
+            return mask & ~own
+
+        # Cannons jump exactly one piece that is not a Cannon and cannot capture a Cannon.
+        cannons = self._pieces[CANNON] | self._pieces[7 + CANNON]
+        for direction, ray, ascending in SLIDING_RAYS[sq]:
+            blockers = ray & occupied
+            if not blockers:
+                continue
+            screen = nearest(blockers, ascending)
+            if cannons >> screen & 1:
+                continue
+            beyond = RAY_MASKS[screen][direction]
+            blockers &= beyond
+            if blockers:
+                beyond ^= RAY_MASKS[nearest(blockers, ascending)][direction]
+            mask |= beyond
+        return mask & ~own & ~cannons
+
+    def generate_moves(self, player):
+
+        """
+        Generates every move for a player's pieces, ignoring whether the move leaves the player's own General in check.
+        :param player: Represents the player as an integer.
+        :return: A list of (from, to) bit position tuples.
+        """
+
+        moves = []
+        for sq in squares_of(self._occupancy[player]):
+            for target in squares_of(self.targets(sq)):
+                moves.append((sq, target))
+        return moves
+
+    def generate_captures(self, player):
+
+        """
+        Generates every capture for a player's pieces, ignoring whether the capture leaves the player's own General in
+        check.
+        :param player: Represents the player as an integer.
+        :return: A list of (from, to) bit position tuples.
+        """
+
+        enemy = self._occupancy[1 - player]
+        moves = []
+        for sq in squares_of(self._occupancy[player]):
+            for target in squares_of(self.targets(sq) & enemy):
+                moves.append((sq, target))
+        return moves
+
+    def is_attacked(self, sq, player):
+
+        """
+        Checks whether any of a player's pieces can capture on a position.
+        :param sq: Represents the bit position as an integer.
+        :param player: Represents the attacking player as an integer.
+        :return: True if the position is attacked and False otherwise.
+        """
+
+        pieces = self._pieces
+        mailbox = self._mailbox
+        base = player * 7
+        occupied = self._occupancy[BLUE] | self._occupancy[RED]
+
+        if PALACE_STEPS[sq] & (pieces[base + GENERAL] | pieces[base + GUARD]):
+            return True
+
+        if SOLDIER_ATTACKERS[player][sq] & pieces[base + SOLDIER]:
+            return True
+
+        horse = base + HORSE
+        for from_sq, leg in HORSE_ATTACKERS[sq]:
+            if mailbox[from_sq] == horse and mailbox[leg] is None:
+                return True
+
+        elephant = base + ELEPHANT
+        for from_sq, first, second in ELEPHANT_ATTACKERS[sq]:
+            if mailbox[from_sq] == elephant and mailbox[first] is None and mailbox[second] is None:
+                return True
+
+        # Chariots see the nearest piece on a ray and Cannons see the piece behind a screen that is not a Cannon.
+        cannon = base + CANNON
+        target_is_cannon = mailbox[sq] is not None and mailbox[sq] % 7 == CANNON
+        for direction, ray, ascending in SLIDING_RAYS[sq]:
+            blockers = ray & occupied
+            if not blockers:
+                continue
+            first = nearest(blockers, ascending)
+            code = mailbox[first]
+            if code == base + CHARIOT:
+                return True
+            if code % 7 == CANNON or target_is_cannon:
+                continue
+            blockers &= RAY_MASKS[first][direction]
+            if blockers and mailbox[nearest(blockers, ascending)] == cannon:
+                return True
+
+        return False
+
+    def generals_facing(self):
+
+        """
+        Checks whether the two Generals face each other on the same column with no piece between them.
+        :return: True if the Generals face each other and False otherwise.
+        """
+
+        blue = self.general_square(BLUE)
+        red = self.general_square(RED)
+        if blue is None or red is None or blue % COLUMNS != red % COLUMNS:
+            return False
+        between = RAY_MASKS[red][1] & ~RAY_MASKS[blue][1] & ~(1 << blue)
+        return not between & (self._occupancy[BLUE] | self._occupancy[RED])
+
+    def in_check(self, player):
+
+        """
+        Checks whether a player's General is attacked by the opposing player, or faces the opposing General when the
+        facing rule is on.
+        :param player: Represents the player as an integer.
+        :return: True if the player is in check and False otherwise.
+        """
+
+        general = self.general_square(player)
+        if general is None:
+            return False
+        if self._facing_rule and self.generals_facing():
+            return True
+        return self.is_attacked(general, 1 - player)
+
+    def make(self, from_sq, to_sq):
+
+        """
+        Moves the piece at a position to another position, capturing any piece there, and passes the turn. The move
+        is pushed on the history stack so it can be taken back with the unmake method.
+        :param from_sq: Represents the bit position the piece moves from as an integer.
+        :param to_sq: Represents the bit position the piece moves to as an integer.
+        :return: NONE
+        """
+
+        mailbox = self._mailbox
+        code = mailbox[from_sq]
+        captured = mailbox[to_sq]
+        move_mask = 1 << from_sq | 1 << to_sq
+
+        self._pieces[code] ^= move_mask
+        self._occupancy[code // 7] ^= move_mask
+        if captured is not None:
+            self._pieces[captured] ^= 1 << to_sq
+            self._occupancy[captured // 7] ^= 1 << to_sq
+
+        mailbox[to_sq] = code
+        mailbox[from_sq] = None
+        self._history.append((from_sq, to_sq, captured))
+        self._turn ^= 1
+
+    def make_pass(self):
+
+        """
+        Passes the turn without moving a piece. The pass is pushed on the history stack.
+        :return: NONE
+        """
+
+        self._history.append(None)
+        self._turn ^= 1
+
+    def unmake(self):
+
+        """
+        Takes back the last move or pass on the history stack.
+        :return: NONE
+        """
+
+        move = self._history.pop()
+        self._turn ^= 1
+        if move is None:
+            return
+
+        from_sq, to_sq, captured = move
+        mailbox = self._mailbox
+        code = mailbox[to_sq]
+        move_mask = 1 << from_sq | 1 << to_sq
+
+        self._pieces[code] ^= move_mask
+        self._occupancy[code // 7] ^= move_mask
+        if captured is not None:
+            self._pieces[captured] ^= 1 << to_sq
+            self._occupancy[captured // 7] ^= 1 << to_sq
+
+        mailbox[from_sq] = code
+        mailbox[to_sq] = captured
+
+    def is_legal(self, from_sq, to_sq):
+
+        """
+        Checks whether a move by the player to move is legal, meaning the piece belongs to that player, can reach the
+        position and does not leave the player's General in check.
+        :param from_sq: Represents the bit position the piece moves from as an integer.
+        :param to_sq: Represents the bit position the piece moves to as an integer.
+        :return: True if the move is legal and False otherwise.
+        """
+
+        code = self._mailbox[from_sq]
+        player = self._turn
+        if code is None or code // 7 != player:
+            return False
+        if not self.targets(from_sq) >> to_sq & 1:
+            return False
+
+        self.make(from_sq, to_sq)
+        legal = not self.in_check(player)
+        self.unmake()
+        return legal
+
+    def check_analysis(self, player):
+
+        """
+        Finds the pieces giving check to a player's General and the moves that could expose it, by walking the rays
+        from the General and looking up the Horses, Elephants and stepping pieces that can reach it. A move that is not
+        a General move, does not start on a risky position and does not end on a risky position cannot leave the
+        General in check when the player is not in check. The risky start positions are the pieces pinned in front of a
+        Chariot, the screens in front of a Cannon that would be left with one screen, and the legs of Horses and
+        Elephants aimed at the General. The risky end positions are the positions between the General and a Cannon,
+        where a piece could become a screen.
+        :param player: Represents the player as an integer.
+        :return: A list of (to mask, from mask) tuples with one tuple per piece giving check, where a move can only
+        stop that check if it ends on the to mask or starts on the from mask, followed by the risky start positions and
+        the risky end positions as masks.
+        """
+
+        general = self.general_square(player)
+        if general is None:
+            return [], 0, 0
+
+        pieces = self._pieces
+        mailbox = self._mailbox
+        enemy = (1 - player) * 7
+        occupied = self._occupancy[BLUE] | self._occupancy[RED]
+        checkers = []
+        risky_from = 0
+        risky_to = 0
+
+        # Pieces that step onto the General can only be stopped by capturing them.
+        steppers = PALACE_STEPS[general] & (pieces[enemy + GENERAL] | pieces[enemy + GUARD])
+        steppers |= SOLDIER_ATTACKERS[1 - player][general] & pieces[enemy + SOLDIER]
+        for sq in squares_of(steppers):
+            checkers.append((1 << sq, 0))
+
+        for sq, leg in HORSE_ATTACKERS[general]:
+            if mailbox[sq] == enemy + HORSE:
+                if mailbox[leg] is None:
+                    checkers.append((1 << sq | 1 << leg, 0))
+                else:
+                    risky_from |= 1 << leg
+
+        for sq, first, second in ELEPHANT_ATTACKERS[general]:
+            if mailbox[sq] == enemy + ELEPHANT:
+                legs = (mailbox[first] is not None) + (mailbox[second] is not None)
+                if legs == 0:
+                    checkers.append((1 << sq | 1 << first | 1 << second, 0))
+                elif legs == 1:
+                    risky_from |= (1 << first | 1 << second) & occupied
+
+        # Walks the first three pieces on every ray from the General.
+        cannons = pieces[enemy + CANNON]
+        for direction, ray, ascending in SLIDING_RAYS[general]:
+            blockers = ray & occupied
+            line = []
+            while blockers and len(line) < 3:
+                sq = nearest(blockers, ascending)
+                line.append(sq)
+                blockers &= RAY_MASKS[sq][direction]
+
+            # Every position up to the farthest enemy Cannon on the ray could become a screen.
+            ray_cannons = ray & cannons
+            if ray_cannons:
+                farthest = nearest(ray_cannons, not ascending)
+                risky_to |= ray ^ RAY_MASKS[farthest][direction]
+
+            if not line:
+                continue
+            between = ray ^ RAY_MASKS[line[0]][direction]
+            if mailbox[line[0]] == enemy + CHARIOT:
+                checkers.append((between, 0))
+            if len(line) > 1:
+                second = line[1]
+                if mailbox[second] == enemy + CHARIOT:
+                    risky_from |= 1 << line[0]
+                elif mailbox[second] == enemy + CANNON and mailbox[line[0]] % 7 != CANNON:
+                    checkers.append((ray ^ RAY_MASKS[second][direction], 1 << line[0]))
+            if len(line) > 2 and mailbox[line[2]] == enemy + CANNON:
+                risky_from |= 1 << line[0] | 1 << line[1]
+
+        # With the facing rule, the pieces between the Generals on the same column are risky too.
+        if self._facing_rule:
+            other = self.general_square(1 - player)
+            if other is not None and other % COLUMNS == general % COLUMNS:
+                low, high = min(general, other), max(general, other)
+                between = RAY_MASKS[low][1] & ~RAY_MASKS[high][1] & ~(1 << high)
+                if between & occupied:
+                    risky_from |= between
+                else:
+                    checkers.append((between, 0))
+
+        return checkers, risky_from, risky_to
+
+    def filter_legal(self, player, moves, first=False):
+
+        """
+        Keeps the moves that do not leave a player's General in check. The check_analysis method decides which moves
+        need to be tried: General moves and moves from or to a risky position are made and unmade, moves that cannot
+        stop every check are dropped without being tried and every other move is kept.
+        :param player: Represents the player as an integer.
+        :param moves: Represents a list of (from, to) bit position tuples of the player's moves.
+        :param first: Represents whether to stop at the first legal move as a boolean.
+        :return: A list of the legal (from, to) bit position tuples.
+        """
+
+        checkers, risky_from, risky_to = self.check_analysis(player)
+        general = self.general_square(player)
+        legal = []
+        for from_sq, to_sq in moves:
+            if from_sq != general:
+                if checkers:
+                    if not all(to_mask >> to_sq & 1 or from_mask >> from_sq & 1 for to_mask, from_mask in checkers):
+                        continue
+                elif not (risky_from >> from_sq & 1 or risky_to >> to_sq & 1):
+                    legal.append((from_sq, to_sq))
+                    if first:
+                        return legal
+                    continue
+
+            self.make(from_sq, to_sq)
+            in_check = self.in_check(player)
+            self.unmake()
+            if not in_check:
+                legal.append((from_sq, to_sq))
+                if first:
+                    return legal
+        return legal
+
+    def legal_moves(self, player):
+
+        """
+        Generates every move for a player that does not leave the player's General in check.
+        :param player: Represents the player as an integer.
+        :return: A list of (from, to) bit position tuples.
+        """
+
+        return self.filter_legal(player, self.generate_moves(player))
+
+    def legal_captures(self, player):
+
+        """
+        Generates every capture for a player that does not leave the player's General in check.
+        :param player: Represents the player as an integer.
+        :return: A list of (from, to) bit position tuples.
+        """
+
+        return self.filter_legal(player, self.generate_captures(player))
+
+    def has_legal_move(self, player):
+
+        """
+        Checks whether a player has at least one move that does not leave the player's General in check. Stops at the
+        first legal move found.
+        :param player: Represents the player as an integer.
+        :return: True if the player has a legal move and False otherwise.
+        """
+
+        return bool(self.filter_legal(player, self.generate_moves(player), True))
+
+    def generate_evasions(self, player):
+
+        """
+        Generates the moves that could get a player out of check, without checking that they do: the General's moves,
+        then the moves of the other pieces that capture a piece giving check, block its line or the leg of a Horse or
+        Elephant, or move a Cannon's screen away. Every other move leaves the General in check.
+        :param player: Represents the player as an integer.
+        :return: A generator of (from, to) bit position tuples.
+        """
+
+        checkers = self.check_analysis(player)[0]
+        general = self.general_square(player)
+        if general is not None:
+            for to_sq in squares_of(self.targets(general)):
+                yield general, to_sq
+
+        for from_sq in squares_of(self._occupancy[player]):
+            if from_sq == general:
+                continue
+            targets = self.targets(from_sq)
+            for to_mask, from_mask in checkers:
+                if not from_mask >> from_sq & 1:
+                    targets &= to_mask
+            for to_sq in squares_of(targets):
+                yield from_sq, to_sq
+
+    def is_checkmate(self, player):
+
+        """
+        Checks whether a player is checkmated by trying the moves from the generate_evasions method and stopping at
+        the first one that gets the player out of check.
+        :param player: Represents the player as an integer.
+        :return: True if the player is in check and has no move out of it and False otherwise.
+        """
+
+        if not self.in_check(player):
+            return False
+
+        for from_sq, to_sq in self.generate_evasions(player):
+            self.make(from_sq, to_sq)
+            in_check = self.in_check(player)
+            self.unmake()
+            if not in_check:
+                return False
+        return True
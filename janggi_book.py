@@ -0,0 +1,316 @@
+# Description: Opening book for the Janggi game. The BookBuilder class replays game records and counts the moves played
+# from every position of their first plies, and writes them to a binary file of fixed-width records sorted by position
+# key. The OpeningBook class maps such a file into memory with mmap and finds the moves of a position with a binary
+# search, so opening a book does not read the whole file and a lookup only reads the records it needs.
+#
+# Record format: position key (unsigned 64 bit), from position (unsigned 8 bit), to position (unsigned 8 bit), weight
+# (unsigned 16 bit), count (unsigned 32 bit), little-endian, 16 bytes per record.
+#
+# Game record format: one game per line, as the current and move to positions of every move separated by spaces,
+# optionally followed by the result BLUE_WON, RED_WON or DRAW. Lines starting with # are ignored.
+#
+# Usage: python janggi_book.py games.txt book.bin [plies]
+
+import mmap
+import struct
+import sys
+
+from janggi_game import JanggiGame
+from janggi_tables import SQUARE_NAMES
+
+
+RECORD = struct.Struct("<QBBHI")
+RECORD_SIZE = RECORD.size
+KEY = struct.Struct("<Q")
+
+# The weight a game adds to each of its moves for the player who made them, by whether that player won, drew or lost.
+WIN_WEIGHT = 2
+DRAW_WEIGHT = 1
+LOSS_WEIGHT = 0
+MAX_WEIGHT = 0xFFFF
+MAX_COUNT = 0xFFFFFFFF
+
+RESULTS = ("BLUE_WON", "RED_WON", "DRAW")
+
+
+def read_game_records(path):
+
+    """
+    Reads game records from a text file.
+    :param path: Represents the path of the file as a string.
+    :return: A list of (moves, result) tuples, with the moves as a list of (current position, move to position)
+    tuples of strings and the result as "BLUE_WON", "RED_WON", "DRAW" or None.
+    """
+
+    records = []
+    with open(path) as file:
+        for line in file:
+            names = line.split()
+            if not names or names[0].startswith("#"):
+                continue
+            result = None
+            if names[-1] in RESULTS:
+                result = names.pop()
+            records.append((list(zip(names[0::2], names[1::2])), result))
+    return records
+
+
+class BookBuilder:
+
+    """
+    Represents an opening book being built. This class is responsible for replaying game records, counting how often
+    each move was played from each position and how well it scored, and writing the book file.
+    """
+
+    def __init__(self, max_plies=16):
+
+        """
+        Initializes an empty book.
+        :param max_plies: Represents the number of moves of each game added to the book as an integer.
+        """
+
+        self._max_plies = max_plies
+        self._entries = {}
+
+    def get_size(self):
+
+        """
+        Gets the number of different moves in the book.
+        :return: The number of moves as an integer.
+        """
+
+        return len(self._entries)
+
+    def add_game(self, moves, result=None):
+
+        """
+        Replays the first moves of a game from the starting position and adds them to the book. Passes are replayed but
+        not added, since choose_move never plays one. The game stops being added at its first illegal move.
+        :param moves: Represents a list of (current position, move to position) tuples of strings.
+        :param result: Represents the result of the game as "BLUE_WON", "RED_WON", "DRAW" or None if unknown.
+        :return: The number of moves added as an integer.
+        """
+
+        game = JanggiGame()
+        added = 0
+        for cur_pos, move_pos in moves[:self._max_plies]:
+            player = game.get_player_turn()
+            key = game.position_key()
+            move = game.parse_move(cur_pos, move_pos)
+            if move is None or not game.make_move_idx(*move):
+                break
+            if move[0] == move[1]:
+                continue
+
+            if result == player + "_WON":
+                weight = WIN_WEIGHT
+            elif result is None or result == "DRAW":
+                weight = DRAW_WEIGHT
+            else:
+                weight = LOSS_WEIGHT
+            entry = self._entries.setdefault((key,) + move, [0, 0])
+            entry[0] += weight
+            entry[1] += 1
+            added += 1
+        return added
+
+    def add_games(self, records):
+
+        """
+        Adds every game of a list of game records to the book.
+        :param records: Represents a list of (moves, result) tuples as returned by read_game_records.
+        :return: NONE
+        """
+
+        for moves, result in records:
+            self.add_game(moves, result)
+
+    def write(self, path):
+
+        """
+        Writes the book to a file as fixed-width records sorted by position key and then by move.
+        :param path: Represents the path of the file as a string.
+        :return: The number of records written as an integer.
+        """
+
+        with open(path, "wb") as file:
+            for key, from_sq, to_sq in sorted(self._entries):
+                weight, count = self._entries[key, from_sq, to_sq]
+                file.write(RECORD.pack(key, from_sq, to_sq, min(weight, MAX_WEIGHT), min(count, MAX_COUNT)))
+        return len(self._entries)
+
+
+class OpeningBook:
+
+    """
+    Represents an opening book file mapped into memory. This class is responsible for finding the moves of a position
+    with a binary search over the sorted records and for choosing a book move for a game.
+    """
+
+    def __init__(self, path):
+
+        """
+        Opens a book file and maps it into memory.
+        :param path: Represents the path of the file as a string.
+        """
+
+        self._file = open(path, "rb")
+        self._map = None
+        self._size = 0
+        size = self._file.seek(0, 2)
+        if size % RECORD_SIZE:
+            self._file.close()
+            raise ValueError("Not an opening book file: " + str(path))
+        if size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._size = size // RECORD_SIZE
+
+    def __enter__(self):
+
+        """
+        Called when the book is used in a with statement.
+        :return: The book.
+        """
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        """
+        Called at the end of a with statement to close the book.
+        :return: NONE
+        """
+
+        self.close()
+
+    def get_size(self):
+
+        """
+        Gets the number of records in the book.
+        :return: The number of records as an integer.
+        """
+
+        return self._size
+
+    def close(self):
+
+        """
+        Unmaps and closes the book file.
+        :return: NONE
+        """
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._size = 0
+        self._file.close()
+
+    def find(self, key):
+
+        """
+        Finds the index of the first record of a position key with a binary search, reading only the keys of the
+        records it visits.
+        :param key: Represents the position key as an integer.
+        :return: The index of the first record whose key is not less than the key as an integer.
+        """
+
+        low = 0
+        high = self._size
+        while low < high:
+            middle = (low + high) // 2
+            if KEY.unpack_from(self._map, middle * RECORD_SIZE)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def lookup(self, key):
+
+        """
+        Gets the book moves of a position.
+        :param key: Represents the position key as an integer.
+        :return: A list of ((from, to), weight, count) tuples, with the positions as integers, in move order.
+        """
+
+        entries = []
+        index = self.find(key)
+        while index < self._size:
+            record_key, from_sq, to_sq, weight, count = RECORD.unpack_from(self._map, index * RECORD_SIZE)
+            if record_key != key:
+                break
+            entries.append(((from_sq, to_sq), weight, count))
+            index += 1
+        return entries
+
+    def probe(self, game):
+
+        """
+        Gets the book moves of the current position of a game.
+        :param game: Represents a JanggiGame object.
+        :return: A list of ((from, to), weight, count) tuples, with the positions as integers, in move order.
+        """
+
+        return self.lookup(game.position_key())
+
+    def choose_move(self, game, generator=None):
+
+        """
+        Chooses a book move for the current position of a game. With a random number generator the move is picked at
+        random in proportion to its weight, otherwise the move with the highest weight is picked. Moves that are not
+        legal in the game, which could only come from a position key collision, are skipped.
+        :param game: Represents a JanggiGame object.
+        :param generator: Represents a random.Random object, or None to always pick the highest weight.
+        :return: The move as a (current position, move to position) tuple of strings, or None if the position is not in
+        the book.
+        """
+
+        entries = self.probe(game)
+        if not entries:
+            return None
+
+        # Checks only the book moves by making and taking back each of them, instead of generating every legal move.
+        entries = [(move, weight) for move, weight, count in entries if self.is_legal(game, move)]
+        if not entries:
+            return None
+
+        if generator is None or not any(weight for move, weight in entries):
+            move = max(entries, key=lambda entry: entry[1])[0]
+        else:
+            move = generator.choices([move for move, weight in entries], [weight for move, weight in entries])[0]
+        return SQUARE_NAMES[move[0]], SQUARE_NAMES[move[1]]
+
+    def is_legal(self, game, move):
+
+        """
+        Checks whether a book move can be played in a game by making it and taking it back. Passes are not book moves.
+        :param game: Represents a JanggiGame object.
+        :param move: Represents a (from, to) tuple of board positions as integers.
+        :return: True if the move is legal and False otherwise.
+        """
+
+        if move[0] == move[1] or not game.make_move_idx(*move):
+            return False
+        game.unmake_move()
+        return True
+
+
+def main(argv):
+
+    """
+    Builds an opening book file from a file of game records and prints the number of records written.
+    :param argv: Represents the command line arguments as a list of strings.
+    :return: 0 if the book was written and 2 if the arguments are missing.
+    """
+
+    if len(argv) < 3:
+        print("Usage: python janggi_book.py games.txt book.bin [plies]")
+        return 2
+
+    builder = BookBuilder(int(argv[3]) if len(argv) > 3 else 16)
+    builder.add_games(read_game_records(argv[1]))
+    print("%d records written to %s" % (builder.write(argv[2]), argv[2]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
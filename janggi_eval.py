@@ -0,0 +1,97 @@
+# Description: Static evaluation of a Janggi position. A position is scored from BLUE's point of view as the material
+# and piece-square scores of every piece plus a mobility term, and the evaluate function turns that into a score for
+# the player to move. JanggiGame keeps the material and piece-square part up to date in initiate_move and keeps the
+# number of moves of each player up to date with its attack maps, so evaluate does not walk the pieces.
+
+from janggi_tables import BLUE, RED, HORSE, ELEPHANT, CHARIOT, CANNON, SOLDIER, ROWS, COLUMNS, SQUARES, PIECE_TYPES, \
+    in_palace
+
+
+# Standard Janggi material values in hundredths, indexed by piece type code. The General cannot be captured.
+PIECE_VALUES = (0, 300, 500, 300, 1300, 700, 200)
+
+# Score for each move a player's pieces can make.
+MOBILITY_WEIGHT = 4
+
+
+def build_piece_square_table(piece_type):
+
+    """
+    Builds the piece-square scores of a piece type for BLUE, which moves towards row 0. Soldiers gain for every row they
+    advance and more inside the opposing palace, Horses, Elephants and Cannons gain for being near the centre
+    columns and the middle of the board, Chariots gain for being on the centre column or in the opposing half, and the
+    General and Guards gain for staying near the middle of their palace.
+    :param piece_type: Represents the piece type code as an integer.
+    :return: A list with a score for every board position.
+    """
+
+    table = []
+    for sq in range(SQUARES):
+        row, column = divmod(sq, COLUMNS)
+        centre = 4 - abs(column - 4)
+        advance = ROWS - 1 - row
+
+        if piece_type == SOLDIER:
+            score = 0 if advance < 3 else 10 * (advance - 3) + 2 * centre
+            if row < 3 and in_palace(row, column):
+                score += 20
+        elif piece_type == HORSE or piece_type == ELEPHANT:
+            score = 4 * centre + 3 * min(advance, 6) - (15 if column in (0, 8) else 0)
+        elif piece_type == CANNON:
+            score = 3 * centre + 2 * min(advance, 5)
+        elif piece_type == CHARIOT:
+            score = 2 * centre + (15 if advance >= 5 else 0) + (10 if column == 4 else 0)
+        elif in_palace(row, column):
+            score = 10 if column == 4 else 0
+            score += 10 if row == 8 else 0
+        else:
+            score = 0
+        table.append(score)
+    return table
+
+
+def build_piece_square_tables():
+
+    """
+    Builds the piece-square scores of every piece type for both players. RED's tables are BLUE's tables turned around,
+    since RED moves towards row 9.
+    :return: A list indexed by player and piece type with a list of scores for every board position.
+    """
+
+    blue = [build_piece_square_table(piece_type) for piece_type in range(len(PIECE_TYPES))]
+    red = [[table[(ROWS - 1 - sq // COLUMNS) * COLUMNS + sq % COLUMNS] for sq in range(SQUARES)] for table in blue]
+    return [blue, red]
+
+
+PIECE_SQUARE_TABLES = build_piece_square_tables()
+
+# Material plus piece-square score of every player, piece type and position, from BLUE's point of view.
+PIECE_SCORES = [[[sign * (PIECE_VALUES[piece_type] + PIECE_SQUARE_TABLES[player][piece_type][sq])
+                  for sq in range(SQUARES)] for piece_type in range(len(PIECE_TYPES))]
+                for player, sign in ((BLUE, 1), (RED, -1))]
+
+
+def piece_score(player, piece_type, sq):
+
+    """
+    Gets the material and piece-square score of a piece from BLUE's point of view.
+    :param player: Represents the player code of the piece as an integer.
+    :param piece_type: Represents the piece type code as an integer.
+    :param sq: Represents the board position of the piece as an integer.
+    :return: The score as an integer, negative for RED's pieces.
+    """
+
+    return PIECE_SCORES[player][piece_type][sq]
+
+
+def evaluate(game):
+
+    """
+    Scores the position of a game for the player to move from the incrementally kept material and piece-square score
+    and the number of moves of each player.
+    :param game: Represents a JanggiGame object.
+    :return: The score as an integer, positive if the player to move is ahead.
+    """
+
+    score = game.get_score() + MOBILITY_WEIGHT * (game.mobility(BLUE) - game.mobility(RED))
+    return score if game.get_player_turn() == "BLUE" else -score
@@ -6,28 +6,43 @@
 # in check cannot make a move to get their general out of check. If checkmate occurs on a player's general, the
 # opposing player wins and the game is over.
 
+from collections import OrderedDict
+
+from janggi_bitboard import BitboardBoard, squares_of
+from janggi_eval import piece_score
+from janggi_tables import PLAYERS, PLAYER_CODES, PIECE_TYPES, GENERAL, GUARD, HORSE, ELEPHANT, CHARIOT, CANNON, \
+    SOLDIER, SQUARES, POSITIONS, SQUARE_INDEXES, PALACE_MOVES, HORSE_MOVES, ELEPHANT_MOVES, SOLDIER_MOVES, RAYS, \
+    DEPENDENCIES, ZOBRIST_KEYS, ZOBRIST_TURN, square
+
 
 class Pieces:
 
     """
     Represents a game piece object. This class is responsible for initializing the game piece object with a player, a
-    starting row, starting column, and an empty list to store current moves in. This class will serve as a parent
-    function for each piece's class.
+    starting row, starting column, and an empty tuple to store current moves in. This class will serve as a parent
+    class for each piece's class. The player and piece type are stored as the small integer codes of the janggi_tables
+    module and the string getters convert them back. Current moves are stored as a sorted tuple of board positions,
+    with a set of the same positions built when a move is first looked up.
     """
 
+    __slots__ = ("_player_code", "_row", "_column", "_current_moves", "_move_set")
+    _type_code = None
+    _names = ()
+
     def __init__(self, player, column, row):
 
         """
-        Initializes the Pieces class with a player, column, row, and current moves list.
+        Initializes the Pieces class with a player, column, row, and current moves tuple.
         :param player: Represents a player that the game piece belongs to as a string.
         :param column: Represents the column on the board that the game piece is position at as an integer.
         :param row: Represents the row on the board that the game piece is position at as an integer.
         """
 
-        self._player = player
+        self._player_code = PLAYER_CODES[player]
         self._row = row
         self._column = column
-        self._current_moves = []
+        self._current_moves = ()
+        self._move_set = None
 
     def get_column(self):
 
@@ -73,413 +88,294 @@ class Pieces:
         :return: The player as a string.
         """
 
-        return self._player
-
-    def get_current_moves(self):
-
-        """
-        Gets the current moves that the piece object can make on the board.
-        :return: A list of lists containing move positions.
-        """
-
-        return self._current_moves
+        return PLAYERS[self._player_code]
 
-    def set_current_moves(self, moves_list):
+    def get_player_code(self):
 
         """
-        Removes the current moves from the move list and appends the new move list to the current move list for that
-        piece object.
-        :param moves_list: Represents a list containing lists of moves that the piece object can make on the board.
-        :return: NONE
+        Gets the code of the player that the piece object belongs to.
+        :return: The player code as an integer, BLUE or RED.
         """
 
-        self._current_moves = []
-        for move in moves_list:
-            self._current_moves.append(move)
-
-
-class General(Pieces):
+        return self._player_code
 
-    """
-    Represents a General type piece object. Inherits from the Pieces class. This sub class is responsible for
-    initializing the General game piece object with a piece type and piece name. Contains methods for getting data
-    members and creating the piece object name.
-    """
-
-    def __init__(self, player, column, row):
+    def get_type(self):
 
         """
-        Initializes the General game piece. Inherits from the Pieces class. Initializes the piece object type and
-        name. Name is abbreviated as with the player in which the belongs to and the piece name.
-        :param player: Represents a player that the game piece belongs to as a string.
-        :param column: Represents the column on the board that the game piece is position at as an integer.
-        :param row: Represents the row on the board that the game piece is position at as an integer.
+        Gets the piece type for the game piece object.
+        :return: Returns the piece type as a string.
         """
 
-        super().__init__(player, column, row)
-        self._type = "General"
-        self._name = self.create_name(player)
+        return PIECE_TYPES[self._type_code]
 
-    def get_type(self):
+    def get_type_code(self):
 
         """
-        Gets the piece type for a General game piece object.
-        :return: Returns the piece type as a sting.
+        Gets the code of the piece type for the game piece object.
+        :return: Returns the piece type code as an integer.
         """
 
-        return self._type
+        return self._type_code
 
     def get_name(self):
 
         """
-        Gets the name for a General game piece object.
-        :return: Returns the piece objects name as a sting.
+        Gets the name for the game piece object.
+        :return: Returns the piece objects name as a string.
         """
 
-        return self._name
+        return self._names[self._player_code]
 
     def create_name(self, player):
 
         """
-        Creates the name for the General piece object as a string. The name is an abbreviation of the player and the
-        piece type as a sting.
+        Creates the name for the piece object as a string. The name is an abbreviation of the player and the piece type.
         :param player: Represents the player that the piece object belongs to as a string.
-        :return: Returns the piece object's name as a sting.
+        :return: Returns the piece object's name as a string.
         """
 
-        if player == "BLUE":
-            return "bGn"
-        else:
-            return "rGn"
+        return self._names[PLAYER_CODES[player]]
 
+    def get_current_moves(self):
 
-class Guard(Pieces):
+        """
+        Gets the current moves that the piece object can make on the board as rows and columns.
+        :return: A tuple of (row, column) tuples containing move positions.
+        """
 
-    """
-    Represents a Guard type piece object. Inherits from the Pieces class. This sub class is responsible for
-    initializing the Guard game piece object with a piece type and piece name. Contains methods for getting data
-    members and creating the piece object name.
-    """
+        return tuple(POSITIONS[sq] for sq in self._current_moves)
 
-    def __init__(self, player, column, row):
+    def get_move_squares(self):
 
         """
-        Initializes the Guard game piece. Inherits from the Pieces class. Initializes the piece object type and
-        name. Name is abbreviated as with the player in which the belongs to and the piece name.
-        :param player: Represents a player that the game piece belongs to as a string.
-        :param column: Represents the column on the board that the game piece is position at as an integer.
-        :param row: Represents the row on the board that the game piece is position at as an integer.
+        Gets the current moves that the piece object can make on the board.
+        :return: A tuple of board positions as integers in ascending order.
         """
 
-        super().__init__(player, column, row)
-        self._type = "Guard"
-        self._name = self.create_name(player)
+        return self._current_moves
 
-    def get_type(self):
+    def has_move(self, sq):
 
         """
-        Gets the piece type for a Guard game piece object.
-        :return: Returns the piece type as a sting.
+        Checks whether a board position is in the current moves of the piece object.
+        :param sq: Represents a board position as an integer.
+        :return: True if the piece object can move to the position and False otherwise.
         """
 
-        return self._type
+        if self._move_set is None:
+            self._move_set = frozenset(self._current_moves)
+        return sq in self._move_set
 
-    def get_name(self):
+    def set_current_moves(self, moves_list):
 
         """
-        Gets the name for a Guard game piece object.
-        :return: Returns the piece objects name as a sting.
+        Replaces the current moves of the piece object with the given moves, sorted into ascending order.
+        :param moves_list: Represents a list of board positions as integers that the piece object can move to, without
+        duplicates.
+        :return: NONE
         """
 
-        return self._name
+        self._current_moves = tuple(sorted(moves_list))
+        self._move_set = None
 
-    def create_name(self, player):
+    def restore_current_moves(self, moves_list):
 
         """
-        Creates the name for the Guard piece object as a string. The name is an abbreviation of the player and the
-        piece type as a sting.
-        :param player: Represents the player that the piece object belongs to as a string.
-        :return: Returns the piece object's name as a sting.
+        Puts back a current moves tuple that was replaced by the set_current_moves method, or one taken from a
+        MoveCache, without sorting it again.
+        :param moves_list: Represents a tuple of board positions as integers in ascending order.
+        :return: NONE
         """
 
-        if player == "BLUE":
-            return "bGd"
-        else:
-            return "rGd"
+        self._current_moves = moves_list
+        self._move_set = None
 
 
-class Horses(Pieces):
+class General(Pieces):
 
     """
-    Represents a Horse type piece object. Inherits from the Pieces class. This sub class is responsible for
-    initializing the Horse game piece object with a piece type and piece name. Contains methods for getting data
-    members and creating the piece object name.
+    Represents a General type piece object. Inherits from the Pieces class. This sub class is responsible for
+    defining the General piece type code and the names of the General game piece objects of each player.
     """
 
-    def __init__(self, player, column, row):
-
-        """
-        Initializes the General game piece. Inherits from the Pieces class. Initializes the piece object type and
-        name. Name is abbreviated as with the player in which the belongs to and the piece name.
-        :param player: Represents a player that the game piece belongs to as a string.
-        :param column: Represents the column on the board that the game piece is position at as an integer.
-        :param row: Represents the row on the board that the game piece is position at as an integer.
-        """
-
-        super().__init__(player, column, row)
-        self._type = "Horse"
-        self._name = self.create_name(player)
+    __slots__ = ()
+    _type_code = GENERAL
+    _names = ("bGn", "rGn")
 
-    def get_type(self):
 
-        """
-        Gets the piece type for a Horse game piece object.
-        :return: Returns the piece type as a sting.
-        """
+class Guard(Pieces):
 
-        return self._type
+    """
+    Represents a Guard type piece object. Inherits from the Pieces class. This sub class is responsible for
+    defining the Guard piece type code and the names of the Guard game piece objects of each player.
+    """
 
-    def get_name(self):
+    __slots__ = ()
+    _type_code = GUARD
+    _names = ("bGd", "rGd")
 
-        """
-        Gets the name for a Horse game piece object.
-        :return: Returns the piece objects name as a sting.
-        """
-        return self._name
 
-    def create_name(self, player):
+class Horses(Pieces):
 
-        """
-        Creates the name for the Horse piece object as a string. The name is an abbreviation of the player and the
-        piece type as a sting.
-        :param player: Represents the player that the piece object belongs to as a string.
-        :return: Returns the piece object's name as a sting.
-        """
+    """
+    Represents a Horse type piece object. Inherits from the Pieces class. This sub class is responsible for
+    defining the Horse piece type code and the names of the Horse game piece objects of each player.
+    """
 
-        if player == "BLUE":
-            return "bHs"
-        else:
-            return "rHs"
+    __slots__ = ()
+    _type_code = HORSE
+    _names = ("bHs", "rHs")
 
 
 class Elephants(Pieces):
 
     """
     Represents a Elephant type piece object. Inherits from the Pieces class. This sub class is responsible for
-    initializing the Elephant game piece object with a piece type and piece name. Contains methods for getting data
-    members and creating the piece object name.
+    defining the Elephant piece type code and the names of the Elephant game piece objects of each player.
     """
 
-    def __init__(self, player, column, row):
-
-        """
-        Initializes the Elephant game piece. Inherits from the Pieces class. Initializes the piece object type and
-        name. Name is abbreviated as with the player in which the belongs to and the piece name.
-        :param player: Represents a player that the game piece belongs to as a string.
-        :param column: Represents the column on the board that the game piece is position at as an integer.
-        :param row: Represents the row on the board that the game piece is position at as an integer.
-        """
-
-        super().__init__(player, column, row)
-        self._type = "Elephant"
-        self._name = self.create_name(player)
-
-    def get_type(self):
-
-        """
-        Gets the piece type for a Elephant game piece object.
-        :return: Returns the piece type as a sting.
-        """
-
-        return self._type
-
-    def get_name(self):
-
-        """
-        Gets the name for a Elephant game piece object.
-        :return: Returns the piece objects name as a sting.
-        """
-
-        return self._name
-
-    def create_name(self, player):
-
-        """
-        Creates the name for the Elephant piece object as a string. The name is an abbreviation of the player and the
-        piece type as a sting.
-        :param player: Represents the player that the piece object belongs to as a string.
-        :return: Returns the piece object's name as a sting.
-        """
-
-        if player == "BLUE":
-            return "bEl"
-        else:
-            return "rEl"
+    __slots__ = ()
+    _type_code = ELEPHANT
+    _names = ("bEl", "rEl")
 
 
 class Chariots(Pieces):
 
     """
     Represents a Chariot type piece object. Inherits from the Pieces class. This sub class is responsible for
-    initializing the Chariot game piece object with a piece type and piece name. Contains methods for getting data
-    members and creating the piece object name.
+    defining the Chariot piece type code and the names of the Chariot game piece objects of each player.
     """
 
-    def __init__(self, player, column, row):
+    __slots__ = ()
+    _type_code = CHARIOT
+    _names = ("bCh", "rCh")
 
-        """
-        Initializes the Chariot game piece. Inherits from the Pieces class. Initializes the piece object type and
-        name. Name is abbreviated as with the player in which the belongs to and the piece name.
-        :param player: Represents a player that the game piece belongs to as a string.
-        :param column: Represents the column on the board that the game piece is position at as an integer.
-        :param row: Represents the row on the board that the game piece is position at as an integer.
-        """
 
-        super().__init__(player, column, row)
-        self._type = "Chariot"
-        self._name = self.create_name(player)
-
-    def get_type(self):
-
-        """
-        Gets the piece type for a Chariot game piece object.
-        :return: Returns the piece type as a sting.
-        """
+class Cannons(Pieces):
 
-        return self._type
+    """
+    Represents a Cannon type piece object. Inherits from the Pieces class. This sub class is responsible for
+    defining the Cannon piece type code and the names of the Cannon game piece objects of each player.
+    """
 
-    def get_name(self):
+    __slots__ = ()
+    _type_code = CANNON
+    _names = ("bCn", "rCn")
 
-        """
-        Gets the name for a Chariot game piece object.
-        :return: Returns the piece objects name as a sting.
-        """
 
-        return self._name
+class Soldiers(Pieces):
 
-    def create_name(self, player):
+    """
+    Represents a Soldier type piece object. Inherits from the Pieces class. This sub class is responsible for
+    defining the Soldier piece type code and the names of the Soldier game piece objects of each player.
+    """
 
-        """
-        Creates the name for the Chariot piece object as a string. The name is an abbreviation of the player and the
-        piece type as a sting.
-        :param player: Represents the player that the piece object belongs to as a string.
-        :return: Returns the piece object's name as a sting.
-        """
+    __slots__ = ()
+    _type_code = SOLDIER
+    _names = ("bSd", "rSd")
 
 
-        if player == "BLUE":
-            return "bCh"
-        else:
-            return "rCh"
+# The game piece classes indexed by piece type code.
+PIECE_CLASSES = (General, Guard, Horses, Elephants, Chariots, Cannons, Soldiers)
 
 
-class Cannons(Pieces):
+class MoveCache:
 
     """
-    Represents a Cannon type piece object. Inherits from the Pieces class. This sub class is responsible for
-    initializing the Cannon game piece object with a piece type and piece name. Contains methods for getting data
-    members and creating the piece object name.
+    Represents a bounded cache of piece moves keyed by position key, which can be shared by many games. This class is
+    responsible for storing the current moves of every game piece of a position, evicting the least recently used
+    position when the cache is full, and counting hits and misses.
     """
 
-    def __init__(self, player, column, row):
+    def __init__(self, max_size=100000):
 
         """
-        Initializes the Cannon game piece. Inherits from the Pieces class. Initializes the piece object type and
-        name. Name is abbreviated as with the player in which the belongs to and the piece name.
-        :param player: Represents a player that the game piece belongs to as a string.
-        :param column: Represents the column on the board that the game piece is position at as an integer.
-        :param row: Represents the row on the board that the game piece is position at as an integer.
+        Initializes an empty cache.
+        :param max_size: Represents the largest number of positions kept in the cache as an integer.
         """
 
-        super().__init__(player, column, row)
-        self._type = "Cannon"
-        self._name = self.create_name(player)
+        self._entries = OrderedDict()
+        self._max_size = max_size
+        self._hits = 0
+        self._misses = 0
 
-    def get_type(self):
+    def get(self, key):
 
         """
-        Gets the piece type for a Cannon game piece object.
-        :return: Returns the piece type as a sting.
+        Gets the moves stored for a position and marks the position as the most recently used.
+        :param key: Represents the position key as an integer.
+        :return: A dictionary of moves keyed by board position, or None if the position is not in the cache.
         """
 
-        return self._type
+        moves = self._entries.get(key)
+        if moves is None:
+            self._misses += 1
+            return None
 
-    def get_name(self):
-
-        """
-        Gets the name for a Cannon game piece object.
-        :return: Returns the piece objects name as a sting.
-        """
-        return self._name
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return moves
 
-    def create_name(self, player):
+    def put(self, key, moves):
 
         """
-        Creates the name for the Cannon piece object as a string. The name is an abbreviation of the player and the
-        piece type as a sting.
-        :param player: Represents the player that the piece object belongs to as a string.
-        :return: Returns the piece object's name as a sting.
+        Stores the moves for a position, evicting the least recently used position if the cache is full.
+        :param key: Represents the position key as an integer.
+        :param moves: Represents a dictionary of moves for every game piece keyed by board position.
+        :return: NONE
         """
 
-        if player == "BLUE":
-            return "bCn"
-        else:
-            return "rCn"
+        self._entries[key] = moves
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
 
+    def get_hits(self):
 
-class Soldiers(Pieces):
+        """
+        Gets the number of lookups that found their position.
+        :return: The number of hits as an integer.
+        """
 
-    """
-    Represents a Soldier type piece object. Inherits from the Pieces class. This sub class is responsible for
-    initializing the Soldier game piece object with a piece type and piece name. Contains methods for getting data
-    members and creating the piece object name.
-    """
+        return self._hits
 
-    def __init__(self, player, column, row):
+    def get_misses(self):
 
         """
-        Initializes the Soldier game piece. Inherits from the Pieces class. Initializes the piece object type and
-        name. Name is abbreviated as with the player in which the belongs to and the piece name.
-        :param player: Represents a player that the game piece belongs to as a string.
-        :param column: Represents the column on the board that the game piece is position at as an integer.
-        :param row: Represents the row on the board that the game piece is position at as an integer.
+        Gets the number of lookups that did not find their position.
+        :return: The number of misses as an integer.
         """
 
-        super().__init__(player, column, row)
-        self._type = "Soldier"
-        self._name = self.create_name(player)
+        return self._misses
 
-    def get_type(self):
+    def get_size(self):
 
         """
-        Gets the piece type for a Soldier game piece object.
-        :return: Returns the piece type as a sting.
+        Gets the number of positions in the cache.
+        :return: The number of positions as an integer.
         """
 
-        return self._type
+        return len(self._entries)
 
-    def get_name(self):
+    def get_max_size(self):
 
         """
-        Gets the name for a Soldier game piece object.
-        :return: Returns the piece objects name as a sting.
+        Gets the largest number of positions kept in the cache.
+        :return: The size limit as an integer.
         """
 
-        return self._name
+        return self._max_size
 
-    def create_name(self, player):
+    def clear(self):
 
         """
-        Creates the name for the Soldier piece object as a string. The name is an abbreviation of the player and the
-        piece type as a sting.
-        :param player: Represents the player that the piece object belongs to as a string.
-        :return: Returns the piece object's name as a sting.
+        Removes every position from the cache and resets the hit and miss counters.
+        :return: NONE
         """
 
-        if player == "BLUE":
-            return "bSd"
-        else:
-            return "rSd"
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
 
 
 class JanggiGame:
@@ -491,20 +387,50 @@ class JanggiGame:
     communicates with the pieces class in order to define each game piece.
     """
 
-    def __init__(self):
+    def __init__(self, verify_moves=False, backend="object", facing_rule=False, move_cache=None):
         """
         Initializes the data members for the JanggiGame class. This includes initializing the board, pieces, game state
         player turn, check, check count, and checkmate. The self._pieces data member calls a method which communicates
-        with the Pieces Class to define each piece. This method takes no parameters and does not return anything.
+        with the Pieces Class to define each piece. The current moves for every piece are generated once so that later
+        moves only need to update the pieces affected by them.
+        :param verify_moves: Represents whether every incremental move update is compared against a full update of
+        every piece as a boolean.
+        :param backend: Represents how moves are generated and validated as a string, either "object" to use the piece
+        objects on the board or "bitboard" to use a BitboardBoard.
+        :param facing_rule: Represents whether a move that leaves the two Generals facing each other on an open column
+        is illegal as a boolean.
+        :param move_cache: Represents a MoveCache, which may be shared with other games, used to look up the moves of
+        positions that were already reached, or None to always generate moves.
         """
 
         self._board = self.create_board()
-        self._pieces = self.create_pieces()
+        self._pieces = dict.fromkeys(self.create_pieces())
         self._game_state = "UNFINISHED"
         self._player_turn = "BLUE"
         self._check = False
         self._checkmate = False
         self._checked_coor = []
+        self._verify_moves = verify_moves
+        self._facing_rule = facing_rule
+        self._undo_stack = []
+        self._position_key = self.compute_position_key()
+        self._score = self.compute_score()
+        self._move_cache = move_cache
+
+        # The attack maps hold, for each player, the number of the player's game pieces that can move to each position
+        # and a mask of the positions with at least one. They are kept up to date from the current moves.
+        self._attack_counts = [[0] * SQUARES, [0] * SQUARES]
+        self._attack_masks = [0, 0]
+        self._mobility = [0, 0]
+
+        # The BitboardBoard is the backend for the "bitboard" backend and the scratch state that moves are tried on
+        # for the "object" backend.
+        if backend != "object" and backend != "bitboard":
+            raise ValueError("Unknown backend: " + str(backend))
+        self._backend = backend
+        self._bitboard = self.create_bitboard()
+        if backend == "object":
+            self.update_all_moves()
 
 
     def get_board(self):
@@ -533,8 +459,9 @@ class JanggiGame:
     def get_pieces(self):
 
         """
-        Gets a list of the current pieces.
-        :return: A list of the current pieces
+        Gets the current pieces. The pieces are kept as the keys of a dictionary so a captured piece can be removed and
+        put back in constant time.
+        :return: The current pieces as an iterable
         """
 
         return self._pieces
@@ -579,12 +506,111 @@ class JanggiGame:
         :return: NONE
         """
 
+        previous = self._player_turn
         if player == "RED":
             self._player_turn = "BLUE"
 
         if player == "BLUE":
             self._player_turn = "RED"
 
+        # Updates the position key when the player to move changes.
+        if self._player_turn != previous:
+            self._position_key ^= ZOBRIST_TURN
+
+
+    def position_key(self):
+
+        """
+        Gets the Zobrist key of the current position, which is updated with every move and change of turn. Equal
+        positions with the same player to move have equal keys.
+        :return: The position key as a 64 bit integer.
+        """
+
+        return self._position_key
+
+
+    def compute_position_key(self):
+
+        """
+        Computes the Zobrist key of the current position from scratch by combining the key of every game piece on its
+        position and the key for RED being the player to move.
+        :return: The position key as a 64 bit integer.
+        """
+
+        key = 0
+        for piece in self.get_pieces():
+            key ^= self.piece_key(piece, piece.get_row(), piece.get_column())
+        if self._player_turn == "RED":
+            key ^= ZOBRIST_TURN
+        return key
+
+
+    def get_score(self):
+
+        """
+        Gets the material and piece-square score of the current position from BLUE's point of view, which is updated
+        with every move.
+        :return: The score as an integer, positive if BLUE is ahead.
+        """
+
+        return self._score
+
+
+    def compute_score(self):
+
+        """
+        Computes the material and piece-square score of the current position from scratch by adding up the score of
+        every game piece on its position.
+        :return: The score as an integer, positive if BLUE is ahead.
+        """
+
+        score = 0
+        for piece in self.get_pieces():
+            score += self.piece_score(piece, piece.get_row(), piece.get_column())
+        return score
+
+
+    def piece_score(self, piece_obj, row, column):
+
+        """
+        Gets the material and piece-square score of a game piece standing on a position from BLUE's point of view.
+        :param piece_obj: Represents a game piece object.
+        :param row: Represents a row on the board as an integer.
+        :param column: Represents a column on the board as an integer.
+        :return: The score as an integer, negative for RED's game pieces.
+        """
+
+        return piece_score(piece_obj.get_player_code(), piece_obj.get_type_code(), square(row, column))
+
+
+    def mobility(self, player):
+
+        """
+        Gets the number of moves that a player's game pieces can make, which is updated with the attack maps. The
+        bitboard backend counts the targets of the player's pieces on the BitboardBoard instead.
+        :param player: Represents the code of the player as an integer.
+        :return: The number of moves as an integer.
+        """
+
+        if self._backend == "bitboard":
+            bitboard = self._bitboard
+            return sum(bin(bitboard.targets(sq)).count("1") for sq in squares_of(bitboard.get_occupancy(player)))
+
+        return self._mobility[player]
+
+
+    def piece_key(self, piece_obj, row, column):
+
+        """
+        Gets the Zobrist key of a game piece standing on a position.
+        :param piece_obj: Represents a game piece object.
+        :param row: Represents a row on the board as an integer.
+        :param column: Represents a column on the board as an integer.
+        :return: The key as a 64 bit integer.
+        """
+
+        return ZOBRIST_KEYS[piece_obj.get_player_code()][piece_obj.get_type_code()][square(row, column)]
+
 
     def get_check(self):
 
@@ -637,17 +663,128 @@ class JanggiGame:
     def is_in_check(self, player):
 
         """
-        Takes a a parameter the name of a player as a string. Calls self.get_check and return True if self._check
-        is equal to that player and False otherwise.
+        Takes a a parameter the name of a player as a string. Calls the in_check method with the player's code.
         :param player: Represents the player to check the check status for as a string.
         :return: Returns True if the player is in check and False otherwise.
         """
 
-        player = player.upper()
-        if player == self.get_check():
+        player = PLAYER_CODES.get(player.upper())
+        if player is None:
+            return False
+
+        return self.in_check(player)
+
+
+    def in_check(self, player):
+
+        """
+        Checks whether a player's General is attacked by looking up its position in the opposing player's attack map.
+        Facing Generals also count as check if the game was created with the facing rule. The bitboard backend asks
+        the BitboardBoard instead.
+        :param player: Represents the code of the player as an integer.
+        :return: True if the player is in check and False otherwise.
+        """
+
+        if self._backend == "bitboard":
+            return self._bitboard.in_check(player)
+
+        general_sq = self._bitboard.general_square(player)
+        if general_sq is not None and self._attack_masks[1 - player] >> general_sq & 1:
             return True
+        return self._facing_rule and self._bitboard.generals_facing()
+
+
+    def get_facing_rule(self):
+
+        """
+        Gets whether the game was created with the facing rule.
+        :return: True if Generals facing each other on an open column count as check and False otherwise.
+        """
+
+        return self._facing_rule
+
+
+    def general_square(self, player):
+
+        """
+        Gets the board position of a player's General, which a pass can be made on by moving the General onto its own
+        position.
+        :param player: Represents the code of the player as an integer.
+        :return: The board position as an integer, or None if the General is not on the board.
+        """
+
+        return self._bitboard.general_square(player)
+
 
-        return False
+    def attacked_squares(self, player):
+
+        """
+        Gets the positions that at least one of a player's game pieces can move to.
+        :param player: Represents the code of the player as an integer.
+        :return: A mask with a bit set for every attacked board position as an integer.
+        """
+
+        if self._backend == "bitboard":
+            mask = 0
+            for sq in squares_of(self._bitboard.get_occupancy(player)):
+                mask |= self._bitboard.targets(sq)
+            return mask
+
+        return self._attack_masks[player]
+
+
+    def attack_count(self, player, sq):
+
+        """
+        Gets the number of a player's game pieces that can move to a position.
+        :param player: Represents the code of the player as an integer.
+        :param sq: Represents a board position as an integer.
+        :return: The number of attacking game pieces as an integer.
+        """
+
+        if self._backend == "bitboard":
+            bitboard = self._bitboard
+            return sum(bitboard.targets(from_sq) >> sq & 1 for from_sq in squares_of(bitboard.get_occupancy(player)))
+
+        return self._attack_counts[player][sq]
+
+
+    def add_attacks(self, player, moves, count):
+
+        """
+        Adds a game piece's moves to or removes them from a player's attack map.
+        :param player: Represents the code of the player that the game piece belongs to as an integer.
+        :param moves: Represents a tuple of board positions as integers.
+        :param count: Represents 1 to add the moves and -1 to remove them.
+        :return: NONE
+        """
+
+        counts = self._attack_counts[player]
+        mask = self._attack_masks[player]
+        self._mobility[player] += count * len(moves)
+        for sq in moves:
+            counts[sq] += count
+            if counts[sq] == 0:
+                mask ^= 1 << sq
+            elif counts[sq] == 1 and count == 1:
+                mask |= 1 << sq
+        self._attack_masks[player] = mask
+
+
+    def replace_moves(self, piece_obj, moves):
+
+        """
+        Replaces the current moves of a game piece with moves that are already sorted, such as moves saved in an undo
+        record or a MoveCache, and updates the attack map of the piece's player.
+        :param piece_obj: Represents a game piece object.
+        :param moves: Represents a tuple of board positions as integers in ascending order.
+        :return: NONE
+        """
+
+        player = piece_obj.get_player_code()
+        self.add_attacks(player, piece_obj.get_move_squares(), -1)
+        piece_obj.restore_current_moves(moves)
+        self.add_attacks(player, moves, 1)
 
     def get_checked_coor(self):
 
@@ -719,44 +856,116 @@ class JanggiGame:
             self._board[row][column] = piece
 
 
-    def coordinates_conversion_dict(self, column, row):
+    def create_bitboard(self):
 
         """
-        Uses a dictionary to convert the current position and move to position from algebraic notion to list index positions for the
-        rows and columns.
-        :param column: Represents a column on the board for the current and move to positions.
-        :param row: Represents a row on the board for the current and move to positions.
-        :return: Returns the converted row and column positions as a list.
+        Creates a BitboardBoard holding the same pieces as the board. Used as the backend when the game is created
+        with the "bitboard" backend and as the scratch state for trying moves otherwise.
+        :return: A BitboardBoard with the current pieces and player turn.
         """
 
-        conversion_dict_1 = {
-            "a": 0,
-            "b": 1,
-            "c": 2,
-            "d": 3,
-            "e": 4,
-            "f": 5,
-            "g": 6,
-            "h": 7,
-            "i": 8
-        }
+        layout = []
+        for piece in self.get_pieces():
+            layout.append((piece.get_player_code(), piece.get_type_code(), square(piece.get_row(), piece.get_column())))
+
+        return BitboardBoard.from_layout(layout, PLAYER_CODES[self.get_player_turn()], self._facing_rule)
+
+
+    def get_state(self):
+
+        """
+        Gets a compact copy of the position and status of the game, which is quick to pickle and send to another
+        process. The layout holds one byte per board position, zero for an empty position and one more than the
+        bitboard code of the game piece otherwise. The undo history is not included.
+        :return: A (layout, player turn, game state, check, checked coordinates, checkmate) tuple, with the layout as
+        bytes.
+        """
+
+        layout = bytearray(SQUARES)
+        for piece in self.get_pieces():
+            code = piece.get_player_code() * 7 + piece.get_type_code()
+            layout[square(piece.get_row(), piece.get_column())] = code + 1
+        return (bytes(layout), self._player_turn, self._game_state, self._check, list(self._checked_coor),
+                self._checkmate)
+
+
+    def set_state(self, state):
+
+        """
+        Replaces the position and status of the game with a state from the get_state method. The game pieces, board,
+        position key, score, attack maps and BitboardBoard are built again and the undo history is cleared.
+        :param state: Represents a tuple returned by the get_state method.
+        :return: NONE
+        """
+
+        layout, player_turn, game_state, check, checked_coor, checkmate = state
+        pieces = []
+        for sq, code in enumerate(layout):
+            if code:
+                player, piece_type = divmod(code - 1, 7)
+                row, column = POSITIONS[sq]
+                pieces.append(PIECE_CLASSES[piece_type](PLAYERS[player], column, row))
+
+        self._board = self.create_board()
+        self.place_piece(pieces)
+        self._pieces = dict.fromkeys(pieces)
+        self._player_turn = player_turn
+        self._game_state = game_state
+        self._check = check
+        self._checked_coor = list(checked_coor)
+        self._checkmate = checkmate
+        self._undo_stack = []
+        self._position_key = self.compute_position_key()
+        self._score = self.compute_score()
+        self._attack_counts = [[0] * SQUARES, [0] * SQUARES]
+        self._attack_masks = [0, 0]
+        self._mobility = [0, 0]
+        self._bitboard = self.create_bitboard()
+        if self._backend == "object":
+            self.update_all_moves()
+
+
+    def __getstate__(self):
+
+        """
+        Called by pickle to get the data to save for the game. Only the options of the game and its compact state from
+        the get_state method are saved, so the game pieces' moves and the undo history are not pickled and a shared
+        MoveCache is left behind.
+        :return: A (verify moves, backend, facing rule, state) tuple.
+        """
+
+        return self._verify_moves, self._backend, self._facing_rule, self.get_state()
+
+
+    def __setstate__(self, data):
+
+        """
+        Called by pickle to restore a game from the data saved by the __getstate__ method. Only the options are set
+        here and set_state builds everything else once, without setting up the starting position first.
+        :param data: Represents a (verify moves, backend, facing rule, state) tuple.
+        :return: NONE
+        """
+
+        self._verify_moves, self._backend, self._facing_rule, state = data
+        self._move_cache = None
+        self.set_state(state)
+
+
+    def parse_move(self, cur_pos, move_pos):
 
-        conversion_dict_2 = {
-            "1": 0,
-            "2": 1,
-            "3": 2,
-            "4": 3,
-            "5": 4,
-            "6": 5,
-            "7": 6,
-            "8": 7,
-            "9": 8,
-            "10": 9
-        }
+        """
+        Called by the make_move method to convert the current and move to positions from algebraic notation into board
+        positions by looking them up in the SQUARE_INDEXES table, which also checks that they are on the board.
+        :param cur_pos: Represents the current position of a piece on the board in algebraic notation as a string.
+        :param move_pos: Represents the move to position of a piece on the board in algebraic notation as a string.
+        :return: The current and move to board positions as integers, or None if either position is not on the board.
+        """
 
-        column = conversion_dict_1[column]
-        row = conversion_dict_2[row]
-        return [row, column]
+        from_sq = SQUARE_INDEXES.get(cur_pos)
+        to_sq = SQUARE_INDEXES.get(move_pos)
+        if from_sq is None or to_sq is None:
+            return None
+        return from_sq, to_sq
 
 
     def make_move(self, cur_pos, move_pos):
@@ -764,42 +973,48 @@ class JanggiGame:
         """
         Takes parameters for the current piece's position on the board and the coordinates of the piece's destination.
         Moves current player's piece to its new position on the board. It is responsible for checking the game
-        status and returning True if the move was successful. This method calls other functions in order to check the
-        validity of the coordinates, convert current and move to coordinates, check if the player is skipping a turn,
-        and initiate the move.
+        status and returning True if the move was successful. This method calls the parse_move method to check and
+        convert the coordinates and the make_move_idx method to make the move.
         :param cur_pos: Represents the current position of a piece on the board in algebraic notation as a string.
         :param move_pos: Represents the move to position of a piece on the board in algebraic notation as a string.
         :return: True if the move was successful and False otherwise.
         """
 
-        # Checks if a player has won the game or if the game is still in play.
-        if self.get_game_state() != "UNFINISHED":
+        # Calls a method to convert the current and move to coordinates into board positions. Returns False if
+        # invalid.
+        move = self.parse_move(cur_pos, move_pos)
+        if move is None:
             return False
 
-        # Creates lists of the the current and move to coordinates. Converts '1', '0' to '10'.
-        board = self.get_board()
-        current = list(cur_pos)
-        if '1' and '0' in current:
-            current = [current[0], '10']
+        return self.make_move_idx(move[0], move[1])
+
 
-        move_to = list(move_pos)
-        if '1' and '0' in move_to:
-            move_to = [move_to[0], '10']
+    def make_move_idx(self, from_sq, to_sq):
+
+        """
+        Moves current player's piece from one board position to another, for callers that already have board positions
+        as integers. This method calls other functions in order to check if the player is skipping a turn and initiate
+        the move.
+        :param from_sq: Represents the current position of a piece as a board position from 0 to 89.
+        :param to_sq: Represents the move to position of a piece as a board position from 0 to 89.
+        :return: True if the move was successful and False otherwise.
+        """
+
+        # Checks if a player has won the game or if the game is still in play.
+        if self.get_game_state() != "UNFINISHED":
+            return False
 
-        # Calls a method to check if the current and move to coordinates are valid. Returns False if invalid.
-        coordinates_check = self.coordinates_check(current, move_to)
-        if not coordinates_check:
+        if not 0 <= from_sq < SQUARES or not 0 <= to_sq < SQUARES:
             return False
 
-        # Calls a method to convert the current and move to coordinates into list indexes and assigns them to a
-        # variable.
-        current = self.coordinates_conversion_dict(current[0], current[1])
-        move_to = self.coordinates_conversion_dict(move_to[0], move_to[1])
-        piece_obj = board[current[0]][current[1]]
+        # Converts the board positions into lists of a row and a column.
+        current = list(POSITIONS[from_sq])
+        move_to = list(POSITIONS[to_sq])
+        piece_obj = self._board[current[0]][current[1]]
 
         # Conditional statement that runs if the current and move to positions are the same. Calls a method to check
         # if a player is allowed to skip their turn and returns False if they cannot skip.
-        if current == move_to:
+        if from_sq == to_sq:
             skip_turn_check = self.skip_turn_check(piece_obj, current)
             if not skip_turn_check:
                 return False
@@ -809,50 +1024,59 @@ class JanggiGame:
         # if it is not a valid move.
         cur_check = self.cur_pos_check(piece_obj, current)
         move_check = self.move_pos_check(move_to)
-        if not cur_check and move_check:
+        if not cur_check or not move_check:
             return False
 
         # Calls a method to initiate the move. Returns False if the move cannot be made.
-        move_setup = self.move_check(piece_obj, current, move_to)
+        if self._backend == "bitboard":
+            move_setup = self.bitboard_move(piece_obj, current, move_to)
+        else:
+            move_setup = self.move_check(piece_obj, current, move_to)
         if not move_setup:
             return False
 
-        # Switches the player's turn if the move was successful and returns True.
+        # Switches the player's turn if the move was successful, updates the check status of the next player and
+        # returns True.
         self.set_player_turn(self.get_player_turn())
-        player = self.get_player_turn()
-
-        # Checks if checked general is checkmated
-        if self.get_check() == player:
-            if self.check_checkmate():
-                self.set_checkmate(self._player_turn)
-            self.set_check(player)
+        self.update_check(self.get_player_turn())
         return True
 
 
-    def coordinates_check(self, cur_pos, move_pos):
+    def update_check(self, player):
 
         """
-        Called by the make_moves method to check if the current and move to positions are within the range of the board.
-        :param cur_pos: Represents the current position of a game piece in algebraic notation as a string.
-        :param move_pos: Represents the current position of a game piece in algebraic notation as a string.
-        :return: True if the coordinates are valid and False otherwise.
+        Called by the make_move method after a move is made. Sets check on the player if their General is attacked, and
+        checkmate if they also have no legal move left. Clears the check status otherwise.
+        :param player: Represents the player whose turn is next as a string.
+        :return: NONE
         """
 
-        # Checks that the columns are in range on the board.
-        valid_coord = ["a", "b", "c", "d", "e", "f", "g", "h", "i"]
-        if cur_pos[0] not in valid_coord:
-            return False
+        player_code = PLAYER_CODES[player]
+        if not self.in_check(player_code):
+            self.set_check(False)
+            return
 
-        # Checks if the rows are in range on the board.
-        if int(cur_pos[1]) not in range(1, 11):
-            return False
+        self.set_check(player)
+        self.set_checked_coor(list(POSITIONS[self._bitboard.general_square(player_code)]))
+        if self.check_checkmate():
+            self.set_checkmate(player)
 
-        if move_pos[0] not in valid_coord:
-            return False
 
-        if int(move_pos[1]) not in range(1, 11):
+    def bitboard_move(self, piece_obj, cur_pos, move_to):
+
+        """
+        Called by the make_move method when the game uses the bitboard backend. Validates the move on the BitboardBoard,
+        including whether it leaves the player's General in check, and initiates it if it is legal.
+        :param piece_obj: Represents the game piece object at the current position.
+        :param cur_pos: Represents the current position of a game piece as a list.
+        :param move_to: Represents the move to position of a game piece as a list.
+        :return: True if the move was successful and False otherwise.
+        """
+
+        if not self._bitboard.is_legal(square(cur_pos[0], cur_pos[1]), square(move_to[0], move_to[1])):
             return False
 
+        self.initiate_move(piece_obj, cur_pos, move_to)
         return True
 
 
@@ -916,11 +1140,12 @@ class JanggiGame:
             return False
 
         # Checks if the current player is in check.
-        player = piece_obj.get_player()
-        if self.is_in_check(player):
+        if self.is_in_check(self.get_player_turn()):
             return False
 
         # Changes the players turn to the appropriate player if the current player can skip their turn.
+        self.push_undo(None, cur_pos, cur_pos, "   ")
+        self._bitboard.make_pass()
         if self.get_player_turn() == "RED":
             self.set_player_turn("RED")
             return True
@@ -941,712 +1166,522 @@ class JanggiGame:
         :return: Returns the valid moves for a game piece object as a list.
         """
 
-        piece_type = piece_obj.get_type()
-        player = piece_obj.get_player()
-
-        if piece_type == "General":
-            moves = self.general_and_guard_moves(piece_obj, player)
-            piece_obj.set_current_moves(moves)
+        piece_type = piece_obj.get_type_code()
+        player = piece_obj.get_player_code()
 
-        elif piece_type == "Guard":
+        if piece_type == GENERAL or piece_type == GUARD:
             moves = self.general_and_guard_moves(piece_obj, player)
-            piece_obj.set_current_moves(moves)
 
-        elif piece_type == "Horse":
+        elif piece_type == HORSE:
             moves = self.horse_moves(piece_obj, player)
-            piece_obj.set_current_moves(moves)
 
-        elif piece_type == "Elephant":
+        elif piece_type == ELEPHANT:
             moves = self.elephant_moves(piece_obj, player)
-            piece_obj.set_current_moves(moves)
 
-        elif piece_type == "Chariot":
+        elif piece_type == CHARIOT:
             moves = self.chariot_moves(piece_obj, player)
-            piece_obj.set_current_moves(moves)
 
-        elif piece_type == "Cannon":
+        elif piece_type == CANNON:
             moves = self.cannon_moves(piece_obj, player)
-            piece_obj.set_current_moves(moves)
 
-        elif piece_type == "Soldier":
+        else:
             moves = self.soldier_moves(piece_obj, player)
-            piece_obj.set_current_moves(moves)
 
+        self.add_attacks(player, piece_obj.get_move_squares(), -1)
+        piece_obj.set_current_moves(moves)
+        self.add_attacks(player, piece_obj.get_move_squares(), 1)
         return moves
 
 
     def move_check(self, piece_obj, cur_pos, move_to):
 
         """
-        Calls the current_moves method for the game piece object at the current position and checks if the desired
-        move to position is in that list. If True then the move is valid or False otherwise. Checks if the current
-        player is in check and calls the check_check method if True. If the player is not currently in check, the
-        current_moves method is called for each game piece still in play and updates its current moves.
+        Checks if the desired move to position is in the current moves of the game piece object at the current
+        position, which are kept up to date after every move. Tries the move on the scratch BitboardBoard and rejects
+        it if it leaves the player's own General in check. Otherwise the move is initiated and the current moves of
+        the game pieces affected by it are updated.
         :param piece_obj: Represents a game piece object.
         :param cur_pos: Represents the current position of a game piece as a list.
         :param move_to: Represents the move to position of a game piece as a list.
-        :return: True if the move is valid and the player is not in check or False otherwise.
+        :return: True if the move is valid and does not leave the player in check or False otherwise.
         """
 
         # Checks if the desired move is in the current piece object's move list.
-        current_piece_moves = self.current_moves(piece_obj)
-        if move_to not in current_piece_moves:
+        if not piece_obj.has_move(square(move_to[0], move_to[1])):
             return False
 
-        # Checks if the player is in check and calls the check_check method if True.
-        if self._check == self.get_player_turn():
+        # Checks that the move does not leave the player's General in check.
+        if not self._bitboard.is_legal(square(cur_pos[0], cur_pos[1]), square(move_to[0], move_to[1])):
             return False
 
-
-        # Initiates the player's desired move and updates the move list for each piece on the board.
+        # Initiates the player's desired move and updates the move list for each piece affected by the move.
         self.initiate_move(piece_obj, cur_pos, move_to)
-        for piece in self.get_pieces():
-            self.current_moves(piece)
+        self.update_moves(cur_pos, move_to)
 
         return True
 
     def check_checkmate(self):
 
         """
-        Called by the make_move method to check for a checkmate. Moves the piece to
-        the move to position, removes the game piece object from the pieces list if an opponent's piece was captured,
-        sets the previous position to "   " and sets the new row and column for the game piece object by calling
-        set methods in the Pieces class.
-        :param piece_obj: Represents a game piece object.
-        :param cur_pos: Represents the current position of a game piece as a list.
-        :param move_to: Represents the move to position of a game piece as a list.
+        Called by the update_check method to check for a checkmate of the player in check. The player is checkmated if
+        none of the General's moves, captures of a piece giving check, blocks or Cannon screen moves gets them out of
+        check. The BitboardBoard tries these evasions and stops at the first one that works.
         :return: True if a player is Checkmated, False if the player is only in Check
         """
 
-        gen_coor = self.get_checked_coor()
-        gen_obj = self._board[gen_coor[0]][gen_coor[1]]
-        gen_moves = self.current_moves(gen_obj)
+        return self._bitboard.is_checkmate(PLAYER_CODES[self.get_check()])
 
-        for move in gen_moves:
-            flag = False
-            self._check = False
-            self.initiate_move(gen_obj, gen_coor, move)
-            for piece in self.get_pieces():
-                self.current_moves(piece)
 
-            if self._check:
-                flag = True
+    def legal_moves(self, player):
 
-            self.initiate_move(gen_obj, move, gen_coor)
-            for piece in self.get_pieces():
-                self.current_moves(piece)
+        """
+        Finds every legal move for a player. The current moves of the player's game pieces are filtered by the
+        filter_legal method of the scratch BitboardBoard, which only makes and unmakes the moves that its check
+        analysis cannot decide. The game pieces and board are not changed.
+        :param player: Represents the player as a string.
+        :return: A list of (from, to) tuples of board positions as integers.
+        """
 
-            if not flag:
-                return False
+        player = player.upper()
+        if self._backend == "bitboard":
+            return self._bitboard.legal_moves(PLAYER_CODES[player])
 
-        return True
+        return self._bitboard.filter_legal(PLAYER_CODES[player], self.candidate_moves(player))
 
 
-    def initiate_move(self, piece_obj, cur_pos, move_to):
+    def has_legal_move(self, player):
 
         """
-        Called by the move_check and check_check methods to initiate the current player's move. Moves the piece to
-        the move to position, removes the game piece object from the pieces list if an opponent's piece was captured,
-        sets the previous position to "" and sets the new row and column for the game piece object by calling
-        set methods in the Pieces class.
-        :param piece_obj: Represents a game piece object.
-        :param cur_pos: Represents the current position of a game piece as a list.
-        :param move_to: Represents the move to position of a game piece as a list.
-        :return: NONE
+        Checks whether a player has at least one legal move. Stops at the first legal move found.
+        :param player: Represents the player as a string.
+        :return: True if the player has a legal move and False otherwise.
         """
 
-        move_to_piece = self._board[move_to[0]][move_to[1]]
-        if move_to_piece != "   ":
-            self._pieces.remove(move_to_piece)
-        self.set_board("   ", cur_pos[0], cur_pos[1])
-        self.set_board(piece_obj, move_to[0], move_to[1])
-        piece_obj.set_row(move_to[0])
-        piece_obj.set_column(move_to[1])
+        player = player.upper()
+        if self._backend == "bitboard":
+            return self._bitboard.has_legal_move(PLAYER_CODES[player])
 
+        return bool(self._bitboard.filter_legal(PLAYER_CODES[player], self.candidate_moves(player), True))
 
-    def general_check(self, move):
+
+    def capture_moves(self, player):
 
         """
-        Called by each of the piece's moves method to check if one of the moves in their moves list will put an
-        opposing player's General in check. If True, 1 is added to the check count and self._check is set to the
-        player in check.
-        :param move: Represents a list of all valid moves for a game piece.
-        :return: NONE
+        Finds every legal capture for a player. The current moves of the player's game pieces that end on a position
+        taken by an opposing piece are filtered by the filter_legal method of the scratch BitboardBoard. The game pieces
+        and board are not changed.
+        :param player: Represents the player as a string.
+        :return: A list of (from, to) tuples of board positions as integers.
         """
 
-        board = self.get_board()
-        row = move[0]
-        column = move[1]
-
-        # Called if a move can capture an opposing player's game piece.
-        if board[row][column] != "   ":
-            piece = board[row][column]
-            piece_type = piece.get_type()
-            player = piece.get_player()
+        player = player.upper()
+        player_code = PLAYER_CODES[player]
+        if self._backend == "bitboard":
+            return self._bitboard.legal_captures(player_code)
 
-            # Called if the game piece that can be captured is a General.
-            if piece_type == "General":
-                self.set_check(player)
-                self.set_checked_coor([row, column])
+        enemy = self._bitboard.get_occupancy(1 - player_code)
+        moves = []
+        for piece in self.get_pieces():
+            if piece.get_player_code() == player_code:
+                from_sq = square(piece.get_row(), piece.get_column())
+                for to_sq in piece.get_move_squares():
+                    if enemy >> to_sq & 1:
+                        moves.append((from_sq, to_sq))
+        return self._bitboard.filter_legal(player_code, moves)
 
 
-    def general_and_guard_moves(self, piece_obj, player):
+    def candidate_moves(self, player):
 
         """
-        Called by the current_moves method. Defines all possible movements that the General and Guard can make.
-        Calls the general_and_guard_moves_list for each of the game piece's possible movements. Uses the list created by
-        the general_and_guard_moves_list method and calls the general_checks method to see if any of the moves in the
-        list will put an opposing player's General in check.
-        :param piece_obj: Represents a game piece object.
-        :param player: Represents the player for the game piece object.
-        :return: A list of all valid moves for a game piece object.
+        Lists the moves in the current moves of a player's game pieces, which still have to be checked for leaving the
+        player's General in check.
+        :param player: Represents the player as a string.
+        :return: A list of (from, to) tuples of board positions as integers.
         """
-        row = piece_obj.get_row()
-        column = piece_obj.get_column()
+
         moves = []
+        for piece in self.get_pieces():
+            if piece.get_player() == player:
+                from_sq = square(piece.get_row(), piece.get_column())
+                for to_sq in piece.get_move_squares():
+                    moves.append((from_sq, to_sq))
+        return moves
 
-        # All possible move patterns for the General and Guard.
-        self.general_and_guard_moves_list(player, row, column, 0, 1, moves)
-        self.general_and_guard_moves_list(player, row, column, 0, -1, moves)
-        self.general_and_guard_moves_list(player, row, column, 1, 0, moves)
-        self.general_and_guard_moves_list(player, row, column, -1, 0, moves)
 
-        if (column == 4 and (row == 1 or row == 8)) or (column != 4 and (row != 1 and row != 8)):
-            self.general_and_guard_moves_list(player, row, column, 1, 1, moves)
-            self.general_and_guard_moves_list(player, row, column, -1, -1, moves)
-            self.general_and_guard_moves_list(player, row, column, 1, -1, moves)
-            self.general_and_guard_moves_list(player, row, column, -1, 1, moves)
+    def is_legal_move(self, player, from_sq, to_sq):
 
-        for move in moves:
-            self.general_check(move)
-        return moves
+        """
+        Makes a move on the scratch BitboardBoard, checks whether the player's General is in check and unmakes it.
+        :param player: Represents the player making the move as a string.
+        :param from_sq: Represents the board position the game piece moves from as an integer.
+        :param to_sq: Represents the board position the game piece moves to as an integer.
+        :return: True if the move does not leave the player in check and False otherwise.
+        """
 
+        bitboard = self._bitboard
+        bitboard.make(from_sq, to_sq)
+        legal = not bitboard.in_check(PLAYER_CODES[player])
+        bitboard.unmake()
+        return legal
 
-    def general_and_guard_moves_list(self, player, row, column, r, c, moves):
+
+    def update_all_moves(self):
 
         """
-        Called by the general_and_guard_moves method. This method defines what moves can be made for these game
-        pieces. It checks whether a move is valid based on these definitions and where friendly and opposing pieces
-        are positioned on the current board. If a move is valid it is appended to the moves list.
-        :param player: Represents the player that the piece object belongs to.
-        :param row: Represents the current of the game piece.
-        :param column: Represents the current column of the game piece.
-        :param r: Represents the movement along a row for the current game piece as an integer.
-        :param c: Represents the movement along a column for the current game piece as an integer.
-        :param moves: Represents a list of valid moves containing a list with a row and column.
-        :return: A list containing lists of valid moves.
+        Calls the current_moves method for every game piece still in play. This is the full update that the
+        update_moves method is verified against.
+        :return: NONE
         """
 
-        # Move parameters for a General or Guard in the red palace.
-        board = self.get_board()
-        if player == "RED":
-            # Checks that the move is in range of the board and palace.
-            if row + r in range(3) and column + c in range(3, 6):
-                if board[row + r][column + c] != "   ":
-                    occupant = board[row + r][column + c]
-                    occ_player = occupant.get_player()
-                    if occ_player == player:
-                        return moves
-                    moves.append([row + r, column + c])
-                moves.append([row + r, column + c])
-
-        # Move parameters for a General or Guard in the blue palace.
-        if player == "BLUE":
-            if row + r in range(7, 10) and column + c in range(3, 6):
-                if board[row + r][column + c] != "   ":
-                    occupant = board[row + r][column + c]
-                    occ_player = occupant.get_player()
-                    if occ_player == player:
-                        return moves
-                    moves.append([row + r, column + c])
-                moves.append([row + r, column + c])
-
-        return moves
+        for piece in self.get_pieces():
+            self.current_moves(piece)
 
 
-    def horse_moves(self, piece_obj, player):
+    def update_moves(self, cur_pos, move_to):
 
         """
-        Called by the current_moves method. Defines all possible movements that the Horse piece can make.
-        Calls the horse_moves_list for each of the game piece's possible movements. Uses the list created by
-        the horse_moves_list method and calls the general_checks method to see if any of the moves in the
-        list will put an opposing player's General in check.
-        :param piece_obj: Represents a game piece object.
-        :param player: Represents the player for the game piece object.
-        :return: A list of all valid moves for a game piece object.
+        Called by the move_check method after a move is initiated. Only the game pieces whose moves depend on the
+        vacated or occupied position have their current moves regenerated. Every other piece keeps its current moves.
+        The replaced moves are saved in the move's undo record so the unmake_move method can put them back. If the game
+        has a MoveCache and the position is in it, the affected pieces take their moves from the cache instead of
+        generating them, otherwise the moves of every piece are stored in the cache. Calls the verify_moves method if
+        the game was created with move verification.
+        :param cur_pos: Represents the position the game piece moved from as a list.
+        :param move_to: Represents the position the game piece moved to as a list.
+        :return: NONE
         """
 
-        row = piece_obj.get_row()
-        column = piece_obj.get_column()
-        moves = []
+        # Removes the moves of a captured game piece from its player's attack map.
+        captured = self._undo_stack[-1][3]
+        if captured != "   ":
+            self.add_attacks(captured.get_player_code(), captured.get_move_squares(), -1)
 
-        self.horse_moves_list(player, row, column, 0, 1, 1, 1, moves)
-        self.horse_moves_list(player, row, column, 0, -1, -1, -1, moves)
-        self.horse_moves_list(player, row, column, 0, 1, -1, 1, moves)
-        self.horse_moves_list(player, row, column, 0, -1, 1, -1, moves)
+        replaced_moves = self._undo_stack[-1][-1]
+        cached_moves = None
+        if self._move_cache is not None:
+            cached_moves = self._move_cache.get(self._position_key)
 
-        self.horse_moves_list(player, row, column, 1, 0, 1, 1, moves)
-        self.horse_moves_list(player, row, column, 1, 0, 1, -1, moves)
-        self.horse_moves_list(player, row, column, -1, 0, -1, -1, moves)
-        self.horse_moves_list(player, row, column, -1, 0, -1, 1, moves)
+        for piece in self.get_pieces():
+            if self.is_affected(piece, cur_pos) or self.is_affected(piece, move_to):
+                replaced_moves.append((piece, piece.get_move_squares()))
+                if cached_moves is not None:
+                    self.replace_moves(piece, cached_moves[square(piece.get_row(), piece.get_column())])
+                else:
+                    self.current_moves(piece)
 
-        for move in moves:
-            self.general_check(move)
-        return moves
+        if self._move_cache is not None and cached_moves is None:
+            self._move_cache.put(self._position_key, {
+                square(piece.get_row(), piece.get_column()): piece.get_move_squares()
+                for piece in self.get_pieces()
+            })
 
+        if self._verify_moves:
+            self.verify_moves()
 
-    def horse_moves_list(self, player, row, column, r, c, dr, dc, moves):
+
+    def is_affected(self, piece_obj, position):
 
         """
-        Called by the horse_moves method. This method defines what moves can be made for these game
-        pieces. It checks whether a move is valid based on these definitions and where friendly and opposing pieces
-        are positioned on the current board. If a move is valid it is appended to the moves list.
-        :param player: Represents the player that the piece object belongs to.
-        :param row: Represents the current of the game piece.
-        :param column: Represents the current column of the game piece.
-        :param r: Represents the movement along a row for the current game piece as an integer.
-        :param c: Represents the movement along a column for the current game piece as an integer.
-        :param dr: Represents the movement along a row for a diagonal move as an integer.
-        :param dc: Represents the movement along a column for a diagonal move as an integer.
-        :param moves: Represents a list of valid moves containing a list with a row and column.
-        :return: A list containing lists of valid moves.
+        Called by the update_moves method to check whether a change at a position on the board can change the moves of
+        a game piece. Looks up the positions that the piece's moves depend on in the DEPENDENCIES table, which holds
+        the rays of Chariots and Cannons, the legs and moves of Horses and Elephants and the steps of the other pieces.
+        :param piece_obj: Represents a game piece object.
+        :param position: Represents a position on the board as a list.
+        :return: True if the game piece's moves can be changed by the position and False otherwise.
         """
 
-        board = self.get_board()
-        # Checks if the move is in range of the board and that no piece is blocking the movement horizontally or
-        # vertically.
-        if row + r in range(10) and column + c in range(9):
-            first_row = row + r
-            first_col = column + c
-            if board[first_row][first_col] != "   ":
-                return moves
-
-            # Checks if the move is in range of the board and that the move is valid for the diagonal movement.
-            if first_row + dr in range(10) and first_col + dc in range(9):
-                second_row = first_row + dr
-                second_col = first_col + dc
-                if board[second_row][second_col] != "   ":
-                    occupant = board[second_row][second_col]
-                    occ_player = occupant.get_player()
-                    if occ_player == player:
-                        return moves
-                    moves.append([second_row, second_col])
-                moves.append([second_row, second_col])
-        return moves
+        sq = square(piece_obj.get_row(), piece_obj.get_column())
+        mask = DEPENDENCIES[piece_obj.get_player_code()][piece_obj.get_type_code()][sq]
+        return mask >> square(position[0], position[1]) & 1 == 1
 
 
-    def elephant_moves(self, piece_obj, player):
+    def verify_moves(self):
+
+        """
+        Called by the update_moves method when move verification is on. Saves the current moves of every game piece,
+        runs a full update of every piece and compares the results. Also compares the attack maps and mobility with
+        those counted from the current moves, and the score with a score computed from scratch.
+        :return: NONE
+        """
+
+        incremental = [(piece, piece.get_move_squares()) for piece in self.get_pieces()]
+        self.update_all_moves()
+
+        for piece, moves in incremental:
+            if moves != piece.get_move_squares():
+                raise AssertionError(
+                    "Incremental moves for " + piece.get_name() + " at " + str([piece.get_row(), piece.get_column()])
+                    + " were " + str(moves) + " but a full update gives " + str(piece.get_move_squares())
+                )
+
+        counts = [[0] * SQUARES, [0] * SQUARES]
+        for piece in self.get_pieces():
+            for sq in piece.get_move_squares():
+                counts[piece.get_player_code()][sq] += 1
+        for player in PLAYER_CODES.values():
+            mask = sum(1 << sq for sq in range(SQUARES) if counts[player][sq])
+            if counts[player] != self._attack_counts[player] or mask != self._attack_masks[player]:
+                raise AssertionError("Attack map for " + PLAYERS[player] + " does not match the current moves")
+            if sum(counts[player]) != self._mobility[player]:
+                raise AssertionError("Mobility for " + PLAYERS[player] + " does not match the current moves")
+
+        if self._score != self.compute_score():
+            raise AssertionError("Incremental score " + str(self._score) + " does not match " +
+                                 str(self.compute_score()))
+
+
+    def initiate_move(self, piece_obj, cur_pos, move_to):
 
         """
-        Called by the current_moves method. Defines all possible movements that the Elephant piece can make.
-        Calls the elephant_moves_list for each of the game piece's possible movements. Uses the list created by
-        the elephant_moves_list method and calls the general_checks method to see if any of the moves in the
-        list will put an opposing player's General in check.
+        Called by the move_check and bitboard_move methods to initiate the current player's move. Moves the piece to
+        the move to position, removes the game piece object from the pieces list if an opponent's piece was captured,
+        sets the previous position to "" and sets the new row and column for the game piece object by calling
+        set methods in the Pieces class. The move is also made on the BitboardBoard and recorded on the undo stack.
         :param piece_obj: Represents a game piece object.
-        :param player: Represents the player for the game piece object.
-        :return: A list of all valid moves for a game piece object.
+        :param cur_pos: Represents the current position of a game piece as a list.
+        :param move_to: Represents the move to position of a game piece as a list.
+        :return: NONE
         """
 
-        row = piece_obj.get_row()
-        column = piece_obj.get_column()
-        moves = []
+        self._bitboard.make(square(cur_pos[0], cur_pos[1]), square(move_to[0], move_to[1]))
+        move_to_piece = self._board[move_to[0]][move_to[1]]
+        self.push_undo(piece_obj, cur_pos, move_to, move_to_piece)
+        if move_to_piece != "   ":
+            del self._pieces[move_to_piece]
+            self._position_key ^= self.piece_key(move_to_piece, move_to[0], move_to[1])
+            self._score -= self.piece_score(move_to_piece, move_to[0], move_to[1])
+        self._position_key ^= self.piece_key(piece_obj, cur_pos[0], cur_pos[1])
+        self._position_key ^= self.piece_key(piece_obj, move_to[0], move_to[1])
+        self._score += self.piece_score(piece_obj, move_to[0], move_to[1]) - self.piece_score(piece_obj, cur_pos[0],
+                                                                                              cur_pos[1])
+        self.set_board("   ", cur_pos[0], cur_pos[1])
+        self.set_board(piece_obj, move_to[0], move_to[1])
+        piece_obj.set_row(move_to[0])
+        piece_obj.set_column(move_to[1])
 
-        self.elephant_moves_list(player, row, column, 0, 1, 1, 1, moves)
-        self.elephant_moves_list(player, row, column, 0, -1, 1, -1, moves)
-        self.elephant_moves_list(player, row, column, 1, 0, 1, 1, moves)
-        self.elephant_moves_list(player, row, column, 1, 0, 1, -1, moves)
 
-        self.elephant_moves_list(player, row, column, 0, 1, -1, 1, moves)
-        self.elephant_moves_list(player, row, column, 0, -1, -1, -1, moves)
-        self.elephant_moves_list(player, row, column, -1, 0, -1, -1, moves)
-        self.elephant_moves_list(player, row, column, -1, 0, -1, 1, moves)
+    def push_undo(self, piece_obj, cur_pos, move_to, move_to_piece):
 
-        for move in moves:
-            self.general_check(move)
-        return moves
+        """
+        Called by the initiate_move and skip_turn_check methods before a move or pass changes the game. Pushes an undo
+        record with the moved and captured game pieces, the player turn, the position key and score, and the check and
+        game status. The last item of the record is a list that the update_moves method fills with the current moves it
+        replaces.
+        :param piece_obj: Represents the game piece object that moves, or None for a pass.
+        :param cur_pos: Represents the current position of the game piece as a list.
+        :param move_to: Represents the move to position of the game piece as a list.
+        :param move_to_piece: Represents the game piece object captured at the move to position, or "   ".
+        :return: NONE
+        """
+
+        self._undo_stack.append((
+            piece_obj, cur_pos, move_to, move_to_piece, self._player_turn, self._position_key, self._score, self._check,
+            self._checked_coor, self._checkmate, self._game_state, []
+        ))
 
-    def elephant_moves_list(self, player, row, column, r, c, dr, dc, moves):
+
+    def unmake_move(self):
 
         """
-        Called by the elephant_moves method. This method defines what moves can be made for these game
-        pieces. It checks whether a move is valid based on these definitions and where friendly and opposing pieces
-        are positioned on the current board. If a move is valid it is appended to the moves list.
-        :param player: Represents the player that the piece object belongs to.
-        :param row: Represents the current of the game piece.
-        :param column: Represents the current column of the game piece.
-        :param r: Represents the movement along a row for the current game piece as an integer.
-        :param c: Represents the movement along a column for the current game piece as an integer.
-        :param dr: Represents the movement along a row for a diagonal move as an integer.
-        :param dc: Represents the movement along a column for a diagonal move as an integer.
-        :param moves: Represents a list of valid moves containing a list with a row and column.
-        :return: A list containing lists of valid moves.
+        Takes back the last move or pass made with the make_move method. The moved game piece is put back, a captured
+        game piece is returned to the board and the pieces, the current moves replaced by the move are restored, and the
+        player turn, position key, score, check and game status are set back to what they were. No moves are
+        regenerated.
+        :return: True if a move was taken back and False if there was no move to take back.
         """
-        # Checks if the move is in range of the board and that no piece is blocking the movement horizontally or
-        # vertically.
-        board = self.get_board()
-        if row + r in range(10) and column + c in range(9):
-            first_row = row + r
-            first_col = column + c
-            if board[first_row][first_col] != "   ":
-                return moves
-
-            # Checks if the move is in range of the board and that no piece is blocking the movement diagonally.
-            if first_row + dr in range(10) and first_col + dc in range(9):
-                second_row = first_row + dr
-                second_col = first_col + dc
-                if board[second_row][second_col] != "   ":
-                    return moves
-
-                # Checks if the move is in range of the board and that the move is valid for the second diagonal
-                # movement.
-                if second_row + dr in range(10) and second_col + dc in range(9):
-                    third_row = second_row + dr
-                    third_col = second_col + dc
-                    if board[third_row][third_col] != "   ":
-                        occupant = board[third_row][third_col]
-                        occ_player = occupant.get_player()
-                        if occ_player == player:
-                            return moves
-                        moves.append([third_row, third_col])
-                    moves.append([third_row, third_col])
-        return moves
 
-    def chariot_moves(self, piece_obj, player):
+        if not self._undo_stack:
+            return False
+
+        piece_obj, cur_pos, move_to, move_to_piece, turn, position_key, score, check, checked_coor, checkmate, \
+            game_state, replaced_moves = self._undo_stack.pop()
+        self._bitboard.unmake()
+
+        if piece_obj is not None:
+            self.set_board(piece_obj, cur_pos[0], cur_pos[1])
+            self.set_board(move_to_piece, move_to[0], move_to[1])
+            piece_obj.set_row(cur_pos[0])
+            piece_obj.set_column(cur_pos[1])
+            if move_to_piece != "   ":
+                self._pieces[move_to_piece] = None
+                self.add_attacks(move_to_piece.get_player_code(), move_to_piece.get_move_squares(), 1)
+
+        for piece, moves in replaced_moves:
+            self.replace_moves(piece, moves)
+
+        self._player_turn = turn
+        self._position_key = position_key
+        self._score = score
+        self._check = check
+        self._checked_coor = checked_coor
+        self._checkmate = checkmate
+        self._game_state = game_state
+
+        if self._verify_moves and self._backend == "object":
+            self.verify_moves()
+        return True
+
+
+    def general_and_guard_moves(self, piece_obj, player):
 
         """
-        Called by the current_moves method. Defines all possible movements that the Chariot piece can make.
-        Calls the chariot_moves_list for each of the game piece's possible movements. Uses the list created by
-        the chariot_moves_list method and calls the general_checks method to see if any of the moves in the
-        list will put an opposing player's General in check.
+        Called by the current_moves method. Looks up every position the General or Guard can step to inside its palace
+        in the PALACE_MOVES table and calls the add_move method for each of them.
         :param piece_obj: Represents a game piece object.
-        :param player: Represents the player for the game piece object.
+        :param player: Represents the code of the player for the game piece object as an integer.
         :return: A list of all valid moves for a game piece object.
         """
 
-        row = piece_obj.get_row()
-        column = piece_obj.get_column()
         moves = []
+        for target in PALACE_MOVES[square(piece_obj.get_row(), piece_obj.get_column())]:
+            self.add_move(player, target, moves)
 
-        self.chariot_moves_list(player, row, column, 0, 1, moves)
-        self.chariot_moves_list(player, row, column, 0, -1, moves)
-        self.chariot_moves_list(player, row, column, 1, 0, moves)
-        self.chariot_moves_list(player, row, column, -1, 0, moves)
+        return moves
 
-        # Adds additional diagonal movement for the piece if the chariot is in a palace.
-        if row in range(3) or range(7, 10):
-            if column in range(3, 6):
-                self.chariot_palace_moves(player, row, column, 1, 1, moves)
-                self.chariot_palace_moves(player, row, column, -1, -1, moves)
-                self.chariot_palace_moves(player, row, column, 1, -1, moves)
-                self.chariot_palace_moves(player, row, column, -1, 1, moves)
 
-        for move in moves:
-            self.general_check(move)
+    def add_move(self, player, target, moves):
 
-        return moves
+        """
+        Called by the moves methods of the pieces that step to a position. Appends the position to the moves list if it
+        is empty or holds an opposing player's game piece.
+        :param player: Represents the code of the player that the piece object belongs to as an integer.
+        :param target: Represents the board position the game piece can step to as an integer.
+        :param moves: Represents a list of valid moves as board positions.
+        :return: A list of valid moves as board positions.
+        """
 
-    def chariot_moves_list(self, player, row, column, r, c, moves):
-
-        """
-        Called by the chariot_moves method. This method defines what moves can be made for these game
-        pieces. It checks whether a move is valid based on these definitions and where friendly and opposing pieces
-        are positioned on the current board. If a move is valid it is appended to the moves list.
-        :param player: Represents the player that the piece object belongs to.
-        :param row: Represents the current of the game piece.
-        :param column: Represents the current column of the game piece.
-        :param r: Represents the movement along a row for the current game piece as an integer.
-        :param c: Represents the movement along a column for the current game piece as an integer.
-        :param moves: Represents a list of valid moves containing a list with a row and column.
-        :return: A list containing lists of valid moves.
-        """
-
-        # Checks that the move is in range of the board and if it is valid.
-        if row + r in range(10) and column + c in range(9):
-            next_row = row + r
-            next_col = column + c
-            if self._board[next_row][next_col] != "   ":
-                occupant = self._board[next_row][next_col]
-                occ_player = occupant.get_player()
-                if occ_player != player:
-                    moves.append([next_row, next_col])
-                    return
-                return
-            else:
-                moves.append([next_row, next_col])
-                self.chariot_moves_list(player, next_row, next_col, r, c, moves)
-
-    def chariot_palace_moves(self, player, row, column, r, c, moves):
-
-        """
-        Called by the chariot_moves method. This method defines what moves can be made for these game
-        pieces if they are within a palace. It checks whether a move is valid based on these definitions and where
-        friendly and opposing pieces are positioned on the current board. If a move is valid it is appended to the
-        moves list.
-        :param player: Represents the player that the piece object belongs to.
-        :param row: Represents the current of the game piece.
-        :param column: Represents the current column of the game piece.
-        :param r: Represents the movement along a row for the current game piece as an integer.
-        :param c: Represents the movement along a column for the current game piece as an integer.
-        :param moves: Represents a list of valid moves containing a list with a row and column.
-        :return: A list containing lists of valid moves.
-        """
-
-        # Checks that the move is in range of the board and if it is valid.
-        if row + r in range(3) or range(7, 10):
-            if column + c in range(3, 6):
-                next_row = row + r
-                next_col = column + c
-                if self._board[next_row][next_col] != "   ":
-                    occupant = self._board[next_row][next_col]
-                    occ_player = occupant.get_player()
-                    if occ_player != player:
-                        moves.append([next_row, next_col])
-                        return
-                    return
-                else:
-                    moves.append([next_row, next_col])
-                    self.chariot_palace_moves(player, next_row, next_col, r, c, moves)
+        row, column = POSITIONS[target]
+        occupant = self._board[row][column]
+        if occupant == "   " or occupant.get_player_code() != player:
+            moves.append(target)
         return moves
 
-    def cannon_moves(self, piece_obj, player):
+
+    def horse_moves(self, piece_obj, player):
 
         """
-        Called by the current_moves method. Defines all possible movements that the Cannon piece can make.
-        Calls the cannon_moves_list for each of the game piece's possible movements. Uses the list created by
-        the cannon_moves_list method and calls the general_checks method to see if any of the moves in the
-        list will put an opposing player's General in check.
+        Called by the current_moves method. Looks up every (leg, target) pair for the Horse's position in the
+        HORSE_MOVES table and calls the add_move method for the target if the leg is empty.
         :param piece_obj: Represents a game piece object.
-        :param player: Represents the player for the game piece object.
+        :param player: Represents the code of the player for the game piece object as an integer.
         :return: A list of all valid moves for a game piece object.
         """
 
-        row = piece_obj.get_row()
-        column = piece_obj.get_column()
+        board = self.get_board()
         moves = []
-        jump_count = 0
-
-        self.cannon_moves_list(player, row, column, 1, 0, moves, jump_count)
-        self.cannon_moves_list(player, row, column, -1, 0, moves, jump_count)
-        self.cannon_moves_list(player, row, column, 0, 1, moves, jump_count)
-        self.cannon_moves_list(player, row, column, 0, -1, moves, jump_count)
-
-        # Adds additional diagonal movement for the piece if it is in a palace.
-        if row in range(0, 3) or row in range(7, 10):
-            if column in range(3, 6):
-                self.cannon_palace_list(player, row, column, 1, 1, moves, jump_count)
-                self.cannon_palace_list(player, row, column, -1, -1, moves, jump_count)
-                self.cannon_palace_list(player, row, column, 1, -1, moves, jump_count)
-                self.cannon_palace_list(player, row, column, -1, 1, moves, jump_count)
-
-        # Removes duplicates from the move list.
-        no_duplicates = []
-        for move in moves:
-            if move not in no_duplicates:
-                no_duplicates.append(move)
-
-        for move in no_duplicates:
-            self.general_check(move)
-
-        return no_duplicates
-
-
-    def cannon_moves_list(self, player, row, column, r, c, moves, jump_count):
-
-        """
-        Called by the cannon_moves method. This method defines what moves can be made for these game
-        pieces. It checks whether a move is valid based on these definitions and where friendly and opposing pieces
-        are positioned on the current board. If a move is valid it is appended to the moves list.
-        :param player: Represents the player that the piece object belongs to.
-        :param row: Represents the current of the game piece.
-        :param column: Represents the current column of the game piece.
-        :param r: Represents the movement along a row for the current game piece as an integer.
-        :param c: Represents the movement along a column for the current game piece as an integer.
-        :param moves: Represents a list of valid moves containing a list with a row and column.
-        :param jump_count: Represents a counter to keep track of whether or not the cannon piece has jumped a piece.
-        :return: A list containing lists of valid moves.
-        """
-
-        # Checks that the move is in range of the board and if it is valid.
-        if row + r in range(10) and column + c in range(9):
-            next_row = row + r
-            next_col = column + c
-
-            # Runs if the Cannon has already jumped a game piece.
-            if jump_count == 1:
-                if self._board[next_row][next_col] != "   ":
-                    occupant = self._board[next_row][next_col]
-                    piece_type = occupant.get_type()
-                    occ_player = occupant.get_player()
-                    # Checks if the game piece it encounters is a Cannon or a friendly.
-                    if piece_type == "Cannon" or occ_player == player:
-                        if self._board[row][column] != "   ":
-                            return
-                        moves.append([row, column])
-                        return
-                    moves.append([next_row, next_col])
-                    return
-                moves.append([next_row, next_col])
-
-            # Runs if the Cannon has not yet jumped a game piece.
-            if jump_count == 0 and self._board[next_row][next_col] != "   ":
-                occupant = self._board[next_row][next_col]
-                piece_type = occupant.get_type()
-                # Checks if encountered piece is a Cannon.
-                if piece_type == "Cannon":
-                    return
-                jump_count = 1
-
-            self.cannon_moves_list(player, next_row, next_col, r, c, moves, jump_count)
-
-
-    def cannon_palace_list(self, player, row, column, r, c, moves, jump_count):
-
-        """
-        Called by the cannon_moves method. This method defines what moves can be made for these game
-        pieces while in the palace. It checks whether a move is valid based on these definitions and where friendly
-        and opposing pieces are positioned on the current board. If a move is valid it is appended to the moves list.
-        :param player: Represents the player that the piece object belongs to.
-        :param row: Represents the current of the game piece.
-        :param column: Represents the current column of the game piece.
-        :param r: Represents the movement along a row for the current game piece as an integer.
-        :param c: Represents the movement along a column for the current game piece as an integer.
-        :param moves: Represents a list of valid moves containing a list with a row and column.
-        :param jump_count: Represents a counter to keep track of whether or not the cannon piece has jumped a piece.
-        :return: A list containing lists of valid moves.
-        """
-
-        # Checks that the move is in range of the board and if it is valid.
-        if row + r in range(3) or row + r in range(7, 10):
-            if column + c in range(3, 6):
-                next_row = row + r
-                next_col = column + c
-
-                # Runs if the Cannon has already jumped a game piece.
-                if jump_count == 1:
-                    if self._board[next_row][next_col] != "   ":
-                        occupant = self._board[next_row][next_col]
-                        occ_player = occupant.get_player()
-                        piece_type = occupant.get_type()
-                        if piece_type == "Cannon" or occ_player == player:
-                            if self._board[row][column] != "   ":
-                                return
-                            moves.append([row, column])
-                            return
-                        moves.append([next_row, next_col])
-                        return
-                    moves.append([next_row, next_col])
-
-                # Runs if the Cannon has not yet jumped a game piece.
-                if jump_count == 0 and self._board[next_row][next_col] != "   ":
-                    occupant = self._board[next_row][next_col]
-                    piece_type = occupant.get_type()
-                    if piece_type == "Cannon":
-                        return
-                    jump_count = 1
-
-                self.cannon_palace_list(player, next_row, next_col, r, c, moves, jump_count)
 
+        for leg, target in HORSE_MOVES[square(piece_obj.get_row(), piece_obj.get_column())]:
+            leg_row, leg_col = POSITIONS[leg]
+            if board[leg_row][leg_col] == "   ":
+                self.add_move(player, target, moves)
 
-    def soldier_moves(self, piece_obj, player):
+        return moves
+
+
+    def elephant_moves(self, piece_obj, player):
 
         """
-        Called by the current_moves method. Defines all possible movements that the Soldier piece can make.
-        Calls the soldier_moves_list for each of the game piece's possible movements. Uses the list created by
-        the soldier_moves_list method and calls the general_checks method to see if any of the moves in the
-        list will put an opposing player's General in check.
+        Called by the current_moves method. Looks up every (first leg, second leg, target) tuple for the Elephant's
+        position in the ELEPHANT_MOVES table and calls the add_move method for the target if both legs are empty.
         :param piece_obj: Represents a game piece object.
-        :param player: Represents the player for the game piece object.
+        :param player: Represents the code of the player for the game piece object as an integer.
         :return: A list of all valid moves for a game piece object.
         """
 
-        row = piece_obj.get_row()
-        column = piece_obj.get_column()
+        board = self.get_board()
         moves = []
 
-        # Defines specific movements for a Red Soldier
-        if player == "RED":
-            self.soldier_moves_list(player, row, column, 0, 1, moves)
-            self.soldier_moves_list(player, row, column, 0, -1, moves)
-            self.soldier_moves_list(player, row, column, 1, 0, moves)
+        for first, second, target in ELEPHANT_MOVES[square(piece_obj.get_row(), piece_obj.get_column())]:
+            first_row, first_col = POSITIONS[first]
+            second_row, second_col = POSITIONS[second]
+            if board[first_row][first_col] == "   " and board[second_row][second_col] == "   ":
+                self.add_move(player, target, moves)
 
-            # Defines specific movements if the game piece is in an opposing players palace.
-            if row in range(7, 10) and column in range(3, 6):
-                self.soldier_palace_list(player, row, column, 1, 1, moves)
-                self.soldier_palace_list(player, row, column, 1, -1, moves)
+        return moves
 
-        # Defines specific movements for a Blue Soldier
-        if player == "BLUE":
-            self.soldier_moves_list(player, row, column, 0, 1, moves)
-            self.soldier_moves_list(player, row, column, 0, -1, moves)
-            self.soldier_moves_list(player, row, column, -1, 0, moves)
+    def chariot_moves(self, piece_obj, player):
+
+        """
+        Called by the current_moves method. Defines all possible movements that the Chariot piece can make.
+        Walks the ray of each of the eight directions in the RAYS table, where the diagonal rays only exist along the
+        palace diagonals. Each empty position is a move, and the walk stops at the first game piece, which is a move
+        if it belongs to the opposing player.
+        :param piece_obj: Represents a game piece object.
+        :param player: Represents the code of the player for the game piece object as an integer.
+        :return: A list of all valid moves for a game piece object.
+        """
 
-            # Defines specific movements if the game piece is in an opposing players palace.
-            if row in range(0, 3) and column in range(3, 6):
-                self.soldier_palace_list(player, row, column, -1, -1, moves)
-                self.soldier_palace_list(player, row, column, -1, 1, moves)
+        board = self._board
+        moves = []
 
-        for move in moves:
-            self.general_check(move)
+        for ray in RAYS[square(piece_obj.get_row(), piece_obj.get_column())]:
+            for target in ray:
+                row, column = POSITIONS[target]
+                occupant = board[row][column]
+                if occupant == "   ":
+                    moves.append(target)
+                    continue
+                if occupant.get_player_code() != player:
+                    moves.append(target)
+                break
 
         return moves
 
-    def soldier_moves_list(self, player, row, column, r, c, moves):
+
+    def cannon_moves(self, piece_obj, player):
 
         """
-        Called by the soldier_moves method. This method defines what moves can be made for these game
-        pieces. It checks whether a move is valid based on these definitions and where friendly and opposing pieces
-        are positioned on the current board. If a move is valid it is appended to the moves list.
-        :param player: Represents the player that the piece object belongs to.
-        :param row: Represents the current of the game piece.
-        :param column: Represents the current column of the game piece.
-        :param r: Represents the movement along a row for the current game piece as an integer.
-        :param c: Represents the movement along a column for the current game piece as an integer.
-        :param moves: Represents a list of valid moves containing a list with a row and column.
-        :return: A list containing lists of valid moves.
+        Called by the current_moves method. Defines all possible movements that the Cannon piece can make.
+        Walks the ray of each of the eight directions in the RAYS table, where the diagonal rays only exist along the
+        palace diagonals. The Cannon must jump exactly one game piece that is not a Cannon. Each empty position after
+        the jumped piece is a move, and the walk stops at the next game piece, which is a move if it belongs to the
+        opposing player and is not a Cannon.
+        :param piece_obj: Represents a game piece object.
+        :param player: Represents the code of the player for the game piece object as an integer.
+        :return: A list of all valid moves for a game piece object.
         """
 
-        # Checks that the move is in range of the board and if it is valid.
-        board = self.get_board()
-        if row + r in range(10) and column + c in range(9):
-            if board[row + r][column + c] != "   ":
-                occupant = board[row + r][column + c]
-                occ_player = occupant.get_player()
-                if occ_player == player:
-                    return moves
-                moves.append([row + r, column + c])
-                return moves
-            moves.append([row + r, column + c])
+        board = self._board
+        moves = []
+
+        for ray in RAYS[square(piece_obj.get_row(), piece_obj.get_column())]:
+            jumped = False
+            for target in ray:
+                row, column = POSITIONS[target]
+                occupant = board[row][column]
+
+                # Looks for the game piece to jump, which cannot be a Cannon.
+                if not jumped:
+                    if occupant != "   ":
+                        if occupant.get_type_code() == CANNON:
+                            break
+                        jumped = True
+                    continue
+
+                if occupant == "   ":
+                    moves.append(target)
+                    continue
+                if occupant.get_type_code() != CANNON and occupant.get_player_code() != player:
+                    moves.append(target)
+                break
 
         return moves
 
 
-    def soldier_palace_list(self, player, row, column, r, c, moves):
+    def soldier_moves(self, piece_obj, player):
 
         """
-        Called by the soldier_moves method. This method defines what moves can be made for these game pieces while in
-        the opposing player's palace. It checks whether a move is valid based on these definitions and where friendly
-        and opposing pieces are positioned on the current board. If a move is valid it is appended to the moves list.
-        :param player: Represents the player that the piece object belongs to.
-        :param row: Represents the current of the game piece.
-        :param column: Represents the current column of the game piece.
-        :param r: Represents the movement along a row for the current game piece as an integer.
-        :param c: Represents the movement along a column for the current game piece as an integer.
-        :param moves: Represents a list of valid moves containing a list with a row and column.
-        :return: A list containing lists of valid moves.
+        Called by the current_moves method. Looks up the forward, sideways and palace diagonal steps for the Soldier's
+        player and position in the SOLDIER_MOVES table and calls the add_move method for each of them.
+        :param piece_obj: Represents a game piece object.
+        :param player: Represents the code of the player for the game piece object as an integer.
+        :return: A list of all valid moves for a game piece object.
         """
 
-        # Checks that the move is in range of the board and palace and if it is valid.
-        board = self.get_board()
-        if row + r in range(3) or row + r in range(7, 10):
-            if column + c in range(3, 6):
-                if board[row + r][column + c] != "   ":
-                    occupant = board[row + r][column + c]
-                    occ_player = occupant.get_player()
-                    if occ_player == player:
-                        return moves
-                    moves.append([row + r, column + c])
-                    return moves
-                moves.append([row + r, column + c])
+        moves = []
+        for target in SOLDIER_MOVES[player][square(piece_obj.get_row(), piece_obj.get_column())]:
+            self.add_move(player, target, moves)
+
         return moves
 
 
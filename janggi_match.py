@@ -0,0 +1,352 @@
+# Description: Self-play matches between two engines. The run_match function plays games between engine A and engine B
+# on the workers of a process pool, each opening twice with the colors swapped, writes every finished game to a log and
+# stops early once a sequential probability ratio test (SPRT) decides between two Elo hypotheses. The match_report
+# function gives the Elo difference of engine A with its 95% confidence interval.
+#
+# Engines are given as a name and options: "alphabeta" (janggi_search, options max_depth, max_nodes and time_ms, with
+# a time limit of DEFAULT_TIME_MS if none is given), "mcts" (janggi_mcts, options iterations and capacity) and
+# "random". On the command line they are written as name:option=value,option=value.
+#
+# Log format: the game records of janggi_book, so a log can be read with read_game_records or turned into an opening
+# book, with a comment line before every game giving its number and the color engine A played.
+#
+# Usage: python janggi_match.py engine_a engine_b [games] [workers] [log]
+
+import concurrent.futures
+import math
+import random
+import sys
+
+from janggi_game import JanggiGame
+from janggi_mcts import MCTS
+from janggi_search import Search, MAX_DEPTH, move_notation
+from janggi_tables import PLAYER_CODES, SQUARE_NAMES, square
+
+
+ENGINES = ("alphabeta", "mcts", "random")
+
+# A game that reaches this many moves is a draw.
+MAX_PLIES = 200
+
+# Time limit of an alphabeta engine given without a time, node or depth limit.
+DEFAULT_TIME_MS = 100
+
+# Default hypotheses and error rates of the SPRT: engine A is no stronger than ELO0 against engine A is ELO1 stronger.
+ELO0 = 0
+ELO1 = 20
+ALPHA = 0.05
+BETA = 0.05
+
+
+def parse_engine(text):
+
+    """
+    Converts an engine written as name:option=value,option=value into an engine.
+    :param text: Represents the engine as a string, such as "alphabeta:max_depth=2".
+    :return: A (name, options) tuple, with the options as a dictionary of integers.
+    """
+
+    name, _, options = text.partition(":")
+    if name not in ENGINES:
+        raise ValueError("Unknown engine: " + name)
+    settings = {}
+    for option in options.split(","):
+        if option:
+            key, _, value = option.partition("=")
+            settings[key] = int(value)
+    return name, settings
+
+
+def create_tree(engine, game, generator):
+
+    """
+    Creates the search tree an mcts engine keeps for the rest of a game, rooted at the game's current position.
+    :param engine: Represents the engine as a (name, options) tuple.
+    :param game: Represents a JanggiGame object.
+    :param generator: Represents the random.Random object of the game.
+    :return: An MCTS object, or None if the engine is not an mcts engine.
+    """
+
+    name, options = engine
+    if name != "mcts":
+        return None
+    return MCTS(game, options.get("capacity", 100000), seed=generator.randrange(1 << 30))
+
+
+def engine_move(engine, game, generator, tree=None):
+
+    """
+    Asks an engine for its move in the current position of a game.
+    :param engine: Represents the engine as a (name, options) tuple.
+    :param game: Represents a JanggiGame object.
+    :param generator: Represents the random.Random object of the game.
+    :param tree: Represents the MCTS object of an mcts engine, whose root must be the current position, or None to
+    search with a new tree.
+    :return: A (from, to) tuple of board positions as integers, or None if the player to move has no legal move.
+    """
+
+    name, options = engine
+    if name == "alphabeta":
+        time_ms = options.get("time_ms")
+        if time_ms is None and "max_nodes" not in options and "max_depth" not in options:
+            time_ms = DEFAULT_TIME_MS
+        return Search(game, time_ms, options.get("max_nodes"), options.get("max_depth", MAX_DEPTH)).run()
+    if name == "mcts":
+        if tree is None:
+            tree = create_tree(engine, game, generator)
+        return tree.search(iterations=options.get("iterations", 200))
+
+    moves = game.legal_moves(game.get_player_turn())
+    return generator.choice(moves) if moves else None
+
+
+def random_openings(count, plies=4, seed=0):
+
+    """
+    Creates opening lines by playing random legal moves from the starting position.
+    :param count: Represents the number of opening lines as an integer.
+    :param plies: Represents the number of moves of each line as an integer.
+    :param seed: Represents the seed of the random number generator as an integer.
+    :return: A list of opening lines, each a list of (current position, move to position) tuples of strings.
+    """
+
+    generator = random.Random(seed)
+    openings = []
+    for index in range(count):
+        game = JanggiGame()
+        line = []
+        for ply in range(plies):
+            move = generator.choice(game.legal_moves(game.get_player_turn()))
+            game.make_move_idx(*move)
+            line.append(move_notation(move))
+        openings.append(line)
+    return openings
+
+
+def play_game(number, engine_a, engine_b, opening, a_color, seed, max_plies=MAX_PLIES):
+
+    """
+    Plays one game between two engines from an opening line. Runs in a worker process of the match.
+    :param number: Represents the number of the game in the match as an integer.
+    :param engine_a: Represents engine A as a (name, options) tuple.
+    :param engine_b: Represents engine B as a (name, options) tuple.
+    :param opening: Represents the opening line as a list of (current position, move to position) tuples of strings.
+    :param a_color: Represents the player engine A plays, "BLUE" or "RED".
+    :param seed: Represents the seed of the game's random number generator as an integer.
+    :param max_plies: Represents the number of moves after which the game is a draw as an integer.
+    :return: A (number, engine A's color, score of engine A, moves, game state) tuple, with the score 1, 0.5 or 0
+    and the moves as a list of (current position, move to position) tuples of strings.
+    """
+
+    generator = random.Random(seed)
+    game = JanggiGame(backend="bitboard")
+    moves = []
+    for cur_pos, move_pos in opening:
+        game.make_move(cur_pos, move_pos)
+        moves.append((cur_pos, move_pos))
+
+    # An mcts engine keeps its tree for the whole game and moves its root down with every move of either player.
+    trees = {}
+    for engine, color in ((engine_a, a_color), (engine_b, "RED" if a_color == "BLUE" else "BLUE")):
+        trees[color] = create_tree(engine, game, generator)
+
+    while game.get_game_state() == "UNFINISHED" and len(moves) < max_plies:
+        player = game.get_player_turn()
+        engine = engine_a if player == a_color else engine_b
+        move = engine_move(engine, game, generator, trees[player])
+        if move is None:
+            # A player without a legal move who is not mated passes by moving one of their pieces onto its own
+            # position.
+            if game.in_check(PLAYER_CODES[player]):
+                break
+            sq = next(square(piece.get_row(), piece.get_column()) for piece in game.get_pieces()
+                      if piece.get_player() == player)
+            move = (sq, sq)
+        game.make_move_idx(*move)
+        moves.append((SQUARE_NAMES[move[0]], SQUARE_NAMES[move[1]]))
+        for tree in trees.values():
+            if tree is not None:
+                tree.advance(move)
+
+    state = game.get_game_state()
+    if state == "UNFINISHED":
+        score = 0.5
+    else:
+        score = 1.0 if state == a_color + "_WON" else 0.0
+    return number, a_color, score, moves, state
+
+
+def elo_difference(score):
+
+    """
+    Converts a score fraction into an Elo difference with the logistic Elo formula.
+    :param score: Represents the share of the points won, between 0 and 1, as a float.
+    :return: The Elo difference as a float, infinite for a score of 0 or 1.
+    """
+
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return -400 * math.log10(1 / score - 1)
+
+
+def expected_score(elo):
+
+    """
+    Converts an Elo difference into the expected share of the points.
+    :param elo: Represents the Elo difference as a float.
+    :return: The expected score between 0 and 1 as a float.
+    """
+
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def match_report(wins, draws, losses):
+
+    """
+    Computes the Elo difference of engine A and its 95% confidence interval from the game results, using the variance
+    of the per game scores.
+    :param wins: Represents the number of games engine A won as an integer.
+    :param draws: Represents the number of drawn games as an integer.
+    :param losses: Represents the number of games engine A lost as an integer.
+    :return: The Elo difference and the lower and upper ends of its confidence interval as floats.
+    """
+
+    games = wins + draws + losses
+    if not games:
+        return 0.0, -math.inf, math.inf
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = 1.96 * math.sqrt(variance / games)
+    return elo_difference(score), elo_difference(score - margin), elo_difference(score + margin)
+
+
+def sprt_llr(wins, draws, losses, elo0=ELO0, elo1=ELO1):
+
+    """
+    Computes the log-likelihood ratio of the SPRT hypothesis that engine A is elo1 stronger against the hypothesis that
+    it is elo0 stronger, with the normal approximation of the per game scores.
+    :param wins: Represents the number of games engine A won as an integer.
+    :param draws: Represents the number of drawn games as an integer.
+    :param losses: Represents the number of games engine A lost as an integer.
+    :param elo0: Represents the Elo difference of the null hypothesis as a float.
+    :param elo1: Represents the Elo difference of the alternative hypothesis as a float.
+    :return: The log-likelihood ratio as a float, zero before the first game.
+    """
+
+    games = wins + draws + losses
+    if not games:
+        return 0.0
+    score = (wins + draws / 2) / games
+
+    # The variance is estimated with half a game added to every result, so a match of only wins does not have a
+    # variance of zero.
+    variance = ((wins + 0.5) * (1 - score) ** 2 + (draws + 0.5) * (0.5 - score) ** 2 +
+                (losses + 0.5) * score ** 2) / (games + 1.5)
+    score0 = expected_score(elo0)
+    score1 = expected_score(elo1)
+    return (score1 - score0) * (2 * score - score0 - score1) * games / (2 * variance)
+
+
+def sprt_bounds(alpha=ALPHA, beta=BETA):
+
+    """
+    Computes the log-likelihood ratio bounds of the SPRT.
+    :param alpha: Represents the chance of accepting the alternative hypothesis when the null hypothesis holds.
+    :param beta: Represents the chance of accepting the null hypothesis when the alternative hypothesis holds.
+    :return: The lower and upper bounds as floats.
+    """
+
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def run_match(engine_a, engine_b, games, workers=None, openings=None, log_path=None, sprt=(ELO0, ELO1, ALPHA, BETA),
+              seed=0, max_plies=MAX_PLIES):
+
+    """
+    Plays a match between two engines on a process pool. Game 2n plays opening n with engine A as BLUE and game 2n + 1
+    plays it again with engine A as RED. Every finished game is written to the log, and once the SPRT log-likelihood
+    ratio leaves its bounds the games that have not started are cancelled.
+    :param engine_a: Represents engine A as a (name, options) tuple.
+    :param engine_b: Represents engine B as a (name, options) tuple.
+    :param games: Represents the largest number of games to play as an integer.
+    :param workers: Represents the number of worker processes as an integer, or None for one per CPU core.
+    :param openings: Represents a list of opening lines as returned by random_openings, or None or an empty list for
+    random ones.
+    :param log_path: Represents the path of the log file as a string, or None for no log.
+    :param sprt: Represents the SPRT's (elo0, elo1, alpha, beta) as a tuple, or None to play every game.
+    :param seed: Represents the seed of the games' random number generators as an integer.
+    :param max_plies: Represents the number of moves after which a game is a draw as an integer.
+    :return: A dictionary with the number of "games", "wins", "draws" and "losses" of engine A, its "elo" difference,
+    "elo_low" and "elo_high" ends of the confidence interval, the SPRT "llr" and the SPRT "result", "H0", "H1" or None.
+    """
+
+    if not openings:
+        openings = random_openings((games + 1) // 2, seed=seed)
+    if sprt is not None:
+        lower, upper = sprt_bounds(sprt[2], sprt[3])
+
+    results = [0, 0, 0]
+    llr = 0.0
+    decision = None
+    log = open(log_path, "w") if log_path is not None else None
+    try:
+        if log is not None:
+            log.write("# %s against %s\n" % (engine_a, engine_b))
+
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(play_game, number, engine_a, engine_b, openings[number // 2 % len(openings)],
+                                   "BLUE" if number % 2 == 0 else "RED", seed * 1000003 + number, max_plies)
+                       for number in range(games)]
+
+            for future in concurrent.futures.as_completed(futures):
+                if future.cancelled():
+                    continue
+                number, a_color, score, moves, state = future.result()
+                results[0 if score == 1 else 1 if score == 0.5 else 2] += 1
+                if log is not None:
+                    log.write("# game %d A=%s\n" % (number, a_color))
+                    log.write(" ".join(cur_pos + " " + move_pos for cur_pos, move_pos in moves))
+                    log.write(" " + (state if state != "UNFINISHED" else "DRAW") + "\n")
+
+                # Games that were already running when the test decided still count.
+                if sprt is not None:
+                    llr = sprt_llr(*results, elo0=sprt[0], elo1=sprt[1])
+                    if decision is None and (llr <= lower or llr >= upper):
+                        decision = "H0" if llr <= lower else "H1"
+                        for pending in futures:
+                            pending.cancel()
+    finally:
+        if log is not None:
+            log.close()
+
+    elo, elo_low, elo_high = match_report(*results)
+    return {"games": sum(results), "wins": results[0], "draws": results[1], "losses": results[2], "elo": elo,
+            "elo_low": elo_low, "elo_high": elo_high, "llr": llr, "result": decision}
+
+
+def main(argv):
+
+    """
+    Plays a match between two engines given on the command line and prints its results.
+    :param argv: Represents the command line arguments as a list of strings.
+    :return: 0 if the match was played and 2 if the arguments are missing.
+    """
+
+    if len(argv) < 3:
+        print("Usage: python janggi_match.py engine_a engine_b [games] [workers] [log]")
+        return 2
+
+    games = int(argv[3]) if len(argv) > 3 else 100
+    workers = int(argv[4]) if len(argv) > 4 else None
+    log_path = argv[5] if len(argv) > 5 else None
+    report = run_match(parse_engine(argv[1]), parse_engine(argv[2]), games, workers, log_path=log_path)
+    print("games %d  +%d =%d -%d" % (report["games"], report["wins"], report["draws"], report["losses"]))
+    print("elo %.1f  [%.1f, %.1f]" % (report["elo"], report["elo_low"], report["elo_high"]))
+    print("sprt llr %.2f  %s" % (report["llr"], report["result"] or "undecided"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,361 @@
+# Description: Monte Carlo tree search for a computer opponent, as an alternative to the alpha-beta search of
+# janggi_search. The MCTS class grows a tree of positions by UCT selection, scores new positions with short playouts of
+# random moves that prefer captures, and plays the most visited move. The tree is not made of node objects but kept in
+# parallel arrays of a fixed capacity allocated once, with the children of a node next to each other, and when a move is
+# played the subtree below it is moved to the front of the arrays and the rest is reused, so memory stays flat over a
+# long game.
+
+import math
+import random
+import time
+from array import array
+
+from janggi_eval import evaluate, PIECE_VALUES
+from janggi_search import move_notation
+from janggi_tables import PLAYER_CODES, POSITIONS
+
+
+# A node whose children have not been generated yet has this first child.
+UNEXPANDED = -1
+
+# Scale of the logistic function that turns an evaluation at the end of a playout into a result between 0 and 1.
+RESULT_SCALE = 400
+
+
+class MCTS:
+
+    """
+    Represents a Monte Carlo search tree over the positions of a game. This class is responsible for keeping the tree
+    in its arrays, running search iterations on the game, choosing the best move and moving the root of the tree down
+    when a move is played. The game is left as it was after every search.
+    """
+
+    def __init__(self, game, capacity=100000, exploration=1.4, playout_plies=20, capture_rate=0.7, seed=None):
+
+        """
+        Initializes the tree with the game's current position as its root.
+        :param game: Represents the JanggiGame object to search.
+        :param capacity: Represents the largest number of nodes in the tree as an integer.
+        :param exploration: Represents the exploration constant of the UCT formula as a float.
+        :param playout_plies: Represents the number of moves of a playout before it is scored by evaluate as an
+        integer.
+        :param capture_rate: Represents the chance that a playout move is a capture when one is available as a float.
+        :param seed: Represents the seed of the random number generator of the playouts, or None.
+        """
+
+        self._game = game
+        self._capacity = capacity
+        self._exploration = exploration
+        self._playout_plies = playout_plies
+        self._capture_rate = capture_rate
+        self._random = random.Random(seed)
+
+        # The tree. Node 0 is the root. The value of a node is the sum of the results of its playouts for the player
+        # who made the node's move.
+        self._visits = array("I", bytes(4 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._first_child = array("i", [UNEXPANDED]) * capacity
+        self._child_count = array("H", bytes(2 * capacity))
+        self._from_sq = array("B", bytes(capacity))
+        self._to_sq = array("B", bytes(capacity))
+        self._size = 1
+
+    def get_size(self):
+
+        """
+        Gets the number of nodes in the tree.
+        :return: The number of nodes as an integer.
+        """
+
+        return self._size
+
+    def get_capacity(self):
+
+        """
+        Gets the largest number of nodes the tree can hold.
+        :return: The capacity as an integer.
+        """
+
+        return self._capacity
+
+    def get_visits(self):
+
+        """
+        Gets the number of playouts below the root.
+        :return: The visit count as an integer.
+        """
+
+        return self._visits[0]
+
+    def get_root_moves(self):
+
+        """
+        Gets the statistics of the moves of the root, most visited first.
+        :return: A list of (move, visits, mean result) tuples, with the move as a (from, to) tuple of board positions
+        and the mean result for the player to move between 0 and 1.
+        """
+
+        moves = []
+        start = self._first_child[0]
+        if start != UNEXPANDED:
+            for node in range(start, start + self._child_count[0]):
+                visits = self._visits[node]
+                mean = self._values[node] / visits if visits else 0.0
+                moves.append(((self._from_sq[node], self._to_sq[node]), visits, mean))
+        moves.sort(key=lambda entry: entry[1], reverse=True)
+        return moves
+
+    def best_move(self):
+
+        """
+        Gets the most visited move of the root. A move found to mate, which leads to a node that was expanded without
+        children and only won its playouts, is picked whatever its visits.
+        :return: A (from, to) tuple of board positions as integers, or None if the root has no searched move.
+        """
+
+        start = self._first_child[0]
+        if start != UNEXPANDED:
+            for node in range(start, start + self._child_count[0]):
+                if self._first_child[node] != UNEXPANDED and not self._child_count[node] and \
+                        self._values[node] == self._visits[node]:
+                    return self._from_sq[node], self._to_sq[node]
+
+        moves = self.get_root_moves()
+        if not moves or not moves[0][1]:
+            return None
+        return moves[0][0]
+
+    def search(self, iterations=None, time_ms=None):
+
+        """
+        Runs search iterations until the number of iterations or the time limit is reached. Each iteration selects a
+        path from the root by UCT, expands its last node, runs a playout from there and adds the result to every node
+        of the path.
+        :param iterations: Represents the number of iterations as an integer, or None for no limit.
+        :param time_ms: Represents the time limit in milliseconds as an integer, or None for no time limit.
+        :return: The best move as a (from, to) tuple of board positions, or None if the player to move has no move.
+        """
+
+        if iterations is None and time_ms is None:
+            raise ValueError("A search needs an iteration limit or a time limit")
+
+        deadline = None if time_ms is None else time.perf_counter() + time_ms / 1000
+        count = 0
+        while iterations is None or count < iterations:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if not self.iterate():
+                break
+            count += 1
+        return self.best_move()
+
+    def iterate(self):
+
+        """
+        Runs one search iteration on the game and takes its moves back afterwards.
+        :return: True if the iteration was run and False if the root has no move to search.
+        """
+
+        game = self._game
+        node = 0
+        path = [0]
+
+        # Selection: follows the children with the best UCT score down to a node without searched children.
+        while self._first_child[node] != UNEXPANDED and self._child_count[node]:
+            node = self.select_child(node)
+            game.make_move_idx(self._from_sq[node], self._to_sq[node])
+            path.append(node)
+
+        # Expansion: a node that was visited before gets its children, and the first of them is searched.
+        if self._first_child[node] == UNEXPANDED and (self._visits[node] or node == 0):
+            self.expand(node)
+            if self._child_count[node]:
+                node = self._first_child[node]
+                game.make_move_idx(self._from_sq[node], self._to_sq[node])
+                path.append(node)
+
+        if len(path) == 1 and self._first_child[0] != UNEXPANDED and not self._child_count[0]:
+            return False
+
+        # The playout result is for the player to move at the end of the path, who did not make the last move.
+        result = 1.0 - self.playout()
+
+        for node in reversed(path):
+            self._visits[node] += 1
+            self._values[node] += result
+            result = 1.0 - result
+
+        for move in range(len(path) - 1):
+            game.unmake_move()
+        return True
+
+    def select_child(self, node):
+
+        """
+        Picks the child of a node with the highest UCT score, the mean result of the child plus an exploration bonus
+        that shrinks as the child is visited. A child that was never visited is picked first.
+        :param node: Represents the index of the node as an integer.
+        :return: The index of the child as an integer.
+        """
+
+        visits = self._visits
+        values = self._values
+        start = self._first_child[node]
+        scale = self._exploration * math.sqrt(math.log(max(visits[node], 1)))
+        best = start
+        best_score = -1.0
+        for child in range(start, start + self._child_count[node]):
+            child_visits = visits[child]
+            if not child_visits:
+                return child
+            score = values[child] / child_visits + scale / math.sqrt(child_visits)
+            if score > best_score:
+                best = child
+                best_score = score
+        return best
+
+    def expand(self, node):
+
+        """
+        Generates the children of a node from the legal moves of the game's current position, which must be the
+        node's position. A node is left without children if there is no room for them in the tree.
+        :param node: Represents the index of the node as an integer.
+        :return: NONE
+        """
+
+        game = self._game
+        moves = game.legal_moves(game.get_player_turn())
+        if self._size + len(moves) > self._capacity:
+            return
+
+        start = self._size
+        self._first_child[node] = start
+        self._child_count[node] = len(moves)
+        for child, (from_sq, to_sq) in enumerate(moves, start):
+            self._visits[child] = 0
+            self._values[child] = 0.0
+            self._first_child[child] = UNEXPANDED
+            self._child_count[child] = 0
+            self._from_sq[child] = from_sq
+            self._to_sq[child] = to_sq
+        self._size += len(moves)
+
+    def playout(self):
+
+        """
+        Plays random moves from the game's current position, picking a capture of the most valuable piece with the
+        capture rate when there is a capture, until the playout length is reached or the player to move has no move.
+        The moves are taken back afterwards.
+        :return: The result for the player to move at the start of the playout between 0 and 1.
+        """
+
+        game = self._game
+        player = game.get_player_turn()
+        generator = self._random
+        plies = 0
+        result = None
+        while plies < self._playout_plies:
+            turn = game.get_player_turn()
+            moves = game.legal_moves(turn)
+            if not moves:
+                # A mated player loses and a player without a move otherwise would have to pass, counted as a draw.
+                result = 0.0 if game.in_check(PLAYER_CODES[turn]) else 0.5
+                if turn != player:
+                    result = 1.0 - result
+                break
+
+            move = None
+            if generator.random() < self._capture_rate:
+                move = self.best_capture(moves)
+            if move is None:
+                move = generator.choice(moves)
+            game.make_move_idx(move[0], move[1])
+            plies += 1
+
+        if result is None:
+            score = evaluate(game)
+            if game.get_player_turn() != player:
+                score = -score
+            result = 1.0 / (1.0 + math.exp(-score / RESULT_SCALE))
+
+        for ply in range(plies):
+            game.unmake_move()
+        return result
+
+    def best_capture(self, moves):
+
+        """
+        Finds the move that captures the most valuable piece.
+        :param moves: Represents a list of (from, to) tuples of board positions as integers.
+        :return: The capture as a (from, to) tuple of board positions, or None if no move captures.
+        """
+
+        board = self._game.get_board()
+        best = None
+        best_value = -1
+        for move in moves:
+            row, column = POSITIONS[move[1]]
+            victim = board[row][column]
+            if victim != "   " and PIECE_VALUES[victim.get_type_code()] > best_value:
+                best = move
+                best_value = PIECE_VALUES[victim.get_type_code()]
+        return best
+
+    def advance(self, move):
+
+        """
+        Moves the root of the tree to the child of a move after the move has been made on the game. The child's subtree
+        is moved to the front of the arrays in breadth first order, which keeps the children of every node next to
+        each other, and the nodes of the other subtrees are freed for reuse. The tree starts again from a single root
+        if the move was not in the tree.
+        :param move: Represents the move that was made as a (from, to) tuple of board positions.
+        :return: The number of nodes kept as an integer.
+        """
+
+        root = None
+        start = self._first_child[0]
+        if start != UNEXPANDED:
+            for child in range(start, start + self._child_count[0]):
+                if (self._from_sq[child], self._to_sq[child]) == move:
+                    root = child
+
+        if root is None:
+            self._visits[0] = 0
+            self._values[0] = 0.0
+            self._first_child[0] = UNEXPANDED
+            self._child_count[0] = 0
+            self._size = 1
+            return 1
+
+        order = [root]
+        for node in order:
+            start = self._first_child[node]
+            if start != UNEXPANDED:
+                order.extend(range(start, start + self._child_count[node]))
+
+        new_index = {node: index for index, node in enumerate(order)}
+        first_child = [new_index[self._first_child[node]] if self._first_child[node] != UNEXPANDED and
+                       self._child_count[node] else self._first_child[node] for node in order]
+        for values in (self._visits, self._values, self._child_count, self._from_sq, self._to_sq):
+            values[:len(order)] = array(values.typecode, [values[node] for node in order])
+        self._first_child[:len(order)] = array("i", first_child)
+        self._size = len(order)
+        return self._size
+
+
+def mcts_move(game, time_ms, capacity=100000, seed=None):
+
+    """
+    Searches for the best move of the player to move in a game with a Monte Carlo tree search within a time limit.
+    :param game: Represents a JanggiGame object.
+    :param time_ms: Represents the time limit in milliseconds as an integer.
+    :param capacity: Represents the largest number of nodes in the tree as an integer.
+    :param seed: Represents the seed of the random number generator of the playouts, or None.
+    :return: The best move as a (current position, move to position) tuple of strings that can be passed to the
+    make_move method, or None if the player has no legal move.
+    """
+
+    move = MCTS(game, capacity, seed=seed).search(time_ms=time_ms)
+    if move is None:
+        return None
+    return move_notation(move)
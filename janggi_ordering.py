@@ -0,0 +1,137 @@
+# Description: Move ordering for the search. The MoveOrderer class sorts the legal moves of a JanggiGame so that the
+# moves most likely to cause a cutoff are searched first: the principal variation move, then captures by victim value
+# and attacker value (MVV-LVA), then the killer moves of the ply, then the other moves by their history score.
+
+from janggi_eval import PIECE_VALUES
+from janggi_tables import PIECE_TYPES, SQUARES, POSITIONS
+
+
+# Sort keys of the move classes. Captures are placed between PV_KEY and KILLER_KEY by victim and attacker value.
+PV_KEY = 1 << 30
+CAPTURE_KEY = 1 << 28
+KILLER_KEY = 1 << 26
+KILLERS_PER_PLY = 2
+
+# Largest history score. The whole table is halved when a score passes it, so quiet moves stay below the killers.
+MAX_HISTORY = 1 << 20
+
+
+class MoveOrderer:
+
+    """
+    Represents the move ordering state of a search. This class is responsible for sorting moves and for remembering the
+    quiet moves that caused cutoffs, both as killer moves of the ply they were made at and in a history table indexed
+    by piece type and target position.
+    """
+
+    def __init__(self, max_ply=64):
+
+        """
+        Initializes empty killer moves and history table.
+        :param max_ply: Represents the deepest ply that killer moves are kept for as an integer.
+        """
+
+        self._killers = [[] for ply in range(max_ply + 1)]
+        self._history = [[0] * SQUARES for piece_type in PIECE_TYPES]
+
+    def get_killers(self, ply):
+
+        """
+        Gets the killer moves of a ply, most recent first.
+        :param ply: Represents the number of moves made since the root as an integer.
+        :return: A list of (from, to) tuples of board positions as integers.
+        """
+
+        return self._killers[ply]
+
+    def get_history(self, piece_type, sq):
+
+        """
+        Gets the history score of a piece type moving to a position.
+        :param piece_type: Represents the piece type code as an integer.
+        :param sq: Represents the target board position as an integer.
+        :return: The history score as an integer.
+        """
+
+        return self._history[piece_type][sq]
+
+    def order(self, game, moves, ply, pv_move=None):
+
+        """
+        Sorts moves from the most to the least promising.
+        :param game: Represents the JanggiGame object the moves belong to.
+        :param moves: Represents a list of (from, to) tuples of board positions as integers.
+        :param ply: Represents the number of moves made since the root as an integer.
+        :param pv_move: Represents the move of the principal variation to search first, or None.
+        :return: A new list of the moves in search order.
+        """
+
+        board = game.get_board()
+        killers = self._killers[ply]
+        history = self._history
+        keys = {}
+        for move in moves:
+            row, column = POSITIONS[move[0]]
+            attacker = board[row][column].get_type_code()
+            row, column = POSITIONS[move[1]]
+            victim = board[row][column]
+            if move == pv_move:
+                keys[move] = PV_KEY
+            elif victim != "   ":
+                keys[move] = CAPTURE_KEY + PIECE_VALUES[victim.get_type_code()] * 16 - PIECE_VALUES[attacker] // 100
+            elif move in killers:
+                keys[move] = KILLER_KEY + KILLERS_PER_PLY - killers.index(move)
+            else:
+                keys[move] = history[attacker][move[1]]
+        return sorted(moves, key=keys.__getitem__, reverse=True)
+
+    def record_cutoff(self, game, move, ply, depth):
+
+        """
+        Remembers a move that caused a cutoff. Captures are already searched early and are not remembered. A quiet
+        move becomes the newest killer move of its ply and its history score grows with the square of the remaining
+        depth, up to MAX_HISTORY. Must be called while the move is not made.
+        :param game: Represents the JanggiGame object the move belongs to.
+        :param move: Represents a (from, to) tuple of board positions as integers.
+        :param ply: Represents the number of moves made since the root as an integer.
+        :param depth: Represents the remaining depth of the search at the move as an integer.
+        :return: NONE
+        """
+
+        board = game.get_board()
+        row, column = POSITIONS[move[1]]
+        if board[row][column] != "   ":
+            return
+
+        killers = self._killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLERS_PER_PLY:]
+
+        row, column = POSITIONS[move[0]]
+        scores = self._history[board[row][column].get_type_code()]
+        scores[move[1]] += depth * depth
+        if scores[move[1]] > MAX_HISTORY:
+            self.age()
+
+    def age(self):
+
+        """
+        Halves every history score, so the cutoffs of earlier searches count for less than the newest ones.
+        :return: NONE
+        """
+
+        for scores in self._history:
+            scores[:] = [score >> 1 for score in scores]
+
+    def clear(self):
+
+        """
+        Forgets the killer moves and history scores.
+        :return: NONE
+        """
+
+        for killers in self._killers:
+            killers.clear()
+        for scores in self._history:
+            scores[:] = [0] * SQUARES
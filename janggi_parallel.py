@@ -0,0 +1,222 @@
+# Description: Parallel search across several processes. The ParallelSearch class runs an iterative deepening search
+# whose root moves are split between the workers of a process pool. Every worker gets its own copy of the game once,
+# pickled as the compact state of JanggiGame.get_state, and then only receives the root move to search and its window.
+# The first root move of each iteration is searched alone to get a score the other moves have to beat, and the other
+# moves are then searched at the same time against that score.
+
+import concurrent.futures
+import os
+import time
+
+from janggi_search import Search, MATE_SCORE, MAX_DEPTH, move_notation
+
+
+# The game of the worker process, set once by init_worker.
+_worker_game = None
+
+
+def init_worker(game):
+
+    """
+    Called once in every worker process of the pool to keep the game the worker searches.
+    :param game: Represents the JanggiGame object, unpickled from its compact state.
+    :return: NONE
+    """
+
+    global _worker_game
+    _worker_game = game
+
+
+def search_root_move(move, depth, alpha, beta, deadline, pv):
+
+    """
+    Called in a worker process to search one root move of the worker's game.
+    :param move: Represents a (from, to) tuple of board positions as integers.
+    :param depth: Represents the depth of the search, including the move, as an integer.
+    :param alpha: Represents the score the player to move is already sure of as an integer.
+    :param beta: Represents the score the opposing player is already sure of as an integer.
+    :param deadline: Represents the time.time() value the search has to stop at as a float, or None for no time limit.
+    :param pv: Represents the principal variation starting with the move to search first, or None.
+    :return: A (move, score, principal variation, node count, stopped) tuple.
+    """
+
+    time_ms = None
+    if deadline is not None:
+        time_ms = max(0, (deadline - time.time()) * 1000)
+    search = Search(_worker_game, time_ms=time_ms)
+    score, line = search.search_move(move, depth, alpha, beta, pv)
+    return move, score, line, search.get_nodes(), search.is_stopped()
+
+
+class ParallelSearch:
+
+    """
+    Represents a search for the best move of the player to move in a game that splits the root moves between the
+    processes of a process pool. This class is responsible for running the iterative deepening, handing out the root
+    moves of each iteration and keeping the best move, score and principal variation of the deepest completed
+    iteration. The game itself is not changed.
+    """
+
+    def __init__(self, game, workers=None, time_ms=None, max_depth=MAX_DEPTH, callback=None):
+
+        """
+        Initializes the search with a game, the number of worker processes and the limits of the search.
+        :param game: Represents the JanggiGame object to search.
+        :param workers: Represents the number of worker processes as an integer, or None for one per CPU core.
+        :param time_ms: Represents the time limit in milliseconds as an integer, or None for no time limit.
+        :param max_depth: Represents the depth limit as an integer.
+        :param callback: Represents a function called with the depth, score, node count and principal variation after
+        every completed iteration, or None.
+        """
+
+        self._game = game
+        self._workers = workers or os.cpu_count() or 1
+        self._time_ms = time_ms
+        self._max_depth = max_depth
+        self._callback = callback
+        self._nodes = 0
+        self._best_move = None
+        self._score = 0
+        self._depth = 0
+        self._pv = []
+
+    def get_best_move(self):
+
+        """
+        Gets the best move found by the search.
+        :return: A (from, to) tuple of board positions as integers, or None if there is no legal move.
+        """
+
+        return self._best_move
+
+    def get_score(self):
+
+        """
+        Gets the score of the best move for the player to move.
+        :return: The score as an integer.
+        """
+
+        return self._score
+
+    def get_depth(self):
+
+        """
+        Gets the depth of the deepest completed iteration.
+        :return: The depth as an integer.
+        """
+
+        return self._depth
+
+    def get_nodes(self):
+
+        """
+        Gets the number of positions searched by all workers.
+        :return: The node count as an integer.
+        """
+
+        return self._nodes
+
+    def get_principal_variation(self):
+
+        """
+        Gets the principal variation found by the deepest completed iteration.
+        :return: A list of (from, to) tuples of board positions as integers.
+        """
+
+        return list(self._pv)
+
+    def run(self):
+
+        """
+        Runs iterative deepening searches of depth 1, 2, 3 and so on until a limit is reached. Each iteration searches
+        the best move of the previous iteration first and the other moves in the order of their previous scores. The
+        result of an iteration that is stopped early is thrown away.
+        :return: The best move as a (from, to) tuple of board positions, which is a pass if both positions are the
+        same, or None if the player is mated.
+        """
+
+        game = self._game
+        moves = game.legal_moves(game.get_player_turn()) + Search(game).pass_moves()
+        if not moves:
+            return None
+
+        deadline = None
+        if self._time_ms is not None:
+            deadline = time.time() + self._time_ms / 1000
+        self._best_move = moves[0]
+        self._nodes = 0
+        scores = dict.fromkeys(moves, 0)
+
+        with concurrent.futures.ProcessPoolExecutor(self._workers, initializer=init_worker,
+                                                    initargs=(game,)) as pool:
+            for depth in range(1, self._max_depth + 1):
+                moves.sort(key=lambda move: (move == self._best_move, scores[move]), reverse=True)
+                result = self.search_iteration(pool, moves, depth, deadline, scores)
+                if result is None:
+                    break
+
+                self._score, self._pv = result
+                self._best_move = self._pv[0]
+                self._depth = depth
+                if self._callback is not None:
+                    self._callback(depth, self._score, self._nodes, list(self._pv))
+
+                # Stops once a forced mate is found.
+                if abs(self._score) >= MATE_SCORE - MAX_DEPTH:
+                    break
+
+        return self._best_move
+
+    def search_iteration(self, pool, moves, depth, deadline, scores):
+
+        """
+        Searches every root move to a depth on the workers of a pool. The first move is searched with a full window.
+        The other moves are then searched at the same time with the first move's score as alpha, so a move that does
+        not beat it fails low quickly and a move that does gets its exact score.
+        :param pool: Represents the ProcessPoolExecutor whose workers hold the game.
+        :param moves: Represents the legal root moves in search order as a list.
+        :param depth: Represents the depth of the iteration as an integer.
+        :param deadline: Represents the time.time() value the search has to stop at as a float, or None.
+        :param scores: Represents a dictionary of root move scores, updated with the scores of this iteration.
+        :return: The best score and its principal variation, or None if the iteration was stopped.
+        """
+
+        pv = self._pv if self._pv and self._pv[0] == moves[0] else None
+        first = pool.submit(search_root_move, moves[0], depth, -MATE_SCORE - 1, MATE_SCORE + 1, deadline, pv)
+        move, best_score, best_pv, nodes, stopped = first.result()
+        self._nodes += nodes
+        if stopped:
+            return None
+        scores[move] = best_score
+
+        futures = [pool.submit(search_root_move, move, depth, best_score, MATE_SCORE + 1, deadline, None)
+                   for move in moves[1:]]
+        results = [future.result() for future in futures]
+
+        for move, score, line, nodes, stopped in results:
+            self._nodes += nodes
+            if stopped:
+                return None
+            scores[move] = score
+            if score > best_score:
+                best_score = score
+                best_pv = line
+        return best_score, best_pv
+
+
+def parallel_best_move(game, time_ms, workers=None, max_depth=MAX_DEPTH):
+
+    """
+    Searches for the best move of the player to move in a game within a time limit on several processes.
+    :param game: Represents a JanggiGame object.
+    :param time_ms: Represents the time limit in milliseconds as an integer.
+    :param workers: Represents the number of worker processes as an integer, or None for one per CPU core.
+    :param max_depth: Represents the depth limit as an integer.
+    :return: The best move as a (current position, move to position) tuple of strings that can be passed to the
+    make_move method, or None if the player has no legal move.
+    """
+
+    move = ParallelSearch(game, workers, time_ms, max_depth).run()
+    if move is None:
+        return None
+    return move_notation(move)
@@ -0,0 +1,114 @@
+# Description: Perft (performance test) for the Janggi move generators. The perft function walks every legal move path
+# of a given depth from a game position and counts the positions at the end of the paths. The counts from the starting
+# position are compared against the reference counts below, which checks that the move generators are exact, and the
+# time taken gives the speed of the move generators in nodes per second. Passing a turn is not counted as a move.
+#
+# Usage: python janggi_perft.py [depth] [object|bitboard]
+
+import sys
+import time
+
+from janggi_game import JanggiGame
+from janggi_tables import SQUARE_NAMES
+
+
+# Leaf node counts from the starting position for depths 1 to 4. The object and bitboard backends of JanggiGame and a
+# perft run directly on a BitboardBoard all give these counts.
+REFERENCE_COUNTS = {
+    1: 31,
+    2: 961,
+    3: 30506,
+    4: 967906,
+}
+
+
+def perft(game, depth):
+
+    """
+    Counts the positions reached by every legal move path of a given depth from the current position of a game. Each
+    move is made with the make_move_idx method and taken back with the unmake_move method, so the game is left as it
+    was.
+    :param game: Represents a JanggiGame object.
+    :param depth: Represents the number of moves in each path as an integer.
+    :return: The number of positions at the end of the paths as an integer.
+    """
+
+    if depth == 0:
+        return 1
+
+    moves = game.legal_moves(game.get_player_turn())
+    if depth == 1:
+        return len(moves)
+
+    nodes = 0
+    for from_sq, to_sq in moves:
+        if not game.make_move_idx(from_sq, to_sq):
+            raise AssertionError("Legal move " + SQUARE_NAMES[from_sq] + SQUARE_NAMES[to_sq] + " was rejected")
+        nodes += perft(game, depth - 1)
+        game.unmake_move()
+    return nodes
+
+
+def divide(game, depth):
+
+    """
+    Runs perft below each legal move of the current position separately, which narrows down a wrong node count to the
+    move whose subtree is wrong.
+    :param game: Represents a JanggiGame object.
+    :param depth: Represents the number of moves in each path, including the first move, as an integer.
+    :return: A dictionary of node counts keyed by moves in algebraic notation, such as "c7c6".
+    """
+
+    counts = {}
+    for from_sq, to_sq in game.legal_moves(game.get_player_turn()):
+        game.make_move_idx(from_sq, to_sq)
+        counts[SQUARE_NAMES[from_sq] + SQUARE_NAMES[to_sq]] = perft(game, depth - 1)
+        game.unmake_move()
+    return counts
+
+
+def run_perft(depth, backend="object"):
+
+    """
+    Runs perft from the starting position and times it.
+    :param depth: Represents the number of moves in each path as an integer.
+    :param backend: Represents the move generation backend of the game, either "object" or "bitboard".
+    :return: The number of nodes as an integer and the time taken in seconds as a float.
+    """
+
+    game = JanggiGame(backend=backend)
+    start = time.perf_counter()
+    nodes = perft(game, depth)
+    return nodes, time.perf_counter() - start
+
+
+def main(argv):
+
+    """
+    Runs perft for every depth up to the given depth and prints the node count, time, speed and whether the count
+    matches the reference count.
+    :param argv: Represents the command line arguments as a list of strings.
+    :return: 0 if every count matches its reference count and 1 otherwise.
+    """
+
+    max_depth = int(argv[1]) if len(argv) > 1 else 3
+    backend = argv[2] if len(argv) > 2 else "object"
+
+    status = 0
+    for depth in range(1, max_depth + 1):
+        nodes, seconds = run_perft(depth, backend)
+        reference = REFERENCE_COUNTS.get(depth)
+        if reference is None:
+            result = "no reference"
+        elif nodes == reference:
+            result = "ok"
+        else:
+            result = "expected " + str(reference)
+            status = 1
+        speed = nodes / seconds if seconds else 0
+        print("depth %d  nodes %10d  time %8.3fs  %10.0f nodes/s  %s" % (depth, nodes, seconds, speed, result))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
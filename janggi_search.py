@@ -0,0 +1,502 @@
+# Description: Alpha-beta search for a computer opponent. The Search class runs a negamax alpha-beta search with
+# iterative deepening on a JanggiGame, making and unmaking moves with the game's own make_move_idx and unmake_move
+# methods, scores positions with the evaluate function of janggi_eval, and stops when a time limit, node limit or depth
+# limit is reached. The positions at the end of the main search are extended with a quiescence search of captures so a
+# position is not scored in the middle of an exchange. A player who is not in check may also pass, as the game allows,
+# which the search tries after the other moves of a position. The best_move function is the simple entry point and returns the
+# best move in the algebraic notation that make_move takes, and the analyse function and its asynchronous version
+# analyse_async stream the best few lines of a position as every depth is completed.
+
+import asyncio
+import time
+
+from janggi_eval import evaluate
+from janggi_ordering import MoveOrderer
+from janggi_tablebase import WIN, LOSS
+from janggi_tables import PLAYER_CODES, POSITIONS, SQUARE_NAMES
+
+
+MATE_SCORE = 100000
+MAX_DEPTH = 64
+
+# The deepest ply the main search and the quiescence search together can reach.
+MAX_PLY = 2 * MAX_DEPTH
+
+# The clock is read every this many nodes.
+CHECK_INTERVAL = 256
+
+
+class Search:
+
+    """
+    Represents a search for the best move of the player to move in a game. This class is responsible for running the
+    iterative deepening negamax search within its limits and keeping the best move, score and principal variation of
+    the deepest completed iteration. The game is left as it was when the search ends.
+    """
+
+    def __init__(self, game, time_ms=None, max_nodes=None, max_depth=MAX_DEPTH, callback=None, quiescence=True,
+                 checks=False, tablebases=None):
+
+        """
+        Initializes the search with a game and its limits.
+        :param game: Represents the JanggiGame object to search.
+        :param time_ms: Represents the time limit in milliseconds as an integer, or None for no time limit.
+        :param max_nodes: Represents the node limit as an integer, or None for no node limit.
+        :param max_depth: Represents the depth limit as an integer.
+        :param callback: Represents a function called with the depth, score, node count and principal variation after
+        every completed iteration, or None.
+        :param quiescence: Represents whether the positions at the end of the main search are extended with captures.
+        :param checks: Represents whether the first ply of the quiescence search also tries moves that give check.
+        :param tablebases: Represents a Tablebases object whose results replace the search of the positions it has,
+        or None.
+        """
+
+        self._game = game
+        self._time_ms = time_ms
+        self._max_nodes = max_nodes
+        self._max_depth = max_depth
+        self._callback = callback
+        self._quiescence = quiescence
+        self._checks = checks
+        self._tablebases = tablebases
+        self._deadline = None
+        self._nodes = 0
+        self._stopped = False
+        self._best_move = None
+        self._score = 0
+        self._depth = 0
+        self._pv = []
+        self._path = []
+        self._orderer = MoveOrderer(MAX_PLY)
+
+    def get_best_move(self):
+
+        """
+        Gets the best move found by the search.
+        :return: A (from, to) tuple of board positions as integers, or None if there is no legal move.
+        """
+
+        return self._best_move
+
+    def get_score(self):
+
+        """
+        Gets the score of the best move for the player to move.
+        :return: The score as an integer.
+        """
+
+        return self._score
+
+    def get_depth(self):
+
+        """
+        Gets the depth of the deepest completed iteration.
+        :return: The depth as an integer.
+        """
+
+        return self._depth
+
+    def get_nodes(self):
+
+        """
+        Gets the number of positions searched.
+        :return: The node count as an integer.
+        """
+
+        return self._nodes
+
+    def get_principal_variation(self):
+
+        """
+        Gets the principal variation, the line of best play found by the deepest completed iteration.
+        :return: A list of (from, to) tuples of board positions as integers.
+        """
+
+        return list(self._pv)
+
+    def is_stopped(self):
+
+        """
+        Gets whether the last search was stopped by its time limit or node limit.
+        :return: True if the search was stopped and False otherwise.
+        """
+
+        return self._stopped
+
+    def run(self):
+
+        """
+        Runs iterative deepening searches of depth 1, 2, 3 and so on until a limit is reached. Each iteration searches
+        the principal variation of the previous iteration first. The result of an iteration that is stopped early is
+        thrown away. The history scores of an earlier run are halved first.
+        :return: The best move as a (from, to) tuple of board positions, which is a pass if both positions are the
+        same, or None if the player is mated.
+        """
+
+        game = self._game
+        moves = game.legal_moves(game.get_player_turn()) + self.pass_moves()
+        if not moves:
+            return None
+
+        if self._time_ms is not None:
+            self._deadline = time.perf_counter() + self._time_ms / 1000
+        self._best_move = moves[0]
+        self._nodes = 0
+        self._stopped = False
+        self._orderer.age()
+
+        for depth in range(1, self._max_depth + 1):
+            pv = []
+            score = self.negamax(depth, -MATE_SCORE - 1, MATE_SCORE + 1, 0, pv)
+            if self._stopped:
+                break
+
+            self._best_move = pv[0]
+            self._score = score
+            self._depth = depth
+            self._pv = pv
+            if self._callback is not None:
+                self._callback(depth, score, self._nodes, list(pv))
+
+            # Stops once a forced mate is found.
+            if abs(score) >= MATE_SCORE - MAX_DEPTH:
+                break
+
+        return self._best_move
+
+    def analyse(self, lines=3):
+
+        """
+        Runs iterative deepening searches like the run method but keeps the best few lines of the position instead of
+        only the best one, and yields them every time a depth is completed. Each line is found by searching the root
+        moves that are not the first move of a better line, the moves of the previous depth's lines first. The game
+        must not be changed while the generator is in use.
+        :param lines: Represents the number of lines to keep as an integer.
+        :return: A generator of (depth, node count, lines) tuples, with the lines as a list of (score, principal
+        variation) tuples from the best to the worst.
+        """
+
+        game = self._game
+        moves = game.legal_moves(game.get_player_turn()) + self.pass_moves()
+        if not moves:
+            return
+
+        if self._time_ms is not None:
+            self._deadline = time.perf_counter() + self._time_ms / 1000
+        self._nodes = 0
+        self._stopped = False
+        self._orderer.age()
+        previous = {}
+
+        for depth in range(1, self._max_depth + 1):
+            remaining = sorted(moves, key=lambda move: (move in previous, previous.get(move, (0,))[0]), reverse=True)
+            ranked = []
+            while remaining and len(ranked) < lines:
+                alpha = -MATE_SCORE - 1
+                best = None
+                for move in remaining:
+                    self._pv = previous.get(move, (0, []))[1]
+                    child_pv = []
+                    if not game.make_move_idx(move[0], move[1]):
+                        raise ValueError("Not a legal move: " + str(move))
+                    self._path.append(move)
+                    score = -self.negamax(depth - 1, -MATE_SCORE - 1, -alpha, 1, child_pv)
+                    self._path.pop()
+                    game.unmake_move()
+                    if self._stopped:
+                        return
+                    if score > alpha:
+                        alpha = score
+                        best = (score, [move] + child_pv)
+                ranked.append(best)
+                remaining.remove(best[1][0])
+
+            self._best_move = ranked[0][1][0]
+            self._score, self._pv = ranked[0]
+            self._depth = depth
+            previous = {line[0]: (score, line) for score, line in ranked}
+            yield depth, self._nodes, [(score, list(line)) for score, line in ranked]
+
+            # Stops once every line ends in a forced mate.
+            if all(abs(score) >= MATE_SCORE - MAX_DEPTH for score, line in ranked):
+                return
+
+    def search_move(self, move, depth, alpha, beta, pv=None):
+
+        """
+        Searches a single legal move of the position of the game to a depth within the limits of the search, as one
+        part of a search whose moves are split between several Search objects.
+        :param move: Represents a (from, to) tuple of board positions as integers.
+        :param depth: Represents the depth of the search, including the move, as an integer.
+        :param alpha: Represents the score the player to move is already sure of as an integer.
+        :param beta: Represents the score the opposing player is already sure of as an integer.
+        :param pv: Represents a principal variation starting with the move to search first, or None.
+        :return: The score of the move for the player to move as an integer and the principal variation starting with
+        the move as a list. The score is not exact if the search is stopped or if it is not between alpha and beta.
+        """
+
+        if self._time_ms is not None:
+            self._deadline = time.perf_counter() + self._time_ms / 1000
+        self._nodes = 0
+        self._stopped = False
+        self._pv = list(pv) if pv else []
+
+        game = self._game
+        child_pv = []
+        if not game.make_move_idx(move[0], move[1]):
+            raise ValueError("Not a legal move: " + str(move))
+        self._path.append(move)
+        score = -self.negamax(depth - 1, -beta, -alpha, 1, child_pv)
+        self._path.pop()
+        game.unmake_move()
+        return score, [move] + child_pv
+
+    def negamax(self, depth, alpha, beta, ply, pv):
+
+        """
+        Searches the position of the game to a depth with alpha-beta pruning and returns its score for the player to
+        move. A player in check with no legal move is mated, and a player who is not in check can also pass, which is
+        searched after the other moves. Positions other than the root that the search's tablebases have are scored from their tables.
+        :param depth: Represents the remaining depth as an integer.
+        :param alpha: Represents the score the player to move is already sure of as an integer.
+        :param beta: Represents the score the opposing player is already sure of as an integer.
+        :param ply: Represents the number of moves made since the root as an integer.
+        :param pv: Represents a list that is filled with the principal variation from this position.
+        :return: The score as an integer.
+        """
+
+        self._nodes += 1
+        if self.out_of_limits():
+            self._stopped = True
+        if self._stopped:
+            return 0
+
+        game = self._game
+        player = game.get_player_turn()
+        if ply and self._tablebases is not None:
+            entry = self._tablebases.probe(game)
+            if entry is not None:
+                result, distance = entry
+                if result == WIN:
+                    return MATE_SCORE - ply - distance
+                if result == LOSS:
+                    return -MATE_SCORE + ply + distance
+                return 0
+
+        if depth == 0:
+            if self._quiescence:
+                return self.quiesce(alpha, beta, ply, 0)
+            return evaluate(game)
+
+        moves = game.legal_moves(player)
+        passes = self.pass_moves()
+        if not moves and not passes:
+            return -MATE_SCORE + ply
+
+        # Searches the move of the principal variation of the last iteration first, then the moves in the order of the
+        # MoveOrderer, then the pass.
+        pv_move = None
+        if ply < len(self._pv) and self._path == self._pv[:ply]:
+            pv_move = self._pv[ply]
+
+        for move in self._orderer.order(game, moves, ply, pv_move) + passes:
+            child_pv = []
+            if not game.make_move_idx(move[0], move[1]):
+                continue
+            self._path.append(move)
+            score = -self.negamax(depth - 1, -beta, -alpha, ply + 1, child_pv)
+            self._path.pop()
+            game.unmake_move()
+            if self._stopped:
+                return 0
+
+            if score > alpha:
+                alpha = score
+                pv[:] = [move] + child_pv
+                if alpha >= beta:
+                    self._orderer.record_cutoff(game, move, ply, depth)
+                    break
+
+        return alpha
+
+    def quiesce(self, alpha, beta, ply, qply):
+
+        """
+        Searches the captures of the position of the game until no capture is left and returns its score for the player
+        to move. The player to move can stand pat, keeping the static score instead of capturing, unless in check, in
+        which case every legal move is searched. The first ply also searches the moves that give check if the search
+        was created with checks.
+        :param alpha: Represents the score the player to move is already sure of as an integer.
+        :param beta: Represents the score the opposing player is already sure of as an integer.
+        :param ply: Represents the number of moves made since the root as an integer.
+        :param qply: Represents the number of moves made since the end of the main search as an integer.
+        :return: The score as an integer.
+        """
+
+        self._nodes += 1
+        if self.out_of_limits():
+            self._stopped = True
+        if self._stopped:
+            return 0
+
+        game = self._game
+        player = game.get_player_turn()
+        if ply >= MAX_PLY:
+            return evaluate(game)
+
+        if game.in_check(PLAYER_CODES[player]):
+            moves = game.legal_moves(player)
+            if not moves:
+                return -MATE_SCORE + ply
+        else:
+            stand_pat = evaluate(game)
+            if stand_pat >= beta:
+                return stand_pat
+            if stand_pat > alpha:
+                alpha = stand_pat
+            moves = game.capture_moves(player)
+            if self._checks and qply == 0:
+                moves += self.checking_moves(player)
+
+        for move in self._orderer.order(game, moves, ply):
+            if not game.make_move_idx(move[0], move[1]):
+                continue
+            score = -self.quiesce(-beta, -alpha, ply + 1, qply + 1)
+            game.unmake_move()
+            if self._stopped:
+                return 0
+
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+
+        return alpha
+
+    def checking_moves(self, player):
+
+        """
+        Finds the legal moves of a player that do not capture but give check, by making and unmaking each of them.
+        :param player: Represents the player as a string.
+        :return: A list of (from, to) tuples of board positions as integers.
+        """
+
+        game = self._game
+        board = game.get_board()
+        opponent = 1 - PLAYER_CODES[player]
+        moves = []
+        for move in game.legal_moves(player):
+            row, column = POSITIONS[move[1]]
+            if board[row][column] != "   " or not game.make_move_idx(move[0], move[1]):
+                continue
+            if game.in_check(opponent):
+                moves.append(move)
+            game.unmake_move()
+        return moves
+
+    def pass_moves(self):
+
+        """
+        Finds the pass of the player to move, made by moving the General onto its own position, which the game allows
+        unless the player is in check.
+        :return: A list with the pass as a (from, to) tuple of board positions, or an empty list if the player cannot
+        pass.
+        """
+
+        game = self._game
+        player = PLAYER_CODES[game.get_player_turn()]
+        sq = game.general_square(player)
+        if sq is None or game.in_check(player):
+            return []
+        return [(sq, sq)]
+
+    def out_of_limits(self):
+
+        """
+        Checks whether the node limit or time limit of the search has been reached. The clock is only read every
+        CHECK_INTERVAL nodes.
+        :return: True if the search must stop and False otherwise.
+        """
+
+        if self._max_nodes is not None and self._nodes >= self._max_nodes:
+            return True
+        if self._deadline is None or self._nodes % CHECK_INTERVAL:
+            return False
+        return time.perf_counter() >= self._deadline
+
+
+def move_notation(move):
+
+    """
+    Converts a move into the algebraic notation that the make_move method takes.
+    :param move: Represents a (from, to) tuple of board positions as integers.
+    :return: A (current position, move to position) tuple of strings, such as ("c7", "c6").
+    """
+
+    return SQUARE_NAMES[move[0]], SQUARE_NAMES[move[1]]
+
+
+def best_move(game, time_ms, max_nodes=None, max_depth=MAX_DEPTH, book=None):
+
+    """
+    Searches for the best move of the player to move in a game within a time limit. If an opening book is given and
+    has the position, its move is played without searching.
+    :param game: Represents a JanggiGame object.
+    :param time_ms: Represents the time limit in milliseconds as an integer.
+    :param max_nodes: Represents the node limit as an integer, or None for no node limit.
+    :param max_depth: Represents the depth limit as an integer.
+    :param book: Represents an OpeningBook object, or None.
+    :return: The best move as a (current position, move to position) tuple of strings that can be passed to the
+    make_move method, which is a pass if both positions are the same, or None if the player is mated.
+    """
+
+    if book is not None:
+        move = book.choose_move(game)
+        if move is not None:
+            return move
+
+    move = Search(game, time_ms, max_nodes, max_depth).run()
+    if move is None:
+        return None
+    return move_notation(move)
+
+
+def analyse(game, lines=3, time_ms=None, max_nodes=None, max_depth=MAX_DEPTH):
+
+    """
+    Analyses the position of a game, yielding the best few lines found every time the search completes a depth, so a
+    first answer is available after a few milliseconds while the search keeps going deeper.
+    :param game: Represents a JanggiGame object, which must not be changed while the generator is in use.
+    :param lines: Represents the number of lines to find as an integer.
+    :param time_ms: Represents the time limit in milliseconds as an integer, or None for no time limit.
+    :param max_nodes: Represents the node limit as an integer, or None for no node limit.
+    :param max_depth: Represents the depth limit as an integer.
+    :return: A generator of (depth, node count, lines) tuples, with the lines as a list of (score, moves) tuples from
+    the best to the worst and the moves as (current position, move to position) tuples of strings.
+    """
+
+    search = Search(game, time_ms, max_nodes, max_depth)
+    for depth, nodes, ranked in search.analyse(lines):
+        yield depth, nodes, [(score, [move_notation(move) for move in line]) for score, line in ranked]
+
+
+async def analyse_async(game, lines=3, time_ms=None, max_nodes=None, max_depth=MAX_DEPTH):
+
+    """
+    Asynchronous version of the analyse function. The search runs in a worker thread of the event loop so the loop
+    stays free between results.
+    :param game: Represents a JanggiGame object, which must not be changed while the iterator is in use.
+    :param lines: Represents the number of lines to find as an integer.
+    :param time_ms: Represents the time limit in milliseconds as an integer, or None for no time limit.
+    :param max_nodes: Represents the node limit as an integer, or None for no node limit.
+    :param max_depth: Represents the depth limit as an integer.
+    :return: An asynchronous iterator of the (depth, node count, lines) tuples of the analyse function.
+    """
+
+    loop = asyncio.get_running_loop()
+    results = analyse(game, lines, time_ms, max_nodes, max_depth)
+    while True:
+        result = await loop.run_in_executor(None, next, results, None)
+        if result is None:
+            return
+        yield result
@@ -0,0 +1,517 @@
+# Description: Endgame tablebases for small sets of material. The generate function enumerates every position of a
+# material signature, such as a Chariot against two Guards, finds the moves of each position with a BitboardBoard and
+# solves them all by retrograde analysis: mated positions are lost, and working back one ply at a time, a position is
+# won if a move reaches a lost position and lost if every move reaches a won position. Positions that are never solved
+# are drawn. Captures lead into the tables of the smaller signatures, which are generated first. Each position gets a
+# win, draw or loss result and its distance to mate in plies, and the Tablebase class stores them bit-packed so a probe
+# is a single index computation and read. The Generals are always on the board and are not part of a signature.
+#
+# The tables follow the rules of JanggiGame without the facing rule: a player who is not in check may pass, so a pass
+# is one of the moves of every such position, as it is in janggi_search.
+#
+# Signatures are written as BLUE's pieces, a slash and RED's pieces, by the piece names without the player letter, so
+# "Ch/GdGd" is BLUE's General and Chariot against RED's General and two Guards.
+#
+# File format: magic b"JTB1", number of pieces (unsigned 8 bit), distance to mate bits (unsigned 8 bit), number of
+# positions (unsigned 32 bit), little-endian, then the bitboard code of every piece and the packed entries.
+#
+# Usage: python janggi_tablebase.py signature [directory]
+
+import itertools
+import os
+import struct
+import sys
+from array import array
+
+from janggi_bitboard import BitboardBoard
+from janggi_tables import BLUE, RED, PLAYERS, GENERAL, GUARD, SOLDIER, SQUARES, POSITIONS, in_palace
+
+
+DRAW = 0
+WIN = 1
+LOSS = 2
+INVALID = 3
+RESULT_NAMES = ("DRAW", "WIN", "LOSS", "INVALID")
+
+TYPE_NAMES = ("Gn", "Gd", "Hs", "El", "Ch", "Cn", "Sd")
+MAX_DTM_BITS = 16
+
+HEADER = struct.Struct("<4sBBI")
+MAGIC = b"JTB1"
+
+
+def parse_signature(name):
+
+    """
+    Converts a signature name into a signature.
+    :param name: Represents the signature as a string, such as "Ch/GdGd".
+    :return: A sorted tuple of (player, piece type) tuples of integers, one for every piece other than the Generals.
+    """
+
+    sides = name.split("/")
+    if len(sides) != 2:
+        raise ValueError("Not a signature: " + str(name))
+
+    pieces = []
+    for player, side in enumerate(sides):
+        if len(side) % 2:
+            raise ValueError("Not a signature: " + str(name))
+        for index in range(0, len(side), 2):
+            if side[index:index + 2] not in TYPE_NAMES[1:]:
+                raise ValueError("Not a piece name: " + side[index:index + 2])
+            pieces.append((player, TYPE_NAMES.index(side[index:index + 2])))
+    return tuple(sorted(pieces))
+
+
+def signature_name(signature):
+
+    """
+    Converts a signature into its name.
+    :param signature: Represents a sorted tuple of (player, piece type) tuples of integers.
+    :return: The signature as a string, such as "Ch/GdGd".
+    """
+
+    sides = ["", ""]
+    for player, piece_type in signature:
+        sides[player] += TYPE_NAMES[piece_type]
+    return sides[BLUE] + "/" + sides[RED]
+
+
+def piece_domain(player, piece_type):
+
+    """
+    Lists the board positions a piece can stand on: its own palace for a General or Guard, the rows a Soldier can reach
+    for a Soldier and the whole board otherwise.
+    :param player: Represents the player code as an integer.
+    :param piece_type: Represents the piece type code as an integer.
+    :return: A list of board positions as integers in ascending order.
+    """
+
+    if piece_type == GENERAL or piece_type == GUARD:
+        rows = range(7, 10) if player == BLUE else range(3)
+        return [sq for sq in range(SQUARES) if POSITIONS[sq][0] in rows and in_palace(*POSITIONS[sq])]
+    if piece_type == SOLDIER:
+        rows = range(7) if player == BLUE else range(3, 10)
+        return [sq for sq in range(SQUARES) if POSITIONS[sq][0] in rows]
+    return list(range(SQUARES))
+
+
+class Tablebase:
+
+    """
+    Represents the solved positions of one material signature. This class is responsible for numbering the positions
+    of the signature, storing a result and distance to mate for each of them in bit-packed entries, probing them and
+    reading and writing them as files.
+    """
+
+    def __init__(self, signature, dtm_bits, data):
+
+        """
+        Initializes a table from its packed entries.
+        :param signature: Represents a sorted tuple of (player, piece type) tuples of integers.
+        :param dtm_bits: Represents the number of bits of the distance to mate in every entry as an integer.
+        :param data: Represents the packed entries as bytes.
+        """
+
+        self._signature = signature
+        self._slots = ((BLUE, GENERAL), (RED, GENERAL)) + signature
+        self._domains = [piece_domain(player, piece_type) for player, piece_type in self._slots]
+        self._indexes = [{sq: index for index, sq in enumerate(domain)} for domain in self._domains]
+        self._size = 2
+        for domain in self._domains:
+            self._size *= len(domain)
+        self._dtm_bits = dtm_bits
+        self._width = 2 + dtm_bits
+        self._data = data
+
+    def get_signature(self):
+
+        """
+        Gets the material signature of the table.
+        :return: A sorted tuple of (player, piece type) tuples of integers.
+        """
+
+        return self._signature
+
+    def get_size(self):
+
+        """
+        Gets the number of positions of the table, including the impossible ones.
+        :return: The number of positions as an integer.
+        """
+
+        return self._size
+
+    def index(self, turn, squares):
+
+        """
+        Numbers a position of the table.
+        :param turn: Represents the player to move as an integer.
+        :param squares: Represents the board positions of the BLUE General, the RED General and the pieces of the
+        signature in order, as a list of integers.
+        :return: The number of the position as an integer, or None if a piece is outside the positions it can stand on.
+        """
+
+        index = turn
+        for sq, indexes in zip(squares, self._indexes):
+            slot_index = indexes.get(sq)
+            if slot_index is None:
+                return None
+            index = index * len(indexes) + slot_index
+        return index
+
+    def entry(self, index):
+
+        """
+        Reads the packed entry of a position.
+        :param index: Represents the number of the position as an integer.
+        :return: The result and distance to mate as integers.
+        """
+
+        start, shift = divmod(index * self._width, 8)
+        entry = int.from_bytes(self._data[start:start + 3], "little") >> shift & ((1 << self._width) - 1)
+        return entry & 3, entry >> 2
+
+    def probe_pieces(self, turn, pieces):
+
+        """
+        Looks up a position given by its pieces.
+        :param turn: Represents the player to move as an integer.
+        :param pieces: Represents the pieces as a list of (player, piece type, board position) tuples of integers.
+        :return: The result for the player to move and the distance to mate in plies as integers, or None if the
+        pieces do not match the table.
+        """
+
+        squares = [None, None]
+        others = []
+        for player, piece_type, sq in pieces:
+            if piece_type == GENERAL:
+                squares[player] = sq
+            else:
+                others.append((player, piece_type, sq))
+        others.sort()
+        if tuple((player, piece_type) for player, piece_type, sq in others) != self._signature:
+            return None
+
+        index = self.index(turn, squares + [sq for player, piece_type, sq in others])
+        if index is None:
+            return None
+        return self.entry(index)
+
+    def write(self, path):
+
+        """
+        Writes the table to a file.
+        :param path: Represents the path of the file as a string.
+        :return: NONE
+        """
+
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, len(self._signature), self._dtm_bits, self._size))
+            file.write(bytes(player * 7 + piece_type for player, piece_type in self._signature))
+            file.write(self._data)
+
+    @classmethod
+    def read(cls, path):
+
+        """
+        Reads a table from a file written by the write method.
+        :param path: Represents the path of the file as a string.
+        :return: A Tablebase.
+        """
+
+        with open(path, "rb") as file:
+            magic, count, dtm_bits, size = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError("Not a tablebase file: " + str(path))
+            signature = tuple(divmod(code, 7) for code in file.read(count))
+            table = cls(signature, dtm_bits, file.read())
+        if table.get_size() != size:
+            raise ValueError("Tablebase file does not match its signature: " + str(path))
+        return table
+
+
+def pack_entries(results, distances):
+
+    """
+    Packs the result and distance to mate of every position into as few bits as the longest distance needs.
+    :param results: Represents the result of every position as a bytearray.
+    :param distances: Represents the distance to mate of every position as an array of integers.
+    :return: The number of distance to mate bits as an integer and the packed entries as bytes.
+    """
+
+    dtm_bits = max(distances, default=0).bit_length()
+    if dtm_bits > MAX_DTM_BITS:
+        raise ValueError("Distance to mate too long to store: " + str(max(distances)))
+
+    width = 2 + dtm_bits
+    data = bytearray((len(results) * width + 7) // 8 + 3)
+    for index, result in enumerate(results):
+        entry = result | distances[index] << 2
+        start, shift = divmod(index * width, 8)
+        entry <<= shift
+        while entry:
+            data[start] |= entry & 0xFF
+            entry >>= 8
+            start += 1
+    return dtm_bits, bytes(data)
+
+
+def generate(signature, tables=None):
+
+    """
+    Generates the table of a material signature, and the tables of the smaller signatures its captures lead to if they
+    are not already given, by retrograde analysis. The moves of every position are found once with a BitboardBoard and
+    kept in flat arrays together with the reverse links, then the positions are solved one distance to mate at a time.
+    :param signature: Represents a sorted tuple of (player, piece type) tuples of integers.
+    :param tables: Represents a dictionary of tables keyed by signature, which the new tables are added to, or None.
+    :return: The Tablebase of the signature.
+    """
+
+    if tables is None:
+        tables = {}
+    if signature in tables:
+        return tables[signature]
+
+    for slot in range(len(signature)):
+        generate(signature[:slot] + signature[slot + 1:], tables)
+
+    table = Tablebase(signature, 0, b"")
+    slots = ((BLUE, GENERAL), (RED, GENERAL)) + signature
+    size = table.get_size()
+    results = bytearray(size)
+    distances = array("H", bytes(2 * size))
+
+    # Successors of every position in this table as flat arrays, and the captures, whose results are already known
+    # from the smaller tables, as (distance, position, result) events.
+    successors = array("I")
+    starts = array("I", [0])
+    remaining = array("H", bytes(2 * size))
+    events = {}
+    mated = []
+
+    for index, squares in enumerate(itertools.product(range(2), *[piece_domain(*slot) for slot in slots])):
+        turn = squares[0]
+        squares = list(squares[1:])
+        if len(set(squares)) != len(squares):
+            results[index] = INVALID
+            starts.append(len(successors))
+            continue
+
+        board = BitboardBoard.from_layout([slot + (sq,) for slot, sq in zip(slots, squares)], turn)
+        if board.in_check(1 - turn):
+            results[index] = INVALID
+            starts.append(len(successors))
+            continue
+
+        in_check = board.in_check(turn)
+        moves = board.legal_moves(turn)
+        if in_check and not moves:
+            mated.append(index)
+
+        slot_of = {sq: slot for slot, sq in enumerate(squares)}
+        count = 0
+        if not in_check:
+            successors.append(table.index(1 - turn, squares))
+            count += 1
+        for from_sq, to_sq in moves:
+            moved = list(squares)
+            moved[slot_of[from_sq]] = to_sq
+            captured = slot_of.get(to_sq)
+            if captured is None:
+                successors.append(table.index(1 - turn, moved))
+            else:
+                del moved[captured]
+                smaller = tables[signature[:captured - 2] + signature[captured - 1:]]
+                result, distance = smaller.entry(smaller.index(1 - turn, moved))
+                if result != DRAW:
+                    events.setdefault(distance, []).append((index, result))
+            count += 1
+        starts.append(len(successors))
+        remaining[index] = count
+
+    # Reverse links from every position to the positions that have a move to it.
+    predecessor_starts = array("I", bytes(4 * (size + 1)))
+    for successor in successors:
+        predecessor_starts[successor + 1] += 1
+    for index in range(size):
+        predecessor_starts[index + 1] += predecessor_starts[index]
+    fill = array("I", predecessor_starts)
+    predecessors = array("I", bytes(4 * len(successors)))
+    for index in range(size):
+        for successor in successors[starts[index]:starts[index + 1]]:
+            predecessors[fill[successor]] = index
+            fill[successor] += 1
+
+    # Solves the positions in order of distance to mate. A position whose successor is lost is won one ply later, and a
+    # position whose successors have all turned out to be won is lost one ply after the last of them.
+    solved = [(index, LOSS) for index in mated]
+    for index in mated:
+        results[index] = LOSS
+    distance = 0
+    while solved or any(key >= distance for key in events):
+        found = []
+        for index, result in solved:
+            for predecessor in predecessors[predecessor_starts[index]:predecessor_starts[index + 1]]:
+                found.extend(resolve(predecessor, result, distance, results, distances, remaining))
+        for index, result in events.pop(distance, []):
+            found.extend(resolve(index, result, distance, results, distances, remaining))
+        solved = found
+        distance += 1
+
+    dtm_bits, data = pack_entries(results, distances)
+    table = Tablebase(signature, dtm_bits, data)
+    tables[signature] = table
+    return table
+
+
+def resolve(index, result, distance, results, distances, remaining):
+
+    """
+    Called by the generate function when a successor of an unsolved position is solved, from the player to move in the
+    successor's point of view.
+    :param index: Represents the number of the position as an integer.
+    :param result: Represents the result of the successor as WIN or LOSS.
+    :param distance: Represents the distance to mate of the successor as an integer.
+    :param results: Represents the results of the table's positions as a bytearray.
+    :param distances: Represents the distances to mate of the table's positions as an array of integers.
+    :param remaining: Represents the number of successors of each position not yet known to be won.
+    :return: A list with the (position, result) tuple if the position is solved and an empty list otherwise.
+    """
+
+    if results[index] != DRAW:
+        return []
+    if result == LOSS:
+        results[index] = WIN
+        distances[index] = distance + 1
+        return [(index, WIN)]
+
+    remaining[index] -= 1
+    if remaining[index]:
+        return []
+    results[index] = LOSS
+    distances[index] = distance + 1
+    return [(index, LOSS)]
+
+
+class Tablebases:
+
+    """
+    Represents a set of tables that games can be looked up in. This class is responsible for finding the table of a
+    game's material and probing the game's position in it.
+    """
+
+    def __init__(self, tables=()):
+
+        """
+        Initializes the set with tables.
+        :param tables: Represents an iterable of Tablebase objects.
+        """
+
+        self._tables = {}
+        self._max_pieces = 0
+        for table in tables:
+            self.add(table)
+
+    def add(self, table):
+
+        """
+        Adds a table to the set.
+        :param table: Represents a Tablebase.
+        :return: NONE
+        """
+
+        self._tables[table.get_signature()] = table
+        self._max_pieces = max(self._max_pieces, len(table.get_signature()) + 2)
+
+    def load(self, directory):
+
+        """
+        Adds every table file of a directory to the set.
+        :param directory: Represents the path of the directory as a string.
+        :return: The number of tables added as an integer.
+        """
+
+        count = 0
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".jtb"):
+                self.add(Tablebase.read(os.path.join(directory, name)))
+                count += 1
+        return count
+
+    def get_max_pieces(self):
+
+        """
+        Gets the number of pieces, including the Generals, of the largest table in the set.
+        :return: The number of pieces as an integer.
+        """
+
+        return self._max_pieces
+
+    def probe(self, game):
+
+        """
+        Looks up the current position of a game.
+        :param game: Represents a JanggiGame object.
+        :return: The result for the player to move as DRAW, WIN or LOSS and the distance to mate in plies as integers,
+        or None if the game has more pieces than the largest table, no table has its material or the game uses the
+        facing rule, which the tables are not generated with.
+        """
+
+        if game.get_facing_rule() or len(game.get_pieces()) > self._max_pieces:
+            return None
+
+        pieces = []
+        for piece in game.get_pieces():
+            pieces.append((piece.get_player_code(), piece.get_type_code(), piece.get_row() * 9 + piece.get_column()))
+        signature = tuple(sorted((player, piece_type) for player, piece_type, sq in pieces if piece_type != GENERAL))
+        table = self._tables.get(signature)
+        if table is None:
+            return None
+        return table.probe_pieces(PLAYERS.index(game.get_player_turn()), pieces)
+
+
+def table_path(directory, signature):
+
+    """
+    Gets the path of the file of a table.
+    :param directory: Represents the path of the directory as a string.
+    :param signature: Represents a sorted tuple of (player, piece type) tuples of integers.
+    :return: The path as a string, such as "tables/Ch_GdGd.jtb".
+    """
+
+    return os.path.join(directory, signature_name(signature).replace("/", "_") + ".jtb")
+
+
+def main(argv):
+
+    """
+    Generates the table of a signature and of every smaller signature, writes them to a directory and prints the
+    number of won, drawn and lost positions of each.
+    :param argv: Represents the command line arguments as a list of strings.
+    :return: 0 if the tables were written and 2 if the arguments are missing.
+    """
+
+    if len(argv) < 2:
+        print("Usage: python janggi_tablebase.py signature [directory]")
+        return 2
+
+    directory = argv[2] if len(argv) > 2 else "."
+    os.makedirs(directory, exist_ok=True)
+    tables = {}
+    generate(parse_signature(argv[1]), tables)
+    for signature, table in tables.items():
+        counts = [0, 0, 0, 0]
+        longest = 0
+        for index in range(table.get_size()):
+            result, distance = table.entry(index)
+            counts[result] += 1
+            longest = max(longest, distance)
+        table.write(table_path(directory, signature))
+        print("%-12s win %8d  draw %8d  loss %8d  longest mate %3d plies"
+              % (signature_name(signature), counts[WIN], counts[DRAW], counts[LOSS], longest))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
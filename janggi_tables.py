@@ -0,0 +1,250 @@
+# Description: Precomputed board geometry for Janggi. The tables are built once when the module is imported and list,
+# for every one of the 90 board positions, where each piece type can move to, which positions block it (the "legs" of
+# the Horse and Elephant and the rays of the Chariot and Cannon) and the palace diagonals. Board positions are numbered
+# row * 9 + column, so "a1" is 0 and "i10" is 89, and SQUARE_NAMES and SQUARE_INDEXES convert between board positions
+# and algebraic notation. The random Zobrist keys used to hash positions are built here too.
+
+import random
+
+
+BLUE = 0
+RED = 1
+PLAYERS = ("BLUE", "RED")
+PLAYER_CODES = {"BLUE": BLUE, "RED": RED}
+
+GENERAL = 0
+GUARD = 1
+HORSE = 2
+ELEPHANT = 3
+CHARIOT = 4
+CANNON = 5
+SOLDIER = 6
+PIECE_TYPES = ("General", "Guard", "Horse", "Elephant", "Chariot", "Cannon", "Soldier")
+TYPE_CODES = {"General": GENERAL, "Guard": GUARD, "Horse": HORSE, "Elephant": ELEPHANT, "Chariot": CHARIOT,
+              "Cannon": CANNON, "Soldier": SOLDIER}
+
+ROWS = 10
+COLUMNS = 9
+SQUARES = ROWS * COLUMNS
+COLUMN_NAMES = "abcdefghi"
+
+# Directions are indexed 0-3 for the orthogonal directions and 4-7 for the diagonal directions.
+ORTHOGONAL = ((-1, 0), (1, 0), (0, -1), (0, 1))
+DIAGONAL = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+DIRECTIONS = ORTHOGONAL + DIAGONAL
+
+
+def square(row, column):
+
+    """
+    Converts a row and column on the board into a board position.
+    :param row: Represents a row on the board as an integer.
+    :param column: Represents a column on the board as an integer.
+    :return: The board position as an integer.
+    """
+
+    return row * COLUMNS + column
+
+
+def in_palace(row, column):
+
+    """
+    Checks whether a row and column are inside either palace.
+    :param row: Represents a row on the board as an integer.
+    :param column: Represents a column on the board as an integer.
+    :return: True if the position is inside a palace and False otherwise.
+    """
+
+    return column in range(3, 6) and (row in range(3) or row in range(7, 10))
+
+
+def on_palace_diagonal(row, column):
+
+    """
+    Checks whether a row and column lie on the diagonal lines of a palace, which are the four corners and the centre.
+    :param row: Represents a row on the board as an integer.
+    :param column: Represents a column on the board as an integer.
+    :return: True if the position is on a palace diagonal and False otherwise.
+    """
+
+    if not in_palace(row, column):
+        return False
+    return (row in (1, 8) and column == 4) or (row not in (1, 8) and column != 4)
+
+
+def build_steps():
+
+    """
+    Builds the next position in every direction for every position. Orthogonal steps stop at the edge of the board and
+    diagonal steps only exist along the palace diagonals.
+    :return: A list with a list of eight next positions (or None) for every position.
+    """
+
+    steps = []
+    for sq in range(SQUARES):
+        row, column = divmod(sq, COLUMNS)
+        sq_steps = []
+        for index, (r, c) in enumerate(DIRECTIONS):
+            next_row = row + r
+            next_col = column + c
+            if index < 4 and next_row in range(ROWS) and next_col in range(COLUMNS):
+                sq_steps.append(square(next_row, next_col))
+            elif index >= 4 and on_palace_diagonal(row, column) and on_palace_diagonal(next_row, next_col):
+                sq_steps.append(square(next_row, next_col))
+            else:
+                sq_steps.append(None)
+        steps.append(tuple(sq_steps))
+    return steps
+
+
+def build_rays():
+
+    """
+    Builds the positions a sliding piece passes in every direction by following the steps table until it ends.
+    :return: A list with a tuple of eight rays for every position, each ray a tuple of positions nearest first.
+    """
+
+    rays = []
+    for sq in range(SQUARES):
+        sq_rays = []
+        for direction in range(len(DIRECTIONS)):
+            ray = []
+            next_sq = STEPS[sq][direction]
+            while next_sq is not None:
+                ray.append(next_sq)
+                next_sq = STEPS[next_sq][direction]
+            sq_rays.append(tuple(ray))
+        rays.append(tuple(sq_rays))
+    return rays
+
+
+def build_palace_moves():
+
+    """
+    Builds the one step moves of the General and the Guards. Orthogonal steps stay inside the palace and diagonal steps
+    follow the palace diagonals.
+    :return: A list with a tuple of positions for every position, empty outside the palaces.
+    """
+
+    moves = []
+    for sq in range(SQUARES):
+        row, column = divmod(sq, COLUMNS)
+        sq_moves = []
+        if in_palace(row, column):
+            for next_sq in STEPS[sq]:
+                if next_sq is not None and in_palace(*divmod(next_sq, COLUMNS)):
+                    sq_moves.append(next_sq)
+        moves.append(tuple(sq_moves))
+    return moves
+
+
+def build_leg_moves(length):
+
+    """
+    Builds the moves of a piece that takes one orthogonal step and then diagonal steps outward, which is the Horse for
+    a length of one and the Elephant for a length of two. Every position passed on the way is a leg that must be
+    empty for the move to be made.
+    :param length: Represents the number of diagonal steps as an integer.
+    :return: A list with a tuple of (legs..., target) tuples for every position.
+    """
+
+    moves = []
+    for sq in range(SQUARES):
+        row, column = divmod(sq, COLUMNS)
+        sq_moves = []
+        for r, c in ORTHOGONAL:
+            for side in (-1, 1):
+                dr, dc = (r, side) if r else (side, c)
+                path = [(row + r + dr * step, column + c + dc * step) for step in range(length + 1)]
+                if all(path_row in range(ROWS) and path_col in range(COLUMNS) for path_row, path_col in path):
+                    sq_moves.append(tuple(square(path_row, path_col) for path_row, path_col in path))
+        moves.append(tuple(sq_moves))
+    return moves
+
+
+def build_soldier_moves():
+
+    """
+    Builds the Soldier moves for both players. Soldiers step forward or sideways, and diagonally forward along the
+    palace diagonals. BLUE moves towards row 0 and RED moves towards row 9.
+    :return: A list indexed by player with a tuple of positions for every position.
+    """
+
+    moves = []
+    for forward in (-1, 1):
+        player_moves = []
+        for sq in range(SQUARES):
+            row, column = divmod(sq, COLUMNS)
+            sq_moves = []
+            for r, c in ((forward, 0), (0, -1), (0, 1), (forward, -1), (forward, 1)):
+                next_row = row + r
+                next_col = column + c
+                if c and r:
+                    if on_palace_diagonal(row, column) and on_palace_diagonal(next_row, next_col):
+                        sq_moves.append(square(next_row, next_col))
+                elif next_row in range(ROWS) and next_col in range(COLUMNS):
+                    sq_moves.append(square(next_row, next_col))
+            player_moves.append(tuple(sq_moves))
+        moves.append(player_moves)
+    return moves
+
+
+def build_zobrist_keys(seed):
+
+    """
+    Builds a random 64 bit key for every player, piece type and position, and one for RED being the player to move.
+    The keys are drawn from a fixed seed so position keys are the same in every process.
+    :param seed: Represents the seed of the random number generator as an integer.
+    :return: A list indexed by player and piece type with a list of keys for every position, and the player to move
+    key as an integer.
+    """
+
+    generator = random.Random(seed)
+    keys = [[[generator.getrandbits(64) for sq in range(SQUARES)] for piece_type in PIECE_TYPES] for player in PLAYERS]
+    return keys, generator.getrandbits(64)
+
+
+def build_dependencies():
+
+    """
+    Builds, for every player, piece type and position, the mask of positions whose contents decide the moves of that
+    piece. A change at any other position cannot change its moves.
+    :return: A list indexed by player and piece type with a list of masks for every position.
+    """
+
+    dependencies = []
+    for player in (BLUE, RED):
+        player_dependencies = []
+        for piece_type in range(len(PIECE_TYPES)):
+            masks = []
+            for sq in range(SQUARES):
+                if piece_type == GENERAL or piece_type == GUARD:
+                    positions = PALACE_MOVES[sq]
+                elif piece_type == HORSE or piece_type == ELEPHANT:
+                    table = HORSE_MOVES if piece_type == HORSE else ELEPHANT_MOVES
+                    positions = [position for move in table[sq] for position in move]
+                elif piece_type == SOLDIER:
+                    positions = SOLDIER_MOVES[player][sq]
+                else:
+                    positions = [position for ray in RAYS[sq] for position in ray]
+                mask = 1 << sq
+                for position in positions:
+                    mask |= 1 << position
+                masks.append(mask)
+            player_dependencies.append(masks)
+        dependencies.append(player_dependencies)
+    return dependencies
+
+
+POSITIONS = [divmod(sq, COLUMNS) for sq in range(SQUARES)]
+SQUARE_NAMES = [COLUMN_NAMES[column] + str(row + 1) for row, column in POSITIONS]
+SQUARE_INDEXES = {name: sq for sq, name in enumerate(SQUARE_NAMES)}
+STEPS = build_steps()
+RAYS = build_rays()
+PALACE_DIAGONALS = [tuple(next_sq for next_sq in STEPS[sq][4:] if next_sq is not None) for sq in range(SQUARES)]
+PALACE_MOVES = build_palace_moves()
+HORSE_MOVES = build_leg_moves(1)
+ELEPHANT_MOVES = build_leg_moves(2)
+SOLDIER_MOVES = build_soldier_moves()
+DEPENDENCIES = build_dependencies()
+ZOBRIST_KEYS, ZOBRIST_TURN = build_zobrist_keys(0x4A414E47)
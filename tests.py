@@ -1,5 +1,24 @@
+import asyncio
+import os
+import pickle
+import random
+import tempfile
 import unittest
-from janggi_game import JanggiGame
+from janggi_game import JanggiGame, MoveCache
+from janggi_perft import perft, divide, REFERENCE_COUNTS
+from janggi_search import Search, best_move, analyse, analyse_async, MATE_SCORE, MAX_DEPTH
+from janggi_eval import evaluate, piece_score, PIECE_VALUES
+from janggi_ordering import MoveOrderer, MAX_HISTORY
+from janggi_parallel import ParallelSearch, parallel_best_move
+from janggi_book import BookBuilder, OpeningBook, read_game_records, RECORD_SIZE
+from janggi_tablebase import generate, parse_signature, signature_name, pack_entries, piece_domain, Tablebase, \
+    Tablebases, WIN, DRAW, LOSS, INVALID
+from janggi_bitboard import BitboardBoard
+from janggi_mcts import MCTS, mcts_move
+from janggi_match import play_game, run_match, parse_engine, random_openings, match_report, sprt_llr, sprt_bounds, \
+    elo_difference, create_tree, engine_move
+from janggi_tables import square, PALACE_MOVES, HORSE_MOVES, ELEPHANT_MOVES, RAYS, PALACE_DIAGONALS, SOLDIER_MOVES, BLUE, RED, \
+    SQUARE_NAMES, SQUARE_INDEXES
 
 
 class TestJanggiGame(unittest.TestCase):
@@ -1713,3 +1732,1049 @@ class TestJanggiGame(unittest.TestCase):
         except:
             self.fail("Game state should be RED_WON when the BLUE general is checkmated")
 
+
+
+class TestIncrementalMoves(unittest.TestCase):
+    def test_incremental_moves_match_full_update(self):
+        """ENGINE: incremental move updates match a full update of every piece throughout a game"""
+        g = JanggiGame(verify_moves=True)
+        moves = [
+            ('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'e3'), ('c10', 'd8'), ('h1', 'g3'),
+            ('e7', 'e6'), ('e3', 'e6'), ('h8', 'c8'), ('d3', 'e5'), ('c8', 'c4'), ('e5', 'c4'),
+            ('i10', 'i8'), ('g4', 'f4'), ('i8', 'f8'), ('g3', 'h5'), ('h10', 'g8'), ('e6', 'e3')
+        ]
+        for cur_pos, move_pos in moves:
+            self.assertIs(g.make_move(cur_pos, move_pos), True)
+
+    def test_only_affected_pieces_are_updated(self):
+        """ENGINE: a move leaves the moves of unaffected pieces untouched"""
+        g = JanggiGame()
+        red_chariot = g.get_board()[0][0]
+        before = red_chariot.get_move_squares()
+        g.make_move('i7', 'h7')
+        self.assertIs(red_chariot.get_move_squares(), before)
+
+
+class TestBitboardBackend(unittest.TestCase):
+    def test_bitboard_game_can_be_instantiated(self):
+        """BITBOARD: a game can be created with the bitboard backend and blue starts"""
+        g = JanggiGame(backend='bitboard')
+        self.assertIs(g.make_move('c4', 'c5'), False)
+        self.assertIs(g.make_move('c7', 'c6'), True)
+        self.assertEqual(g.get_game_state(), 'UNFINISHED')
+
+    def test_unknown_backend_is_rejected(self):
+        """BITBOARD: an unknown backend raises a ValueError"""
+        with self.assertRaises(ValueError):
+            JanggiGame(backend='abacus')
+
+    def test_bitboard_cannon_needs_a_screen_and_cannot_jump_a_cannon(self):
+        """BITBOARD: cannons need a screen that is not a cannon"""
+        g = JanggiGame(backend='bitboard')
+        self.assertIs(g.make_move('b8', 'b4'), False)  # no screen
+        self.assertIs(g.make_move('c7', 'c6'), True)
+        self.assertIs(g.make_move('b3', 'b3'), True)  # red passes
+        self.assertIs(g.make_move('b8', 'b1'), False)  # cannot jump over the red cannon
+
+    def test_bitboard_check_must_be_countered(self):
+        """BITBOARD: a player in check can only make moves that counter the check"""
+        g = JanggiGame(backend='bitboard')
+        moves = [
+            ('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'b3'), ('c10', 'd8'), ('h1', 'g3'), ('e7', 'e6'),
+            ('b3', 'b3'), ('e6', 'f6'), ('b3', 'b3'), ('h8', 'c8'), ('d3', 'e5'), ('c8', 'c4'), ('e5', 'c4'),
+            ('i10', 'i8'), ('g4', 'f4'), ('i8', 'f8'), ('g3', 'h5'), ('h10', 'g8'), ('d1', 'd2'), ('e9', 'e9'),
+            ('d2', 'd3'), ('e9', 'e9'), ('b3', 'e3')
+        ]
+        for cur_pos, move_pos in moves:
+            self.assertIs(g.make_move(cur_pos, move_pos), True)
+        self.assertIs(g.is_in_check('blue'), True)
+        self.assertIs(g.is_in_check('red'), False)
+        self.assertIs(g.make_move('f8', 'f7'), False)
+        self.assertIs(g.make_move('e9', 'e9'), False)
+        self.assertIs(g.make_move('e9', 'd9'), True)
+        self.assertIs(g.is_in_check('blue'), False)
+
+    def test_bitboard_checkmate_is_detected(self):
+        """BITBOARD: checkmate ends the game"""
+        g = JanggiGame(backend='bitboard')
+        moves = [
+            ('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'e3'), ('c10', 'd8'), ('h1', 'g3'), ('e7', 'e6'),
+            ('e3', 'e6'), ('h8', 'c8'), ('d3', 'e5'), ('c8', 'c4'), ('e5', 'c4'), ('i10', 'i8'), ('g4', 'f4'),
+            ('i8', 'f8'), ('g3', 'h5'), ('h10', 'g8'), ('e6', 'e3'), ('e9', 'd9'), ('c4', 'e5'), ('c6', 'd6'),
+            ('e5', 'c4'), ('a7', 'a6'), ('h3', 'h9'), ('a10', 'a7'), ('c4', 'd6'), ('a6', 'b6'), ('h5', 'g7'),
+            ('b8', 'b1'), ('a1', 'b1'), ('a7', 'a4'), ('b1', 'c1'), ('a4', 'a2'), ('e2', 'e1'), ('i7', 'h7'),
+            ('c1', 'c9')
+        ]
+        for cur_pos, move_pos in moves:
+            self.assertIs(g.make_move(cur_pos, move_pos), True)
+        self.assertIs(g.is_in_check('blue'), True)
+        self.assertEqual(g.get_game_state(), 'RED_WON')
+        self.assertIs(g.make_move('d9', 'e9'), False)
+
+    def test_bitboard_make_and_unmake_restore_the_position(self):
+        """BITBOARD: unmaking every legal move restores the position"""
+        g = JanggiGame(backend='bitboard')
+        bitboard = g.create_bitboard()
+        before = [bitboard.get_piece(sq) for sq in range(90)]
+        moves = bitboard.legal_moves(0)
+        self.assertEqual(len(moves), 31)
+        for from_sq, to_sq in moves:
+            bitboard.make(from_sq, to_sq)
+            bitboard.unmake()
+        self.assertEqual([bitboard.get_piece(sq) for sq in range(90)], before)
+        self.assertEqual(bitboard.get_turn(), 0)
+
+
+class TestMoveTables(unittest.TestCase):
+    def test_palace_diagonals_only_join_the_corners_and_centre(self):
+        """TABLES: palace diagonals run between the corners and the centre of each palace"""
+        self.assertEqual(sorted(PALACE_DIAGONALS[square(1, 4)]),
+                         [square(0, 3), square(0, 5), square(2, 3), square(2, 5)])
+        self.assertEqual(PALACE_DIAGONALS[square(9, 3)], (square(8, 4),))
+        self.assertEqual(PALACE_DIAGONALS[square(8, 3)], ())
+        self.assertEqual(PALACE_DIAGONALS[square(4, 4)], ())
+
+    def test_palace_moves_stay_in_the_palace(self):
+        """TABLES: the General and Guards step along the palace lines only"""
+        self.assertEqual(sorted(PALACE_MOVES[square(0, 4)]), [square(0, 3), square(0, 5), square(1, 4)])
+        self.assertEqual(len(PALACE_MOVES[square(8, 4)]), 8)
+        self.assertEqual(PALACE_MOVES[square(5, 4)], ())
+
+    def test_horse_and_elephant_legs(self):
+        """TABLES: horse and elephant moves list their legs before the target"""
+        self.assertEqual(len(HORSE_MOVES[square(4, 4)]), 8)
+        self.assertIn((square(5, 4), square(6, 5)), HORSE_MOVES[square(4, 4)])
+        self.assertIn((square(5, 4), square(6, 5), square(7, 6)), ELEPHANT_MOVES[square(4, 4)])
+        self.assertEqual(len(HORSE_MOVES[square(0, 0)]), 2)
+
+    def test_chariot_rays_follow_the_palace_diagonal(self):
+        """TABLES: a ray from a palace corner crosses the palace diagonally and stops at the far corner"""
+        self.assertEqual(RAYS[square(7, 3)][7], (square(8, 4), square(9, 5)))
+        self.assertEqual(RAYS[square(7, 4)][7], ())
+
+    def test_soldiers_move_towards_the_opposing_side(self):
+        """TABLES: soldiers step forward or sideways and diagonally forward in the palace"""
+        self.assertEqual(sorted(SOLDIER_MOVES[BLUE][square(6, 0)]), [square(5, 0), square(6, 1)])
+        self.assertIn(square(8, 4), SOLDIER_MOVES[RED][square(7, 3)])
+        self.assertNotIn(square(8, 5), SOLDIER_MOVES[RED][square(7, 4)])
+
+
+class TestLegalMoves(unittest.TestCase):
+    def play(self, g, moves):
+        for cur_pos, move_pos in moves:
+            self.assertIs(g.make_move(cur_pos, move_pos), True)
+
+    def test_legal_moves_from_the_starting_position(self):
+        """LEGAL: both players have 31 legal moves at the start and listing them leaves the game unchanged"""
+        g = JanggiGame()
+        board = [list(row) for row in g.get_board()]
+        self.assertEqual(len(g.legal_moves('BLUE')), 31)
+        self.assertEqual(len(g.legal_moves('red')), 31)
+        self.assertEqual(g.get_board(), board)
+        self.assertEqual(g.get_player_turn(), 'BLUE')
+
+    def test_legal_moves_only_counter_a_check(self):
+        """LEGAL: every legal move of a player in check counters the check"""
+        for backend in ('object', 'bitboard'):
+            g = JanggiGame(backend=backend)
+            self.play(g, [
+                ('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'e3'), ('c10', 'd8'), ('h1', 'g3'),
+                ('e7', 'e6'), ('e3', 'e6'), ('h8', 'c8'), ('d3', 'e5'), ('c8', 'c4'), ('e5', 'c4'),
+                ('i10', 'i8'), ('g4', 'f4'), ('i8', 'f8'), ('g3', 'h5'), ('h10', 'g8'), ('e6', 'e3')
+            ])
+            self.assertIs(g.is_in_check('blue'), True)
+            moves = g.legal_moves('BLUE')
+            self.assertEqual(sorted(moves), sorted(g.legal_moves('blue')))
+            self.assertIn((square(8, 4), square(8, 3)), moves)  # general steps aside
+            self.assertNotIn((square(7, 5), square(6, 5)), moves)  # chariot ignores the check
+            for from_sq, to_sq in moves:
+                self.assertIs(g.is_legal_move('BLUE', from_sq, to_sq), True)
+
+    def test_a_move_that_exposes_the_general_is_illegal(self):
+        """LEGAL: a pinned soldier can only stay between its general and the chariot or capture the chariot"""
+        g = JanggiGame()
+        self.play(g, [('a7', 'b7'), ('a4', 'a4'), ('a10', 'a5'), ('a4', 'a4'), ('a5', 'e5')])
+        moves = g.legal_moves('RED')
+        self.assertNotIn((square(3, 4), square(3, 3)), moves)
+        self.assertIn((square(3, 4), square(4, 4)), moves)
+        self.assertIs(g.make_move('e4', 'd4'), False)
+        self.assertIs(g.make_move('e4', 'e5'), True)
+
+    def test_check_analysis_finds_pins_and_checkers(self):
+        """LEGAL: the check analysis finds a pinned soldier and a cannon check with its screen"""
+        g = JanggiGame()
+        self.play(g, [('a7', 'b7'), ('a4', 'a4'), ('a10', 'a5'), ('a4', 'a4'), ('a5', 'e5')])
+        self.assertEqual(g._bitboard.check_analysis(RED), ([], 1 << square(3, 4), 0))
+
+        g = JanggiGame()
+        self.play(g, [
+            ('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'e3'), ('c10', 'd8'), ('h1', 'g3'),
+            ('e7', 'e6'), ('e3', 'e6'), ('h8', 'c8'), ('d3', 'e5'), ('c8', 'c4'), ('e5', 'c4'),
+            ('i10', 'i8'), ('g4', 'f4'), ('i8', 'f8'), ('g3', 'h5'), ('h10', 'g8'), ('e6', 'e3')
+        ])
+        between = sum(1 << square(row, 4) for row in range(2, 8))
+        self.assertEqual(g._bitboard.check_analysis(BLUE), ([(between, 1 << square(3, 4))], 0, between))
+
+    def test_filtered_moves_match_trying_every_move(self):
+        """LEGAL: filtering with the check analysis keeps exactly the moves that survive being tried"""
+        generator = random.Random(3)
+        for game_number in range(20):
+            g = JanggiGame(backend='bitboard', facing_rule=game_number % 2 == 0)
+            bitboard = g._bitboard
+            for ply in range(80):
+                player = bitboard.get_turn()
+                tried = [move for move in bitboard.generate_moves(player) if g.is_legal_move(
+                    ('BLUE', 'RED')[player], *move)]
+                moves = bitboard.legal_moves(player)
+                self.assertEqual(sorted(moves), sorted(tried))
+                if not moves:
+                    break
+                bitboard.make(*generator.choice(moves))
+
+    def test_evasions_include_blocks_and_captures(self):
+        """LEGAL: a check that only a block or capture can stop is not checkmate"""
+        g = JanggiGame()
+        self.play(g, [
+            ('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'e3'), ('c10', 'd8'), ('h1', 'g3'),
+            ('e7', 'e6'), ('e3', 'e6'), ('h8', 'c8'), ('d3', 'e5'), ('c8', 'c4'), ('e5', 'c4'),
+            ('i10', 'i8'), ('g4', 'f4'), ('i8', 'f8'), ('g3', 'h5'), ('h10', 'g8'), ('e6', 'e3')
+        ])
+        bitboard = g._bitboard
+        self.assertIs(bitboard.is_checkmate(BLUE), False)
+        evasions = set(bitboard.generate_evasions(BLUE))
+        moves = g.legal_moves('BLUE')
+        self.assertTrue(set(moves) <= evasions)
+        self.assertTrue(any(from_sq != bitboard.general_square(BLUE) for from_sq, to_sq in moves))
+        self.assertLess(len(evasions), len(bitboard.generate_moves(BLUE)))
+
+    def test_facing_generals_rule_is_optional(self):
+        """LEGAL: generals may face each other unless the facing rule is on"""
+        g = JanggiGame()
+        self.play(g, [('e9', 'f8'), ('e2', 'f3')])
+
+        g = JanggiGame(facing_rule=True)
+        self.play(g, [('e9', 'f8')])
+        self.assertIs(g.make_move('e2', 'f3'), False)
+        self.assertNotIn((square(1, 4), square(2, 5)), g.legal_moves('RED'))
+        self.assertIn((square(1, 4), square(2, 3)), g.legal_moves('RED'))
+
+
+class TestUnmakeMove(unittest.TestCase):
+    def snapshot(self, g):
+        return (
+            [list(row) for row in g.get_board()], sorted(id(piece) for piece in g.get_pieces()),
+            {id(piece): list(piece.get_current_moves()) for piece in g.get_pieces()},
+            g.get_player_turn(), g.get_check(), g.get_game_state()
+        )
+
+    def test_unmake_restores_every_position_of_a_game(self):
+        """UNDO: unmaking moves, captures and passes one by one restores each earlier position"""
+        g = JanggiGame(verify_moves=True)
+        moves = [
+            ('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'e3'), ('c10', 'd8'), ('h1', 'h1'),
+            ('e7', 'e6'), ('e3', 'e6'), ('h8', 'c8'), ('d3', 'e5'), ('c8', 'c4'), ('e5', 'c4')
+        ]
+        snapshots = []
+        for cur_pos, move_pos in moves:
+            snapshots.append(self.snapshot(g))
+            self.assertIs(g.make_move(cur_pos, move_pos), True)
+        for snapshot in reversed(snapshots):
+            self.assertIs(g.unmake_move(), True)
+            self.assertEqual(self.snapshot(g), snapshot)
+        self.assertIs(g.unmake_move(), False)
+
+    def test_unmake_a_checkmate(self):
+        """UNDO: unmaking the mating move reopens the game"""
+        g = JanggiGame()
+        moves = [
+            ('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'e3'), ('c10', 'd8'), ('h1', 'g3'), ('e7', 'e6'),
+            ('e3', 'e6'), ('h8', 'c8'), ('d3', 'e5'), ('c8', 'c4'), ('e5', 'c4'), ('i10', 'i8'), ('g4', 'f4'),
+            ('i8', 'f8'), ('g3', 'h5'), ('h10', 'g8'), ('e6', 'e3'), ('e9', 'd9'), ('c4', 'e5'), ('c6', 'd6'),
+            ('e5', 'c4'), ('a7', 'a6'), ('h3', 'h9'), ('a10', 'a7'), ('c4', 'd6'), ('a6', 'b6'), ('h5', 'g7'),
+            ('b8', 'b1'), ('a1', 'b1'), ('a7', 'a4'), ('b1', 'c1'), ('a4', 'a2'), ('e2', 'e1'), ('i7', 'h7'),
+            ('c1', 'c9')
+        ]
+        for cur_pos, move_pos in moves:
+            g.make_move(cur_pos, move_pos)
+        self.assertEqual(g.get_game_state(), 'RED_WON')
+        g.unmake_move()
+        self.assertEqual(g.get_game_state(), 'UNFINISHED')
+        self.assertIs(g.is_in_check('blue'), False)
+        self.assertEqual(g.get_player_turn(), 'RED')
+        self.assertIs(g.make_move('c1', 'c9'), True)
+        self.assertEqual(g.get_game_state(), 'RED_WON')
+
+
+class TestPositionKey(unittest.TestCase):
+    def test_position_key_is_updated_incrementally(self):
+        """ZOBRIST: the incremental position key always matches a key computed from scratch"""
+        g = JanggiGame()
+        for cur_pos, move_pos in [('c7', 'c6'), ('c1', 'd3'), ('h8', 'h8'), ('c4', 'c5'), ('c6', 'c5')]:
+            self.assertIs(g.make_move(cur_pos, move_pos), True)
+            self.assertEqual(g.position_key(), g.compute_position_key())
+
+    def test_transpositions_have_equal_keys(self):
+        """ZOBRIST: the same position reached by different move orders has the same key"""
+        first = JanggiGame()
+        second = JanggiGame()
+        for cur_pos, move_pos in [('c7', 'c6'), ('c4', 'c5'), ('g7', 'g6'), ('g4', 'g5')]:
+            first.make_move(cur_pos, move_pos)
+        for cur_pos, move_pos in [('g7', 'g6'), ('g4', 'g5'), ('c7', 'c6'), ('c4', 'c5')]:
+            second.make_move(cur_pos, move_pos)
+        self.assertEqual(first.position_key(), second.position_key())
+        self.assertNotEqual(first.position_key(), JanggiGame().position_key())
+
+    def test_player_to_move_changes_the_key(self):
+        """ZOBRIST: passing changes the key and unmaking restores it"""
+        g = JanggiGame()
+        start = g.position_key()
+        g.make_move('e9', 'e9')
+        self.assertNotEqual(g.position_key(), start)
+        g.unmake_move()
+        self.assertEqual(g.position_key(), start)
+
+
+class TestMoveCache(unittest.TestCase):
+    def test_repeated_game_uses_cached_moves(self):
+        """CACHE: a second game replaying the same moves takes every position from the cache"""
+        cache = MoveCache()
+        moves = [('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'e3'), ('h8', 'h8'), ('h1', 'g3')]
+        first = JanggiGame(move_cache=cache)
+        for cur_pos, move_pos in moves:
+            first.make_move(cur_pos, move_pos)
+        self.assertEqual(cache.get_hits(), 0)
+        self.assertEqual(cache.get_misses(), 5)
+        second = JanggiGame(verify_moves=True, move_cache=cache)
+        for cur_pos, move_pos in moves:
+            self.assertIs(second.make_move(cur_pos, move_pos), True)
+        self.assertEqual(cache.get_hits(), 5)
+        self.assertEqual(cache.get_size(), 5)
+        second.unmake_move()
+        second.verify_moves()
+
+    def test_least_recently_used_position_is_evicted(self):
+        """CACHE: a full cache drops the position that was used longest ago"""
+        cache = MoveCache(max_size=2)
+        cache.put(1, {})
+        cache.put(2, {})
+        self.assertEqual(cache.get(1), {})
+        cache.put(3, {})
+        self.assertEqual(cache.get_size(), 2)
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(3), {})
+        self.assertEqual((cache.get_hits(), cache.get_misses()), (2, 1))
+        cache.clear()
+        self.assertEqual((cache.get_size(), cache.get_hits(), cache.get_misses()), (0, 0, 0))
+
+
+class TestPerft(unittest.TestCase):
+    def test_perft_matches_reference_counts(self):
+        """PERFT: node counts from the starting position match the reference counts on both backends"""
+        for backend in ('object', 'bitboard'):
+            g = JanggiGame(backend=backend)
+            for depth in (1, 2, 3):
+                self.assertEqual(perft(g, depth), REFERENCE_COUNTS[depth])
+
+    def test_perft_leaves_the_game_unchanged(self):
+        """PERFT: perft from a middle game position agrees between backends and restores the position"""
+        games = [JanggiGame(verify_moves=True), JanggiGame(backend='bitboard')]
+        for g in games:
+            for cur_pos, move_pos in [('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'e3'), ('h8', 'c8')]:
+                g.make_move(cur_pos, move_pos)
+        key = games[0].position_key()
+        self.assertEqual(perft(games[0], 2), perft(games[1], 2))
+        self.assertEqual(games[0].position_key(), key)
+        self.assertEqual(games[0].get_player_turn(), 'BLUE')
+        self.assertEqual(sum(divide(games[1], 2).values()), perft(games[1], 2))
+
+
+class TestSquareNames(unittest.TestCase):
+    def test_square_names_round_trip(self):
+        """NOTATION: every board position has a name that converts back to it"""
+        self.assertEqual(len(SQUARE_INDEXES), 90)
+        self.assertEqual((SQUARE_NAMES[0], SQUARE_NAMES[89]), ('a1', 'i10'))
+        self.assertEqual(SQUARE_INDEXES['e9'], square(8, 4))
+        for sq, name in enumerate(SQUARE_NAMES):
+            self.assertEqual(SQUARE_INDEXES[name], sq)
+
+    def test_invalid_names_are_rejected(self):
+        """NOTATION: positions that are not on the board are rejected without changing the game"""
+        g = JanggiGame()
+        for cur_pos, move_pos in [('j7', 'j6'), ('c11', 'c6'), ('c7', 'c0'), ('c', 'c6'), ('', ''), ('cc', 'c6')]:
+            self.assertIs(g.make_move(cur_pos, move_pos), False)
+        self.assertEqual(g.get_player_turn(), 'BLUE')
+
+    def test_make_move_idx(self):
+        """NOTATION: moves can be made with board positions as integers"""
+        g = JanggiGame()
+        self.assertIs(g.make_move_idx(SQUARE_INDEXES['c7'], SQUARE_INDEXES['c6']), True)
+        self.assertIs(g.make_move_idx(SQUARE_INDEXES['c4'], SQUARE_INDEXES['c6']), False)
+        self.assertIs(g.make_move_idx(SQUARE_INDEXES['c4'], 90), False)
+        self.assertIs(g.make_move_idx(SQUARE_INDEXES['e2'], SQUARE_INDEXES['e2']), True)
+        self.assertEqual(g.get_player_turn(), 'BLUE')
+        self.assertEqual(g.get_board()[5][2].get_name(), 'bSd')
+
+
+class TestPieceCodes(unittest.TestCase):
+    def test_pieces_keep_string_getters(self):
+        """PIECES: slotted pieces store integer codes and still answer the string getters"""
+        g = JanggiGame()
+        general = g.get_board()[8][4]
+        self.assertEqual((general.get_player(), general.get_type(), general.get_name()), ('BLUE', 'General', 'bGn'))
+        self.assertEqual((general.get_player_code(), general.get_type_code()), (BLUE, 0))
+        self.assertEqual(g.get_board()[0][2].get_name(), 'rHs')
+        self.assertFalse(hasattr(general, '__dict__'))
+
+    def test_current_moves_are_tuples(self):
+        """PIECES: current moves are a tuple of (row, column) tuples"""
+        g = JanggiGame()
+        self.assertEqual(g.get_board()[6][2].get_current_moves(), ((5, 2), (6, 1), (6, 3)))
+
+
+class TestSlidingMoves(unittest.TestCase):
+    def test_sliding_moves_match_the_bitboard(self):
+        """SLIDERS: Chariot and Cannon moves match the bitboard targets in random midgame positions"""
+        generator = random.Random(7)
+        for game_number in range(10):
+            g = JanggiGame()
+            for ply in range(40):
+                moves = g.legal_moves(g.get_player_turn())
+                if not moves:
+                    break
+                g.make_move_idx(*generator.choice(moves))
+                for piece in g.get_pieces():
+                    if piece.get_type() in ('Chariot', 'Cannon'):
+                        sq = square(piece.get_row(), piece.get_column())
+                        targets = g._bitboard.targets(sq)
+                        moves_mask = sum(1 << square(row, column) for row, column in piece.get_current_moves())
+                        self.assertEqual(moves_mask, targets)
+
+
+    def test_moves_are_sorted_board_positions(self):
+        """SLIDERS: every piece's moves are distinct board positions in ascending order"""
+        g = JanggiGame()
+        for cur_pos, move_pos in [('c7', 'c6'), ('c4', 'c5'), ('a10', 'a9'), ('a1', 'a2')]:
+            self.assertIs(g.make_move(cur_pos, move_pos), True)
+        for piece in g.get_pieces():
+            moves = piece.get_move_squares()
+            self.assertEqual(list(moves), sorted(set(moves)))
+            for sq in moves:
+                self.assertIs(piece.has_move(sq), True)
+        chariot = g.get_board()[8][0]
+        self.assertEqual(chariot.get_move_squares(), (square(7, 0), square(8, 1), square(8, 2), square(8, 3), square(9, 0)))
+        self.assertIs(chariot.has_move(square(9, 0)), True)
+        self.assertIs(chariot.has_move(square(6, 0)), False)
+
+
+class TestAttackMaps(unittest.TestCase):
+    moves = [
+        ('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'e3'), ('c10', 'd8'), ('h1', 'g3'), ('e7', 'e6'),
+        ('e3', 'e6'), ('h8', 'c8'), ('d3', 'e5'), ('c8', 'c4'), ('e5', 'c4'), ('i10', 'i8'), ('g4', 'f4'),
+        ('i8', 'f8'), ('g3', 'h5'), ('h10', 'g8'), ('e6', 'e3')
+    ]
+
+    def test_attack_maps_follow_moves_and_unmakes(self):
+        """ATTACKS: attack maps match the current moves after captures and unmakes, on both backends"""
+        g = JanggiGame(verify_moves=True)
+        b = JanggiGame(backend='bitboard')
+        start = [g.attacked_squares(BLUE), g.attacked_squares(RED)]
+        for cur_pos, move_pos in self.moves[:12]:
+            self.assertIs(g.make_move(cur_pos, move_pos), True)
+            b.make_move(cur_pos, move_pos)
+            for player in (BLUE, RED):
+                self.assertEqual(g.attacked_squares(player), b.attacked_squares(player))
+                for sq in range(90):
+                    self.assertEqual(g.attack_count(player, sq), b.attack_count(player, sq))
+        while g.unmake_move():
+            pass
+        self.assertEqual([g.attacked_squares(BLUE), g.attacked_squares(RED)], start)
+
+    def test_check_is_read_from_the_attack_map(self):
+        """ATTACKS: a General on an attacked position is in check"""
+        g = JanggiGame()
+        for cur_pos, move_pos in self.moves:
+            self.assertIs(g.make_move(cur_pos, move_pos), True)
+        self.assertEqual(g.attack_count(RED, square(8, 4)), 1)
+        self.assertIs(g.is_in_check('blue'), True)
+        self.assertIs(g.in_check(BLUE), True)
+        self.assertIs(g.is_in_check('red'), False)
+
+
+class TestSearch(unittest.TestCase):
+    mate_moves = [
+        ('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'e3'), ('c10', 'd8'), ('h1', 'g3'), ('e7', 'e6'),
+        ('e3', 'e6'), ('h8', 'c8'), ('d3', 'e5'), ('c8', 'c4'), ('e5', 'c4'), ('i10', 'i8'), ('g4', 'f4'),
+        ('i8', 'f8'), ('g3', 'h5'), ('h10', 'g8'), ('e6', 'e3'), ('e9', 'd9'), ('c4', 'e5'), ('c6', 'd6'),
+        ('e5', 'c4'), ('a7', 'a6'), ('h3', 'h9'), ('a10', 'a7'), ('c4', 'd6'), ('a6', 'b6'), ('h5', 'g7'),
+        ('b8', 'b1'), ('a1', 'b1'), ('a7', 'a4'), ('b1', 'c1'), ('a4', 'a2'), ('e2', 'e1'), ('i7', 'h7')
+    ]
+
+    def test_best_move_finds_a_mate_in_one(self):
+        """SEARCH: the search plays a mate in one and reports a mate score"""
+        g = JanggiGame()
+        for cur_pos, move_pos in self.mate_moves:
+            self.assertIs(g.make_move(cur_pos, move_pos), True)
+        key = g.position_key()
+        search = Search(g, max_depth=2)
+        search.run()
+        self.assertGreater(search.get_score(), 90000)
+        self.assertEqual(g.position_key(), key)
+        self.assertEqual(best_move(g, 5000, max_depth=2), ('c1', 'c9'))
+        self.assertIs(g.make_move('c1', 'c9'), True)
+        self.assertEqual(g.get_game_state(), 'RED_WON')
+        self.assertIsNone(best_move(g, 100))
+
+    def test_search_passes_without_a_legal_move(self):
+        """SEARCH: a player who is not in check and has no legal move passes, and is mated after the pass"""
+        layout = bytearray(90)
+        for code, name in [(7, 'd1'), (4, 'a2'), (4, 'e10'), (0, 'f10')]:
+            layout[SQUARE_INDEXES[name]] = code + 1
+        g = JanggiGame()
+        g.set_state((bytes(layout), 'RED', 'UNFINISHED', False, [], False))
+        self.assertEqual(g.legal_moves('RED'), [])
+        self.assertIs(g.in_check(RED), False)
+        search = Search(g, max_depth=3)
+        self.assertEqual(search.run(), (square(0, 3), square(0, 3)))
+        self.assertEqual(search.get_score(), -100000 + 2)
+        self.assertEqual(best_move(g, 100, max_depth=3), ('d1', 'd1'))
+        self.assertRaises(ValueError, search.search_move, (square(0, 3), square(0, 4)), 2, -100001, 100001)
+        self.assertEqual(g.get_player_turn(), 'RED')
+
+    def test_search_respects_the_node_limit(self):
+        """SEARCH: a node limited search stops, returns a legal move and leaves the game unchanged"""
+        g = JanggiGame()
+        depths = []
+        search = Search(g, max_nodes=300, callback=lambda depth, score, nodes, pv: depths.append((depth, len(pv))))
+        move = search.run()
+        self.assertIn(move, g.legal_moves('BLUE'))
+        self.assertEqual(search.get_nodes(), 300)
+        self.assertEqual(depths[0], (1, 1))
+        self.assertEqual(search.get_principal_variation()[0], move)
+        self.assertEqual(g.position_key(), JanggiGame().position_key())
+        self.assertIs(g.make_move(*best_move(g, 200, max_depth=1)), True)
+
+    def test_analyse_streams_the_best_lines(self):
+        """SEARCH: the analysis yields every depth with the best lines in order, led by the search's best score"""
+        g = JanggiGame()
+        self.assertIs(g.make_move('a7', 'b7'), True)
+        self.assertIs(g.make_move('i4', 'h4'), True)
+        key = g.position_key()
+        results = list(analyse(g, lines=4, max_depth=3))
+        self.assertEqual([depth for depth, nodes, lines in results], [1, 2, 3])
+        for depth, nodes, lines in results:
+            self.assertEqual(len(lines), 4)
+            scores = [score for score, moves in lines]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+            self.assertEqual(len(set(moves[0] for score, moves in lines)), 4)
+            search = Search(g, max_depth=depth)
+            search.run()
+            self.assertEqual(scores[0], search.get_score())
+        self.assertEqual(results[0][1] < results[1][1] < results[2][1], True)
+        self.assertEqual(g.position_key(), key)
+
+    def test_analyse_stops_at_a_mate_and_runs_asynchronously(self):
+        """SEARCH: the analysis finds the mate in one first and its asynchronous version gives the same results"""
+        g = JanggiGame()
+        for cur_pos, move_pos in self.mate_moves:
+            self.assertIs(g.make_move(cur_pos, move_pos), True)
+        results = list(analyse(g, lines=2, max_depth=2))
+        self.assertEqual(results[0][2][0][1], [('c1', 'c9')])
+        self.assertGreater(results[0][2][0][0], 90000)
+
+        async def collect():
+            return [result async for result in analyse_async(g, lines=2, max_depth=2)]
+
+        self.assertEqual([(depth, lines) for depth, nodes, lines in asyncio.run(collect())],
+                         [(depth, lines) for depth, nodes, lines in results])
+        self.assertEqual(list(analyse(JanggiGame(), lines=3, max_nodes=50)), [])
+
+    def test_capture_moves_are_the_legal_captures(self):
+        """SEARCH: the capture generator gives the legal moves that capture on both backends"""
+        generator = random.Random(19)
+        for backend in ('object', 'bitboard'):
+            g = JanggiGame(backend=backend)
+            for ply in range(60):
+                player = g.get_player_turn()
+                moves = g.legal_moves(player)
+                if not moves:
+                    break
+                board = g.get_board()
+                captures = [move for move in moves if board[move[1] // 9][move[1] % 9] != '   ']
+                self.assertEqual(sorted(g.capture_moves(player)), sorted(captures))
+                g.make_move_idx(*generator.choice(moves))
+
+    def test_quiescence_sees_the_recapture(self):
+        """SEARCH: with quiescence a depth 1 search does not take a Soldier defended by a Chariot"""
+        g = JanggiGame()
+        self.assertIs(g.make_move('a7', 'b7'), True)
+        self.assertIs(g.make_move('i4', 'h4'), True)
+        self.assertEqual(g.capture_moves('BLUE'), [(square(9, 0), square(3, 0))])
+        key = g.position_key()
+        self.assertEqual(Search(g, max_depth=1, quiescence=False).run(), (square(9, 0), square(3, 0)))
+        self.assertNotEqual(Search(g, max_depth=1).run(), (square(9, 0), square(3, 0)))
+        self.assertEqual(g.position_key(), key)
+
+    def test_quiescence_finds_a_mate_at_the_horizon(self):
+        """SEARCH: a depth 1 search with quiescence scores a mate in one and lists it as a checking move"""
+        g = JanggiGame()
+        for cur_pos, move_pos in self.mate_moves:
+            self.assertIs(g.make_move(cur_pos, move_pos), True)
+        search = Search(g, max_depth=1, checks=True)
+        self.assertEqual(search.checking_moves('RED'), [(square(0, 2), square(8, 2))])
+        self.assertEqual(search.run(), (square(0, 2), square(8, 2)))
+        self.assertGreater(search.get_score(), 90000)
+
+
+class TestParallelSearch(unittest.TestCase):
+    def test_pickled_game_keeps_its_position(self):
+        """PARALLEL: a pickled game is rebuilt from its compact state with the same position, moves and score"""
+        for backend in ('object', 'bitboard'):
+            g = JanggiGame(backend=backend)
+            for cur_pos, move_pos in TestSearch.mate_moves:
+                self.assertIs(g.make_move(cur_pos, move_pos), True)
+            data = pickle.dumps(g)
+            self.assertLess(len(data), 300)
+            copy = pickle.loads(data)
+            self.assertEqual(copy.position_key(), g.position_key())
+            self.assertEqual(copy.get_score(), g.get_score())
+            self.assertEqual(copy.get_player_turn(), 'RED')
+            self.assertEqual(sorted(copy.legal_moves('RED')), sorted(g.legal_moves('RED')))
+            self.assertEqual(copy.attacked_squares(BLUE), g.attacked_squares(BLUE))
+            self.assertEqual(copy.mobility(RED), g.mobility(RED))
+            self.assertIs(copy.make_move('c1', 'c9'), True)
+            self.assertEqual(copy.get_game_state(), 'RED_WON')
+            self.assertEqual(g.get_game_state(), 'UNFINISHED')
+
+    def test_parallel_search_matches_the_search(self):
+        """PARALLEL: splitting the root moves between workers gives the same score as a single search"""
+        g = JanggiGame()
+        self.assertIs(g.make_move('a7', 'b7'), True)
+        self.assertIs(g.make_move('i4', 'h4'), True)
+        search = Search(g, max_depth=2)
+        search.run()
+        parallel = ParallelSearch(g, workers=2, max_depth=2)
+        move = parallel.run()
+        self.assertEqual(parallel.get_score(), search.get_score())
+        self.assertEqual(parallel.get_depth(), 2)
+        self.assertEqual(parallel.get_principal_variation()[0], move)
+        self.assertIn(move, g.legal_moves('BLUE'))
+
+    def test_parallel_best_move_finds_a_mate_in_one(self):
+        """PARALLEL: the parallel search plays a mate in one"""
+        g = JanggiGame()
+        for cur_pos, move_pos in TestSearch.mate_moves:
+            self.assertIs(g.make_move(cur_pos, move_pos), True)
+        self.assertEqual(parallel_best_move(g, 5000, workers=2), ('c1', 'c9'))
+
+
+class TestOpeningBook(unittest.TestCase):
+    games = [
+        ([('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'e3')], 'BLUE_WON'),
+        ([('c7', 'c6'), ('c1', 'd3'), ('c10', 'd8')], 'RED_WON'),
+        ([('c7', 'c6'), ('g4', 'f4')], None),
+        ([('a7', 'b7'), ('a4', 'b4')], 'DRAW'),
+        ([('c7', 'd7'), ('c1', 'd3')], 'BLUE_WON'),
+    ]
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.bin')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_book_file_is_sorted_fixed_width_records(self):
+        """BOOK: the book file holds one 16 byte record per position and move, sorted by position key"""
+        builder = BookBuilder()
+        builder.add_games(self.games)
+        self.assertEqual(builder.write(self.path), 10)
+        self.assertEqual(os.path.getsize(self.path), 10 * RECORD_SIZE)
+        with open(self.path, 'rb') as file:
+            data = file.read()
+        keys = [int.from_bytes(data[index:index + 8], 'little') for index in range(0, len(data), RECORD_SIZE)]
+        self.assertEqual(keys, sorted(keys))
+        with OpeningBook(self.path) as book:
+            self.assertEqual(book.get_size(), 10)
+            self.assertEqual(book.lookup(0), [])
+            self.assertEqual(book.find(0), 0)
+            self.assertEqual(book.find(2 ** 64 - 1), 10)
+
+    def test_book_lookup_counts_and_weights(self):
+        """BOOK: a position's moves are found with their number of games and weight from the game results"""
+        builder = BookBuilder(max_plies=2)
+        builder.add_games(self.games)
+        builder.write(self.path)
+        with OpeningBook(self.path) as book:
+            g = JanggiGame()
+            entries = book.probe(g)
+            self.assertEqual(entries, [((square(6, 0), square(6, 1)), 1, 1), ((square(6, 2), square(5, 2)), 3, 3),
+                                       ((square(6, 2), square(6, 3)), 2, 1)])
+            self.assertEqual(book.choose_move(g), ('c7', 'c6'))
+            self.assertIn(book.choose_move(g, random.Random(1)), [('a7', 'b7'), ('c7', 'c6'), ('c7', 'd7')])
+            self.assertEqual(best_move(g, 100, book=book), ('c7', 'c6'))
+
+            self.assertIs(g.make_move('c7', 'c6'), True)
+            self.assertEqual(book.choose_move(g), ('c1', 'd3'))
+            self.assertEqual([count for move, weight, count in book.probe(g)], [2, 1])
+            self.assertIs(g.make_move('c1', 'd3'), True)
+            self.assertEqual(book.probe(g), [])
+            self.assertIsNone(book.choose_move(g))
+
+    def test_read_game_records(self):
+        """BOOK: game records are read one game per line with an optional result"""
+        with open(self.path, 'w') as file:
+            file.write('# comment\nc7 c6 c1 d3 BLUE_WON\n\na7 b7 a4 b4\n')
+        self.assertEqual(read_game_records(self.path), [([('c7', 'c6'), ('c1', 'd3')], 'BLUE_WON'),
+                                                         ([('a7', 'b7'), ('a4', 'b4')], None)])
+
+    def test_empty_book_and_illegal_moves(self):
+        """BOOK: passes are not added, a game stops being added at an illegal move and an empty book has no moves"""
+        builder = BookBuilder()
+        self.assertEqual(builder.add_game([('c7', 'c6'), ('c6', 'c5')]), 1)
+        self.assertEqual(builder.add_game([('z7', 'c6')]), 0)
+        self.assertEqual(builder.get_size(), 1)
+        self.assertEqual(builder.add_game([('c7', 'c6'), ('e2', 'e2'), ('c6', 'c5')]), 2)
+        self.assertEqual(builder.get_size(), 2)
+        self.assertEqual(BookBuilder().write(self.path), 0)
+        with OpeningBook(self.path) as book:
+            self.assertEqual(book.get_size(), 0)
+            self.assertIsNone(book.choose_move(JanggiGame()))
+
+
+class TestTablebase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tables = {}
+        cls.table = generate(parse_signature('Ch/Gd'), cls.tables)
+        cls.tablebases = Tablebases(cls.tables.values())
+
+    def position(self, turn, pieces):
+        layout = bytearray(90)
+        for code, name in pieces:
+            layout[SQUARE_INDEXES[name]] = code + 1
+        g = JanggiGame()
+        g.set_state((bytes(layout), turn, 'UNFINISHED', False, [], False))
+        return g
+
+    def solve(self, board, depth):
+        """Mate distance of the player to move within a depth by plain minimax, passes included, or None"""
+        turn = board.get_turn()
+        moves = board.legal_moves(turn)
+        in_check = board.in_check(turn)
+        if in_check and not moves:
+            return 0
+        if depth == 0:
+            return None
+        results = []
+        for move in moves:
+            board.make(*move)
+            results.append(self.solve(board, depth - 1))
+            board.unmake()
+        if not in_check:
+            board.make_pass()
+            results.append(self.solve(board, depth - 1))
+            board.unmake()
+        wins = [-result for result in results if result is not None and result <= 0]
+        if wins:
+            return min(wins) + 1
+        if all(result is not None and result > 0 for result in results):
+            return -(max(results) + 1)
+        return None
+
+    def test_signature_names(self):
+        """TABLEBASE: signatures convert to and from their names and smaller signatures are generated too"""
+        self.assertEqual(parse_signature('Ch/GdGd'), ((BLUE, 4), (RED, 1), (RED, 1)))
+        self.assertEqual(signature_name(parse_signature('GdCh/')), 'GdCh/')
+        self.assertEqual(signature_name(()), '/')
+        self.assertRaises(ValueError, parse_signature, 'Ch')
+        self.assertRaises(ValueError, parse_signature, 'Xx/')
+        self.assertEqual(sorted(signature_name(signature) for signature in self.tables), ['/', '/Gd', 'Ch/', 'Ch/Gd'])
+        self.assertEqual(self.table.get_size(), 2 * 9 * 9 * 90 * 9)
+
+    def test_packed_entries(self):
+        """TABLEBASE: entries are packed into two result bits and as many distance bits as the longest mate needs"""
+        results = bytearray([WIN, DRAW, LOSS, INVALID, WIN])
+        dtm_bits, data = pack_entries(results, [5, 0, 6, 0, 1])
+        self.assertEqual(dtm_bits, 3)
+        table = Tablebase((), dtm_bits, data)
+        self.assertEqual([table.entry(index) for index in range(5)], [(WIN, 5), (DRAW, 0), (LOSS, 6), (INVALID, 0),
+                                                                     (WIN, 1)])
+
+    def test_mated_and_mate_in_one(self):
+        """TABLEBASE: a mated position is lost and the search uses the table to find a mate in one"""
+        g = self.position('RED', [(0, 'd8'), (7, 'd1'), (4, 'f1'), (8, 'd2')])
+        self.assertEqual(self.tablebases.probe(g), (LOSS, 0))
+        self.assertEqual(g.legal_moves('RED'), [])
+        self.assertIs(g.in_check(RED), True)
+
+        g = self.position('BLUE', [(0, 'd8'), (7, 'd1'), (4, 'f1'), (8, 'e1')])
+        self.assertEqual(self.tablebases.probe(g), (WIN, 1))
+        search = Search(g, max_depth=1, quiescence=False, tablebases=self.tablebases)
+        move = search.run()
+        self.assertEqual(search.get_score(), 100000 - 1)
+        g.make_move_idx(*move)
+        self.assertEqual(self.tablebases.probe(g), (LOSS, 0))
+        self.assertIsNone(self.tablebases.probe(JanggiGame()))
+
+        g = JanggiGame(facing_rule=True)
+        g.set_state(self.position('BLUE', [(0, 'd8'), (7, 'd1'), (4, 'f1'), (8, 'e1')]).get_state())
+        self.assertIsNone(self.tablebases.probe(g))
+
+    def test_tables_agree_with_minimax(self):
+        """TABLEBASE: sampled positions have the result and mate distance of a plain minimax search"""
+        slots = ((BLUE, 0), (RED, 0)) + self.table.get_signature()
+        domains = [piece_domain(*slot) for slot in slots]
+        generator = random.Random(22)
+        checked = 0
+        while checked < 60:
+            index = generator.randrange(self.table.get_size())
+            result, distance = self.table.entry(index)
+            if result == INVALID:
+                continue
+            rest = index
+            squares = []
+            for domain in reversed(domains):
+                rest, slot_index = divmod(rest, len(domain))
+                squares.insert(0, domain[slot_index])
+            board = BitboardBoard.from_layout([slot + (sq,) for slot, sq in zip(slots, squares)], rest)
+            solved = self.solve(board, 2)
+            if result == DRAW or distance > 2:
+                self.assertIsNone(solved)
+            else:
+                self.assertEqual(solved, distance if result == WIN else -distance)
+            checked += 1
+
+    def test_probes_agree_with_the_search(self):
+        """TABLEBASE: probes give the score a search without tables finds, as both search passes"""
+        slots = ((BLUE, 0), (RED, 0)) + self.table.get_signature()
+        domains = [piece_domain(*slot) for slot in slots]
+        generator = random.Random(25)
+        checked = {WIN: 0, DRAW: 0}
+        while min(checked.values()) < 6:
+            index = generator.randrange(self.table.get_size())
+            result, distance = self.table.entry(index)
+            if result not in checked or checked[result] >= 6:
+                continue
+            rest = index
+            squares = []
+            for domain in reversed(domains):
+                rest, slot_index = divmod(rest, len(domain))
+                squares.insert(0, domain[slot_index])
+            g = self.position(('BLUE', 'RED')[rest], [(player * 7 + piece_type, SQUARE_NAMES[sq])
+                                                      for (player, piece_type), sq in zip(slots, squares)])
+            self.assertEqual(self.tablebases.probe(g), (result, distance))
+
+            # The search sees a mate one ply before its horizon.
+            search = Search(g, max_depth=distance + 1 if result == WIN else 3, quiescence=False)
+            search.run()
+            if result == WIN:
+                self.assertEqual(search.get_score(), MATE_SCORE - distance)
+            else:
+                self.assertLess(abs(search.get_score()), MATE_SCORE - MAX_DEPTH)
+            checked[result] += 1
+
+    def test_table_files(self):
+        """TABLEBASE: tables written to a directory are read back with the same entries"""
+        with tempfile.TemporaryDirectory() as directory:
+            self.table.write(os.path.join(directory, 'Ch_Gd.jtb'))
+            tablebases = Tablebases()
+            self.assertEqual(tablebases.load(directory), 1)
+            self.assertEqual(tablebases.get_max_pieces(), 4)
+            table = Tablebase.read(os.path.join(directory, 'Ch_Gd.jtb'))
+            for index in range(0, self.table.get_size(), 997):
+                self.assertEqual(table.entry(index), self.table.entry(index))
+            g = self.position('BLUE', [(0, 'd8'), (7, 'd1'), (4, 'f1'), (8, 'e1')])
+            self.assertEqual(tablebases.probe(g), (WIN, 1))
+
+
+class TestMCTS(unittest.TestCase):
+    def test_mcts_finds_a_mate_in_one(self):
+        """MCTS: the tree search plays a mate in one and leaves the game unchanged"""
+        g = JanggiGame()
+        for cur_pos, move_pos in TestSearch.mate_moves:
+            self.assertIs(g.make_move(cur_pos, move_pos), True)
+        key = g.position_key()
+        tree = MCTS(g, seed=1)
+        self.assertEqual(tree.search(iterations=400), (square(0, 2), square(8, 2)))
+        self.assertEqual(tree.get_visits(), 400)
+        means = {move: mean for move, visits, mean in tree.get_root_moves()}
+        self.assertEqual(means[square(0, 2), square(8, 2)], 1.0)
+        self.assertEqual(g.position_key(), key)
+        self.assertIn(g.parse_move(*mcts_move(g, 50, seed=1)), g.legal_moves('RED'))
+
+    def test_advance_keeps_the_subtree_of_the_move(self):
+        """MCTS: playing a move keeps the move's subtree at the front of the arrays and frees the other nodes"""
+        g = JanggiGame()
+        tree = MCTS(g, capacity=5000, seed=3)
+        move = tree.search(iterations=200)
+        visits = tree.get_root_moves()[0][1]
+        size = tree.get_size()
+        g.make_move_idx(*move)
+        kept = tree.advance(move)
+        self.assertLess(kept, size)
+        self.assertEqual(tree.get_size(), kept)
+        self.assertEqual(tree.get_visits(), visits)
+        self.assertEqual(sum(entry[1] for entry in tree.get_root_moves()), visits - 1)
+        self.assertEqual(set(entry[0] for entry in tree.get_root_moves()), set(g.legal_moves('RED')))
+
+        reply = tree.search(iterations=100)
+        self.assertIn(reply, g.legal_moves('RED'))
+        self.assertEqual(tree.get_visits(), visits + 100)
+        self.assertEqual(tree.advance((0, 0)), 1)
+        self.assertEqual(tree.get_root_moves(), [])
+
+    def test_tree_stays_within_its_capacity(self):
+        """MCTS: a full tree stops growing but keeps searching"""
+        g = JanggiGame(backend='bitboard')
+        tree = MCTS(g, capacity=100, seed=4)
+        for ply in range(4):
+            move = tree.search(iterations=60)
+            self.assertLessEqual(tree.get_size(), 100)
+            self.assertIs(g.make_move_idx(*move), True)
+            tree.advance(move)
+        self.assertRaises(ValueError, tree.search)
+
+
+class TestMatch(unittest.TestCase):
+    def test_elo_and_sprt(self):
+        """MATCH: the Elo difference, its confidence interval and the SPRT log-likelihood ratio follow the results"""
+        self.assertAlmostEqual(elo_difference(0.75), 190.85, places=2)
+        elo, low, high = match_report(30, 40, 30)
+        self.assertAlmostEqual(elo, 0.0)
+        self.assertAlmostEqual(low, -high)
+        self.assertLess(match_report(300, 400, 300)[2], high)
+        lower, upper = sprt_bounds(0.05, 0.05)
+        self.assertAlmostEqual(upper, -lower)
+        self.assertGreater(sprt_llr(60, 0, 20), 0)
+        self.assertLess(sprt_llr(20, 0, 60), lower)
+        self.assertGreater(sprt_llr(30, 0, 0), upper)
+        self.assertEqual(parse_engine('alphabeta:max_depth=2,max_nodes=500'),
+                         ('alphabeta', {'max_depth': 2, 'max_nodes': 500}))
+        self.assertRaises(ValueError, parse_engine, 'minimax')
+
+    def test_game_replays_the_opening(self):
+        """MATCH: a game starts with its opening line and ends in a result for engine A"""
+        opening = random_openings(1, 4, seed=2)[0]
+        number, a_color, score, moves, state = play_game(3, ('alphabeta', {'max_depth': 1}), ('random', {}),
+                                                         opening, 'RED', 5, 40)
+        self.assertEqual((number, a_color, moves[:4]), (3, 'RED', opening))
+        self.assertLessEqual(len(moves), 40)
+        self.assertEqual(score, {'RED_WON': 1.0, 'BLUE_WON': 0.0, 'UNFINISHED': 0.5}[state])
+
+    def test_bare_alphabeta_engine_has_a_time_limit(self):
+        """MATCH: an alphabeta engine given without limits searches each move within the default time limit"""
+        engine = parse_engine('alphabeta')
+        self.assertEqual(engine, ('alphabeta', {}))
+        number, a_color, score, moves, state = play_game(0, engine, ('random', {}), [], 'BLUE', 1, 4)
+        self.assertEqual(len(moves), 4)
+        self.assertEqual(state, 'UNFINISHED')
+
+    def test_mcts_engine_keeps_its_tree(self):
+        """MATCH: an mcts engine searches with the tree it keeps through the game"""
+        g = JanggiGame(backend='bitboard')
+        generator = random.Random(3)
+        engine = parse_engine('mcts:iterations=40,capacity=5000')
+        tree = create_tree(engine, g, generator)
+        self.assertIsNone(create_tree(('random', {}), g, generator))
+        move = engine_move(engine, g, generator, tree)
+        self.assertEqual(tree.get_visits(), 40)
+        visits = dict((entry[0], entry[1]) for entry in tree.get_root_moves())[move]
+        g.make_move_idx(*move)
+        tree.advance(move)
+        self.assertEqual(tree.get_visits(), visits)
+        self.assertIn(engine_move(engine, g, generator, tree), g.legal_moves('RED'))
+        self.assertEqual(tree.get_visits(), visits + 40)
+        number, a_color, score, moves, state = play_game(1, engine, engine, [], 'RED', 2, 6)
+        self.assertEqual(len(moves), 6)
+
+    def test_match_logs_games_and_stops_early(self):
+        """MATCH: games are played on a process pool with colors swapped, logged, and stopped once the SPRT decides"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'match.txt')
+            report = run_match(('alphabeta', {'max_depth': 1}), ('random', {}), 60, workers=2, log_path=path,
+                               seed=1, max_plies=60)
+            records = read_game_records(path)
+            with open(path) as file:
+                colors = [line.split()[-1] for line in file if line.startswith('# game')]
+        self.assertEqual(report['result'], 'H1')
+        self.assertLess(report['games'], 60)
+        self.assertEqual(report['wins'] + report['draws'] + report['losses'], report['games'])
+        self.assertEqual(len(records), report['games'])
+        self.assertIn('A=BLUE', colors)
+        self.assertIn('A=RED', colors)
+        self.assertGreater(report['elo'], 0)
+        report = run_match(('random', {}), ('random', {}), 2, workers=1, openings=[], sprt=None, max_plies=4)
+        self.assertEqual(report['games'], 2)
+
+
+class TestEvaluation(unittest.TestCase):
+    def test_starting_position_is_level(self):
+        """EVAL: the starting position scores zero for both players on both backends"""
+        for backend in ('object', 'bitboard'):
+            g = JanggiGame(backend=backend)
+            self.assertEqual(g.get_score(), 0)
+            self.assertEqual(evaluate(g), 0)
+            self.assertEqual(g.mobility(BLUE), 31)
+
+    def test_score_is_updated_incrementally(self):
+        """EVAL: captures and piece-square changes are added up as moves are made and unmade"""
+        g = JanggiGame(verify_moves=True)
+        for cur_pos, move_pos in [('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'e3'), ('c10', 'd8')]:
+            g.make_move(cur_pos, move_pos)
+        before = g.get_score()
+        self.assertIs(g.make_move('e3', 'e7'), True)
+        self.assertEqual(g.get_score(), g.compute_score())
+        captured = piece_score(BLUE, 6, square(6, 4))
+        moved = piece_score(RED, 5, square(6, 4)) - piece_score(RED, 5, square(2, 4))
+        self.assertEqual(g.get_score() - before, moved - captured)
+        self.assertGreaterEqual(captured, PIECE_VALUES[6])
+        self.assertLess(evaluate(g), 0)
+        g.unmake_move()
+        self.assertEqual(g.get_score(), before)
+
+
+class TestMoveOrdering(unittest.TestCase):
+    def test_captures_come_first_by_victim_and_attacker(self):
+        """ORDERING: the principal variation move comes first, then captures of the most valuable victim"""
+        g = JanggiGame()
+        for cur_pos, move_pos in [('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'e3'), ('c10', 'd8')]:
+            g.make_move(cur_pos, move_pos)
+        orderer = MoveOrderer()
+        moves = g.legal_moves('RED')
+        ordered = orderer.order(g, moves, 0)
+        self.assertEqual(sorted(ordered), sorted(moves))
+        self.assertEqual(ordered[0], (square(2, 4), square(6, 4)))  # cannon takes the soldier
+        pv_move = (square(0, 0), square(1, 0))
+        self.assertEqual(orderer.order(g, moves, 0, pv_move)[:2], [pv_move, (square(2, 4), square(6, 4))])
+
+    def test_cutoffs_make_killers_and_history(self):
+        """ORDERING: quiet moves that cause cutoffs become killers and gain history, captures do not"""
+        g = JanggiGame()
+        orderer = MoveOrderer()
+        quiet = (square(6, 0), square(5, 0))
+        orderer.record_cutoff(g, quiet, 2, 3)
+        self.assertEqual(orderer.get_killers(2), [quiet])
+        self.assertEqual(orderer.get_history(6, square(5, 0)), 9)
+        self.assertEqual(orderer.order(g, g.legal_moves('BLUE'), 2)[0], quiet)
+        for move in [(square(6, 2), square(5, 2)), (square(6, 4), square(5, 4)), quiet]:
+            orderer.record_cutoff(g, move, 2, 1)
+        self.assertEqual(orderer.get_killers(2), [quiet, (square(6, 4), square(5, 4))])
+        orderer.clear()
+        self.assertEqual((orderer.get_killers(2), orderer.get_history(6, square(5, 0))), ([], 0))
+
+    def test_history_stays_below_the_killers(self):
+        """ORDERING: history scores are halved when one passes MAX_HISTORY, so quiet moves never pass captures"""
+        g = JanggiGame()
+        for cur_pos, move_pos in [('c7', 'c6'), ('c1', 'd3'), ('b10', 'd7'), ('b3', 'e3'), ('c10', 'd8')]:
+            g.make_move(cur_pos, move_pos)
+        orderer = MoveOrderer()
+        quiet = (square(0, 0), square(1, 0))
+        for cutoff in range(2000):
+            orderer.record_cutoff(g, quiet, 2, 64)
+            self.assertLessEqual(orderer.get_history(4, square(1, 0)), MAX_HISTORY)
+        self.assertGreater(orderer.get_history(4, square(1, 0)), MAX_HISTORY // 2)
+        ordered = orderer.order(g, g.legal_moves('RED'), 0)
+        self.assertEqual(ordered[0], (square(2, 4), square(6, 4)))
+        score = orderer.get_history(4, square(1, 0))
+        orderer.age()
+        self.assertEqual(orderer.get_history(4, square(1, 0)), score >> 1)